@@ -1,584 +1,758 @@
-import tkinter as tk
-from tkinter import ttk
-import random
-from PIL import Image, ImageTk  # Pillow must be installed (pip install pillow)
-import os
-
-class StartScreen(tk.Toplevel):
-    def __init__(self, master, start_callback, background_image_path=None):
-        super().__init__(master)
-        self.start_callback = start_callback
-        self.title("Inicio - Juego Clue Marvel Edition")
-        self.geometry("900x600")
-        self.resizable(False, False)
-
-        if background_image_path and os.path.isfile(background_image_path):
-            img = Image.open(background_image_path)
-            img = img.resize((900, 600), Image.ANTIALIAS)
-            self.bg_image = ImageTk.PhotoImage(img)
-            self.background_label = tk.Label(self, image=self.bg_image)
-            self.background_label.place(x=0, y=0, relwidth=1, relheight=1)
-        else:
-            self.configure(bg="#1c1c1c")
-
-        overlay = tk.Frame(self, bg="#000000", bd=0, highlightthickness=0)
-        overlay.place(relx=0.5, rely=0.5, anchor="center")
-
-        welcome_label = tk.Label(overlay, text="Juego Clue - Adivina al Culpable (Marvel Edition)",
-                                 font=("Russo One", 25, "bold"), fg="#f0b429", bg="#000000", justify=tk.CENTER)
-        welcome_label.pack(pady=(0, 30))
-
-        start_button = tk.Button(overlay, text="Iniciar Juego", font=("Russo One", 16, "bold"),
-                                 bg="#f0b429", fg="#222", padx=20, pady=10, command=self.start_game)
-        start_button.pack()
-
-        self.protocol("WM_DELETE_WINDOW", self.master.destroy)
-
-    def start_game(self):
-        self.start_callback()
-        self.destroy()
-
-class ClueGame(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Juego Clue - Adivina al Culpable (Marvel Edition)")
-        self.geometry("920x750")
-        self.configure(bg="#1c1c1c")
-        self.resizable(False, False)
-
-        self.withdraw()
-
-        self.characters = [
-            "Peter Parker",
-            "Miles Morales",
-            "Gwen Stacy",
-            "Miguel O'Hara",
-            "Cindy Moon"
-        ]
-        self.locations = [
-            "Torre Avengers",
-            "Sanctum Sanctorum",
-            "Wakanda",
-            "Asgard",
-            "Helicarger"
-        ]
-        self.weapons = [
-            "Telaraña",
-            "Guantelete del Infinito",
-            "Mjolnir",
-            "Escudo del Capitán América",
-            "Armadura de Iron Man"
-        ]
-
-        self.image_base_path = "images"
-        self.char_img_path = os.path.join(self.image_base_path, "characters")
-        self.loc_img_path = os.path.join(self.image_base_path, "locations")
-        self.weap_img_path = os.path.join(self.image_base_path, "weapons")
-
-        # Narrativas base sin revelar la solución
-        self.stories = [
-            "Una sombra misteriosa acechaba cerca de un lugar importante el día del incidente.",
-            "Los rumores indican que alguien discutió acaloradamente en una locación tranquila justo antes de la tragedia.",
-            "Testigos mencionan haber visto un objeto inusual cerca de la escena del crimen.",
-            "Un conocido personaje fue visto desaparecido justo antes de que ocurriera el evento fatal.",
-            "El ambiente estaba tenso en una locación remota, y un objeto peculiar llamó la atención de varios."
-        ]
-
-        # Frases de indicios para la narrativa inicial que sugieren un arma, locacion o personaje no siendo la solución
-        self.clue_indications = {
-            "characters": [
-                "Alguien rumoró que {} estuvo especialmente nervioso ese día.",
-                "Se dice que {} tuvo una discusión con una persona cercana antes del incidente.",
-                "{} parecía preocupado por algo que ocurrió últimamente."
-            ],
-            "locations": [
-                "Una sombra fue vista rondando alrededor de {} en la noche del incidente.",
-                "Se escucharon ruidos extraños provenientes de {} justo antes de que todo pasara.",
-                "{} ha sido un lugar de frecuentes conflictos últimamente."
-            ],
-            "weapons": [
-                "Un objeto similar a {} fue encontrado cerca de la escena.",
-                "Conteo de {} en la escena sugiere que podría ser un arma importante.",
-                "Alguien fue visto manipulando un {} horas antes del suceso."
-            ]
-        }
-
-        self.max_clues = 5
-        self.clues_spent = 0  # pistas + interrogatorios usados
-        self.hints_added = set()
-        self.solution = {}
-        self.coartadas = {}
-
-        self.char_images = {}
-        self.loc_images = {}
-        self.weap_images = {}
-
-        # Crear notebook de pestañas
-        self.notebook = ttk.Notebook(self)
-        self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Crear pestañas
-        self.tab_story = ttk.Frame(self.notebook)
-        self.tab_investigate = ttk.Frame(self.notebook)
-        self.tab_guess = ttk.Frame(self.notebook)
-
-        self.notebook.add(self.tab_story, text="Narrativa Inicial")
-        self.notebook.add(self.tab_investigate, text="Interrogar & Pistas")
-        self.notebook.add(self.tab_guess, text="Hacer Adivinanza")
-
-        # Construir contenido de cada pestaña
-        self.create_story_tab()
-        self.create_investigate_tab()
-        self.create_guess_tab()
-
-        # Inicio oculto hasta que termine start screen
-        self.withdraw()
-
-        start_bg_path = os.path.join("images", "start_background.png")
-        self.start_screen = StartScreen(self, self.start_after_screen, background_image_path=start_bg_path)
-        self.start_screen.grab_set()
-
-    def start_after_screen(self):
-        self.deiconify()
-        self.new_game()
-        self.notebook.tab(1, state="disabled")
-        self.notebook.tab(2, state="disabled")
-        self.notebook.select(self.tab_story)
-
-    # ----- Pestaña Narrativa -----
-    def create_story_tab(self):
-        lbl_title = tk.Label(self.tab_story, text="Narrativa Inicial",
-                             font=("Russo One", 22, "bold"), fg="#f0b429", bg="#1c1c1c")
-        lbl_title.pack(pady=10)
-
-        self.story_text = tk.Text(self.tab_story, width=105, height=10, wrap="word",
-                                 font=("Helvetica", 13), bg="#282828", fg="#f0f0f0", bd=0, relief=tk.FLAT)
-        self.story_text.pack(padx=20, pady=10)
-        self.story_text.configure(state="disabled")
-
-        self.btn_next_from_story = tk.Button(self.tab_story, text="Siguiente", font=("Russo One", 16, "bold"),
-                                             bg="#f0b429", fg="#222", padx=25, pady=10, command=self.goto_investigate_tab)
-        self.btn_next_from_story.pack(pady=10)
-
-    def goto_investigate_tab(self):
-        self.notebook.tab(1, state="normal")
-        self.notebook.select(self.tab_investigate)
-
-    # ----- Pestaña Interrogatorios y Pistas -----
-    def create_investigate_tab(self):
-        lbl_title = tk.Label(self.tab_investigate, text="Interrogar Personajes, Armas o Locaciones",
-                             font=("Russo One", 20, "bold"), fg="#f0b429", bg="#1c1c1c")
-        lbl_title.pack(pady=8)
-
-        frame_mode = tk.Frame(self.tab_investigate, bg="#1c1c1c")
-        frame_mode.pack(pady=8)
-        self.mode_var = tk.StringVar(value="Personajes")
-
-        modes = ["Personajes", "Locaciones", "Armas"]
-        for i, m in enumerate(modes):
-            rb = tk.Radiobutton(frame_mode, text=m, variable=self.mode_var, value=m, font=("Helvetica", 13, "bold"),
-                                bg="#1c1c1c", fg="#f0b429", activebackground="#1c1c1c", activeforeground="#f0b429",
-                                selectcolor="#1c1c1c", command=self.update_combo_values)
-            rb.grid(row=0, column=i, padx=20, sticky="w")
-
-        frame_select = tk.Frame(self.tab_investigate, bg="#1c1c1c")
-        frame_select.pack(pady=5, fill="x", padx=10)
-        frame_select.columnconfigure(0, weight=1)
-
-        self.select_label = tk.Label(frame_select, text="Seleccionar Personaje:", font=("Helvetica", 13, "bold"), fg="#f0b429", bg="#1c1c1c")
-        self.select_label.grid(row=0, column=0, padx=10, sticky="w")
-
-        self.select_choice = ttk.Combobox(frame_select, state="readonly", font=("Helvetica", 12))
-        self.select_choice.grid(row=1, column=0, padx=10, sticky="ew")
-        self.select_choice.set('')  # No preseleccionado
-        self.select_choice.bind("<<ComboboxSelected>>", lambda e: self.on_select_choice())
-
-        # Imagen y texto info
-        self.select_image_label = tk.Label(self.tab_investigate, bg="#1c1c1c")
-        self.select_image_label.pack(pady=8)
-
-        self.info_text = tk.Text(self.tab_investigate, width=105, height=12, wrap="word", font=("Helvetica", 11),
-                                 bg="#333", fg="#eee", bd=0, relief=tk.FLAT)
-        self.info_text.pack(padx=10, pady=(0, 12))
-        self.info_text.configure(state="disabled")
-
-        # Botones: Pedir pista y Siguiente
-        frame_buttons = tk.Frame(self.tab_investigate, bg="#1c1c1c")
-        frame_buttons.pack(pady=10)
-
-        self.clue_button = tk.Button(frame_buttons, text="Pedir Pista", font=("Russo One", 14, "bold"),
-                                     bg="#444", fg="#f0b429", padx=18, pady=8, command=self.provide_clue)
-        self.clue_button.grid(row=0, column=0, padx=12)
-
-        self.btn_next_from_investigate = tk.Button(frame_buttons, text="Siguiente", font=("Russo One", 14, "bold"),
-                                                   bg="#f0b429", fg="#222", padx=18, pady=8, command=self.goto_guess_tab)
-        self.btn_next_from_investigate.grid(row=0, column=1, padx=12)
-
-        self.clues_label = tk.Label(self.tab_investigate, text="", font=("Helvetica", 13, "italic"),
-                                    fg="#f0b429", bg="#1c1c1c")
-        self.clues_label.pack(pady=5)
-
-        self.clues_text = tk.Text(self.tab_investigate, width=105, height=5, wrap="word", font=("Helvetica", 11),
-                                  bg="#333", fg="#eee", bd=0, relief=tk.FLAT)
-        self.clues_text.pack(padx=10, pady=(0,20))
-        self.clues_text.configure(state="disabled")
-
-        self.update_combo_values()
-
-    def on_select_choice(self):
-        selection = self.select_choice.get()
-        if not selection:
-            return
-        if self.clues_spent >= self.max_clues:
-            self.info_insert("\n\nYa no quedan pistas disponibles para interrogar.")
-            self.clue_button.config(state="disabled")
-            return
-        self.provide_interrogation_info()
-
-    def goto_guess_tab(self):
-        self.notebook.tab(2, state="normal")
-        self.notebook.select(self.tab_guess)
-
-    # ----- Pestaña Adivinanza -----
-    def create_guess_tab(self):
-        lbl_title = tk.Label(self.tab_guess, text="Adivinanza Final",
-                             font=("Russo One", 22, "bold"), fg="#f0b429", bg="#1c1c1c")
-        lbl_title.pack(pady=10)
-
-        frame_select = tk.Frame(self.tab_guess, bg="#1c1c1c")
-        frame_select.pack(pady=5, fill="x", padx=10)
-        frame_select.columnconfigure([0,1,2], weight=1)
-
-        self.guess_char_choice = ttk.Combobox(frame_select, values=self.characters, state="readonly", font=("Helvetica", 13))
-        self.guess_char_choice.grid(row=0, column=0, padx=10, pady=8)
-        self.guess_char_choice.set('')
-
-        self.guess_loc_choice = ttk.Combobox(frame_select, values=self.locations, state="readonly", font=("Helvetica", 13))
-        self.guess_loc_choice.grid(row=0, column=1, padx=10, pady=8)
-        self.guess_loc_choice.set('')
-
-        self.guess_weap_choice = ttk.Combobox(frame_select, values=self.weapons, state="readonly", font=("Helvetica", 13))
-        self.guess_weap_choice.grid(row=0, column=2, padx=10, pady=8)
-        self.guess_weap_choice.set('')
-
-        self.guess_button = tk.Button(self.tab_guess, text="Hacer Adivinanza", font=("Russo One", 16, "bold"),
-                                      bg="#f0b429", fg="#222", padx=30, pady=10, command=self.make_guess)
-        self.guess_button.pack(pady=15)
-
-        self.guess_result_text = tk.Text(self.tab_guess, width=105, height=15, wrap="word",
-                                         font=("Helvetica", 12), bg="#282828", fg="#f0f0f0", bd=0, relief=tk.FLAT)
-        self.guess_result_text.pack(padx=10, pady=10)
-        self.guess_result_text.configure(state="disabled")
-
-        self.btn_reset = tk.Button(self.tab_guess, text="Juego Nuevo", font=("Russo One", 14, "bold"),
-                                   bg="#222", fg="#f0b429", padx=25, pady=8, command=self.reset_to_story_tab)
-        self.btn_reset.pack(pady=10)
-
-    def reset_to_story_tab(self):
-        self.clues_spent = 0
-        self.hints_added.clear()
-        self.guess_result_text.configure(state="normal")
-        self.guess_result_text.delete("1.0", tk.END)
-        self.guess_result_text.configure(state="disabled")
-        self.info_text.configure(state="normal")
-        self.info_text.delete("1.0", tk.END)
-        self.info_text.configure(state="disabled")
-        self.clues_text.configure(state="normal")
-        self.clues_text.delete("1.0", tk.END)
-        self.clues_text.configure(state="disabled")
-        self.clues_label.config(text=f"Pistas disponibles: {self.max_clues}")
-        self.new_game()
-        self.notebook.tab(1, state="disabled")
-        self.notebook.tab(2, state="disabled")
-        self.notebook.select(self.tab_story)
-        self.clue_button.config(state="normal")
-        self.guess_button.config(state="normal")
-
-    def load_image(self, folder, item_name):
-        filename = item_name + ".png"
-        filepath = os.path.join(folder, filename)
-        if not os.path.isfile(filepath):
-            return None
-        img = Image.open(filepath)
-
-        # Mantener relación de aspecto redimensionando para que quepa en un cuadrado de 500x500
-        max_size = (500, 500)
-        img.thumbnail(max_size, Image.ANTIALIAS)
-
-        return ImageTk.PhotoImage(img)
-
-    def update_combo_values(self):
-        mode = self.mode_var.get()
-        self.info_text.configure(state="normal")
-        self.info_text.delete("1.0", tk.END)
-        self.info_text.configure(state="disabled")
-        self.select_image_label.config(image="", text="")
-
-        if mode == "Personajes":
-            values = self.characters
-            self.select_label.config(text="Seleccionar Personaje:")
-        elif mode == "Locaciones":
-            values = self.locations
-            self.select_label.config(text="Seleccionar Locación:")
-        else:
-            values = self.weapons
-            self.select_label.config(text="Seleccionar Arma:")
-
-        self.select_choice['values'] = values
-        self.select_choice.set('')  # No preseleccionado al cambiar de modo
-
-    def provide_interrogation_info(self):
-        if self.clues_spent >= self.max_clues:
-            self.info_insert("\n\nYa no quedan pistas disponibles para interrogar.")
-            self.clue_button.config(state="disabled")
-            return
-        selection = self.select_choice.get()
-        if not selection:
-            return
-        mode = self.mode_var.get()
-        text, image = "", None
-
-        if mode == "Personajes":
-            coartada = self.coartadas.get(selection)
-            if coartada:
-                text = f"Interrogando a {selection}:\n\n"
-                text += f"Coartada: {coartada['alibi']}\n"
-                text += "Lugares donde fue visto: " + ", ".join(coartada["places"]) + "\n"
-                text += "Armas asociadas o encontradas: " + ", ".join(coartada["weapons"]) + "\n"
-            image = self.load_image(self.char_img_path, selection)
-        elif mode == "Locaciones":
-            text = f"Información sobre la locación: {selection}\n\nPersonajes vistos aquí:\n"
-            chars_here = [c for c, data in self.coartadas.items() if selection in data['places']]
-            if chars_here:
-                text += ", ".join(chars_here)
-            else:
-                text += "Ninguno"
-            text += "\n\nArmas encontradas o asociadas aquí:\n"
-            weapons_here = set()
-            for c, data in self.coartadas.items():
-                if selection in data['places']:
-                    weapons_here.update(data['weapons'])
-            if weapons_here:
-                text += ", ".join(weapons_here)
-            else:
-                text += "Ninguna"
-            image = self.load_image(self.loc_img_path, selection)
-        else:
-            text = f"Información sobre el arma: {selection}\n\nPersonajes asociados con esta arma:\n"
-            holders = [c for c, data in self.coartadas.items() if selection in data['weapons']]
-            if holders:
-                text += ", ".join(holders)
-            else:
-                text += "Ninguno"
-            image = self.load_image(self.weap_img_path, selection)
-
-        self.info_text.configure(state="normal")
-        self.info_text.delete("1.0", tk.END)
-        self.info_text.insert(tk.END, text)
-        self.info_text.configure(state="disabled")
-
-        if image:
-            self.select_image_label.config(image=image)
-            self.select_image_label.image = image
-        else:
-            self.select_image_label.config(image="", text="No Img")
-
-        self.use_clue_on_interrogation()
-
-    def info_insert(self, text):
-        self.info_text.configure(state="normal")
-        self.info_text.insert(tk.END, text)
-        self.info_text.see(tk.END)
-        self.info_text.configure(state="disabled")
-
-    def use_clue_on_interrogation(self):
-        if self.clues_spent >= self.max_clues:
-            self.clue_button.config(state="disabled")
-            return
-        self.clues_spent += 1
-        self.clues_label.config(text=f"Pistas disponibles: {self.max_clues - self.clues_spent}")
-        if self.clues_spent >= self.max_clues:
-            self.clue_button.config(state="disabled")
-
-    def insert_investigate_clue(self, text):
-        self.clues_text.configure(state="normal")
-        self.clues_text.insert(tk.END, text)
-        self.clues_text.see(tk.END)
-        self.clues_text.configure(state="disabled")
-
-    def provide_clue(self):
-        if self.clues_spent >= self.max_clues:
-            self.clues_label.config(text=f"Pistas disponibles: 0")
-            self.insert_investigate_clue("\n\nYa no quedan pistas disponibles.")
-            self.clue_button.config(state="disabled")
-            return
-
-        possible_clues = []
-
-        for c in self.characters:
-            if c != self.solution['character'] and ("character:" + c) not in self.hints_added:
-                possible_clues.append(("personaje", c))
-
-        for l in self.locations:
-            if l != self.solution['location'] and ("location:" + l) not in self.hints_added:
-                possible_clues.append(("locacion", l))
-
-        for w in self.weapons:
-            if w != self.solution['weapon'] and ("weapon:" + w) not in self.hints_added:
-                possible_clues.append(("arma", w))
-
-        if not possible_clues:
-            self.clue_button.config(state="disabled")
-            self.insert_investigate_clue("\n\nYa no quedan pistas disponibles.")
-            return
-
-        clue_type, clue_value = random.choice(possible_clues)
-
-        if clue_type == "personaje":
-            clue_text = f"La persona culpable no es {clue_value}."
-            self.hints_added.add("character:" + clue_value)
-        elif clue_type == "locacion":
-            clue_text = f"No ocurrió en el lugar llamado {clue_value}."
-            self.hints_added.add("location:" + clue_value)
-        else:
-            clue_text = f"No se usó el arma {clue_value}."
-            self.hints_added.add("weapon:" + clue_value)
-
-        self.clues_spent += 1
-        self.clues_label.config(text=f"Pistas disponibles: {self.max_clues - self.clues_spent}")
-
-        self.insert_investigate_clue("\n\n" + clue_text)
-
-        if self.clues_spent >= self.max_clues:
-            self.clue_button.config(state="disabled")
-            self.insert_investigate_clue("\n\nHas agotado todas las pistas.\nSigue intentando hacer tu adivinanza.")
-
-    def make_guess(self):
-        guess_char = self.guess_char_choice.get()
-        guess_loc = self.guess_loc_choice.get()
-        guess_weap = self.guess_weap_choice.get()
-
-        if not guess_char or not guess_loc or not guess_weap:
-            self.guess_result_text.configure(state="normal")
-            self.guess_result_text.delete("1.0", tk.END)
-            self.guess_result_text.insert(tk.END, "Por favor, selecciona un Personaje, una Locación y un Arma para hacer la adivinanza.")
-            self.guess_result_text.configure(state="disabled")
-            return
-
-        correct = (guess_char == self.solution['character'] and
-                   guess_loc == self.solution['location'] and
-                   guess_weap == self.solution['weapon'])
-
-        self.guess_result_text.configure(state="normal")
-        self.guess_result_text.delete("1.0", tk.END)
-        if correct:
-            narrative = (
-                f"¡Felicidades! Has adivinado correctamente:\n\n"
-                f"🔸 Culpable: {self.solution['character']}\n"
-                f"🔸 Locación: {self.solution['location']}\n"
-                f"🔸 Arma: {self.solution['weapon']}\n\n"
-                "¡La verdad ha sido revelada! 🎉"
-            )
-            self.guess_result_text.insert(tk.END, narrative)
-            self.guess_button.config(state="disabled")
-            self.clue_button.config(state="disabled")
-        else:
-            narrative = (
-                f"Respuesta incorrecta.\n\n"
-                f"La verdad era:\n"
-                f"🔸 Culpable: {self.solution['character']}\n"
-                f"🔸 Locación: {self.solution['location']}\n"
-                f"🔸 Arma: {self.solution['weapon']}\n\n"
-                "Sigue investigando y no te rindas!"
-            )
-            self.guess_result_text.insert(tk.END, narrative)
-            self.guess_button.config(state="disabled")
-            self.clue_button.config(state="disabled")
-        self.guess_result_text.configure(state="disabled")
-
-    def new_game(self):
-        self.clues_spent = 0
-        self.hints_added.clear()
-
-        idx_character = random.randint(0, len(self.characters) - 1)
-        idx_location = random.randint(0, len(self.locations) - 1)
-        idx_weapon = random.randint(0, len(self.weapons) - 1)
-
-        self.solution['character'] = self.characters[idx_character]
-        self.solution['location'] = self.locations[idx_location]
-        self.solution['weapon'] = self.weapons[idx_weapon]
-
-        # Elegir víctima al azar distinta al culpable para la narrativa
-        victim = random.choice([c for c in self.characters if c != self.solution['character']])
-
-        # Elegir indicio para narrativa inicial sin revelar solución
-        # Puede ser personaje, locacion o arma que NO sea parte de la solución
-        clue_type = random.choice(["characters", "locations", "weapons"])
-        if clue_type == "characters":
-            clue_options = [c for c in self.characters if c != self.solution['character']]
-            clue_entity = random.choice(clue_options)
-        elif clue_type == "locations":
-            clue_options = [l for l in self.locations if l != self.solution['location']]
-            clue_entity = random.choice(clue_options)
-        else:
-            clue_options = [w for w in self.weapons if w != self.solution['weapon']]
-            clue_entity = random.choice(clue_options)
-
-        base_story = random.choice(self.stories)
-        indication_phrase = random.choice(self.clue_indications[clue_type]).format(clue_entity)
-
-        narrative = (
-            f"Una tragedia ha ocurrido: {victim} ha sido encontrado muerto.\n\n"
-            f"{base_story}\n{indication_phrase}\n\n"
-            "La investigación comienza y debes descubrir la verdad."
-        )
-
-        self.story_text.configure(state="normal")
-        self.story_text.delete("1.0", tk.END)
-        self.story_text.insert(tk.END, narrative)
-        self.story_text.configure(state="disabled")
-
-        self.mode_var.set("Personajes")
-        self.update_combo_values()
-
-        self.guess_char_choice.set('')
-        self.guess_loc_choice.set('')
-        self.guess_weap_choice.set('')
-
-        self.coartadas.clear()
-        for character in self.characters:
-            if character == self.solution['character']:
-                alibi = (f"Se sabe que {character} estuvo visto cerca de {self.solution['location']}, "
-                         f"aunque no hay pruebas claras de lo que hizo con {self.solution['weapon']}.")
-                places = [self.solution['location']]
-                weapons = [self.solution['weapon']]
-            else:
-                fake_loc = random.choice([l for l in self.locations if l != self.solution['location']])
-                fake_weap = random.choice([w for w in self.weapons if w != self.solution['weapon']])
-                alibi = f"Afirmó haber estado en {fake_loc} durante el incidente, y no portar ningún arma peculiar."
-                places = [fake_loc]
-                weapons = [fake_weap]
-
-            self.coartadas[character] = {
-                "alibi": alibi,
-                "places": places,
-                "weapons": weapons
-            }
-
-        self.clues_label.config(text=f"Pistas disponibles: {self.max_clues - self.clues_spent}")
-        self.clues_text.configure(state="normal")
-        self.clues_text.delete("1.0", tk.END)
-        self.clues_text.configure(state="disabled")
-
-        self.guess_result_text.configure(state="normal")
-        self.guess_result_text.delete("1.0", tk.END)
-        self.guess_result_text.configure(state="disabled")
-
-        self.notebook.tab(1, state="disabled")
-        self.notebook.tab(2, state="disabled")
-        self.clue_button.config(state="normal")
-        self.guess_button.config(state="normal")
-
-if __name__ == "__main__":
-    app = ClueGame()
-    app.mainloop()
+import time
+STARTUP_T0 = time.perf_counter()  # antes del resto de imports, para medir también su costo
+
+import tkinter as tk
+from tkinter import ttk
+import os
+import sys
+from array import array
+from clue_catalog import load_catalog, DEFAULT_CATALOG
+from clue_engine import ClueEngine
+from clue_pool import DealPool
+from clue_advisor import InformationAdvisor
+from clue_images import ImageCache, pillow
+from clue_atlas import SpriteAtlas
+from clue_assets import AssetCache
+from clue_widgets import SearchPicker
+from clue_snapshot import SnapshotWriter, dump_session, read_snapshot
+from clue_log import ActionLog
+from clue_render import RenderQueue
+from clue_hypothesis import iter_set_bits
+
+# Modo de medición de arranque: informa cuánto tarda en pintarse la pantalla de inicio y sale
+MEASURE_STARTUP = "--measure-startup" in sys.argv or bool(os.environ.get("CLUE_MEASURE_STARTUP"))
+# Modo solo texto: sin imágenes de fondo ni retratos; Pillow nunca se importa
+TEXT_ONLY = "--text-only" in sys.argv or bool(os.environ.get("CLUE_TEXT_ONLY"))
+# Medición de latencia de cada manejador de la interfaz, con resumen al salir (clue_latency.py)
+PROFILE_UI = "--profile-ui" in sys.argv or bool(os.environ.get("CLUE_PROFILE_UI"))
+
+
+def catalog_path():
+    # Edición temática: --catalog ruta.json o CLUE_CATALOG=ruta.json (por defecto, catalogs/marvel.json)
+    if "--catalog" in sys.argv[:-1]:
+        return sys.argv[sys.argv.index("--catalog") + 1]
+    return os.environ.get("CLUE_CATALOG", DEFAULT_CATALOG)
+
+
+def count_option(flag, variable, minimum):
+    # Cantidad de --opción N o VARIABLE=N, 0 si no se pide; se valida al arrancar para no fallar
+    # después dentro de un callback de la interfaz
+    if flag in sys.argv[:-1]:
+        value = sys.argv[sys.argv.index(flag) + 1]
+    else:
+        value = os.environ.get(variable, "0")
+    try:
+        count = int(value)
+    except ValueError:
+        count = -1
+    if count != 0 and count < minimum:
+        raise SystemExit(f"{flag} / {variable}: se esperaba 0 o un entero mayor o igual a {minimum}, no {value!r}")
+    return count
+
+
+def bot_count():
+    # Detectives de la computadora que investigan el mismo reparto: --bots N o CLUE_BOTS=N
+    return count_option("--bots", "CLUE_BOTS", 1)
+
+
+def card_players():
+    # Variante con cartas repartidas entre jugadores (tú y rivales): --cards N o CLUE_CARDS=N
+    return count_option("--cards", "CLUE_CARDS", 2)
+
+
+def autosave_path():
+    # Partida en curso, guardada tras cada acción; CLUE_AUTOSAVE=ruta para cambiar dónde
+    return os.environ.get("CLUE_AUTOSAVE", os.path.join(os.path.expanduser("~"), ".clue_marvel", "partida.clue"))
+
+
+def action_log_path():
+    # Registro de acciones para repetir partidas (clue_replay.py); CLUE_ACTION_LOG=ruta para cambiarlo
+    return os.environ.get("CLUE_ACTION_LOG",
+                          os.path.join(os.path.expanduser("~"), ".clue_marvel", "acciones.cluelog"))
+
+
+MODE_KINDS = {"Personajes": "characters", "Locaciones": "locations", "Armas": "weapons"}
+KIND_MODES = {kind: mode for mode, kind in MODE_KINDS.items()}
+
+class StartScreen(tk.Toplevel):
+    def __init__(self, master, start_callback, background_image_path=None, assets=None):
+        super().__init__(master)
+        self.start_callback = start_callback
+        self.title("Inicio - Juego Clue Marvel Edition")
+        self.geometry("900x600")
+        self.resizable(False, False)
+
+        if background_image_path and os.path.isfile(background_image_path):
+            # El fondo ya escalado queda en la caché de imágenes derivadas; Tk abre esa copia
+            # directamente, sin Pillow ni remuestreo, en todos los arranques menos el primero
+            cached = assets.scaled_ppm(background_image_path, (900, 600)) if assets is not None else None
+            if cached is not None:
+                self.bg_image = tk.PhotoImage(file=cached)
+            else:
+                Image, ImageTk = pillow()
+                img = Image.open(background_image_path)
+                img = img.resize((900, 600), Image.ANTIALIAS)
+                self.bg_image = ImageTk.PhotoImage(img)
+            self.background_label = tk.Label(self, image=self.bg_image)
+            self.background_label.place(x=0, y=0, relwidth=1, relheight=1)
+        else:
+            self.configure(bg="#1c1c1c")
+
+        overlay = tk.Frame(self, bg="#000000", bd=0, highlightthickness=0)
+        overlay.place(relx=0.5, rely=0.5, anchor="center")
+
+        welcome_label = tk.Label(overlay, text="Juego Clue - Adivina al Culpable (Marvel Edition)",
+                                 font=("Russo One", 25, "bold"), fg="#f0b429", bg="#000000", justify=tk.CENTER)
+        welcome_label.pack(pady=(0, 30))
+
+        start_button = tk.Button(overlay, text="Iniciar Juego", font=("Russo One", 16, "bold"),
+                                 bg="#f0b429", fg="#222", padx=20, pady=10, command=self.start_game)
+        start_button.pack()
+
+        # Cerrar el inicio cierra el juego entero, con el mismo cierre ordenado que la ventana
+        # principal (registro, guardado y bots)
+        self.protocol("WM_DELETE_WINDOW", self.master.on_close)
+
+    def start_game(self):
+        self.start_callback()
+        self.destroy()
+
+class ClueGame(tk.Tk):
+    def __init__(self):
+        self.init_t0 = time.perf_counter()
+        super().__init__()
+        self.title("Juego Clue - Adivina al Culpable (Marvel Edition)")
+        self.geometry("920x750")
+        self.configure(bg="#1c1c1c")
+        self.resizable(False, False)
+
+        self.withdraw()
+
+        # Los cambios de texto, etiquetas y botones se agrupan y se aplican una vez por evento
+        self.render = RenderQueue(self)
+
+        self.engine = ClueEngine.from_catalog(load_catalog(catalog_path()))
+        self.characters = self.engine.characters
+        self.locations = self.engine.locations
+        self.weapons = self.engine.weapons
+        # Repartos preparados en segundo plano para que "Juego Nuevo" sea instantáneo
+        self.deal_pool = DealPool(self.engine)
+        # Bots que juegan una ronda en otros procesos después de cada acción del jugador
+        # Sin --bots (ni --cards, más abajo) esos módulos no se importan: el arranque no los paga
+        bots = bot_count()
+        self.bot_table = None
+        if bots > 0:
+            from clue_bots import BotTable
+            self.bot_table = BotTable(self.engine, catalog_path(), bots)
+        # Variante con cartas (clue_cards.py): se reparte de nuevo con cada partida
+        self.card_players = card_players()
+        self.card_game = None
+        # La partida se guarda después de cada acción (en otro hilo) y se retoma al volver a abrir
+        self.autosave = SnapshotWriter(autosave_path())
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        try:
+            self.action_log = ActionLog.for_engine(self.engine, action_log_path())
+        except (OSError, ValueError):
+            self.action_log = None  # sin registro (p. ej. uno existente de otro catálogo)
+
+        self.image_base_path = "images"
+        self.char_img_path = os.path.join(self.image_base_path, "characters")
+        self.loc_img_path = os.path.join(self.image_base_path, "locations")
+        self.weap_img_path = os.path.join(self.image_base_path, "weapons")
+        self.img_paths = {"characters": self.char_img_path, "locations": self.loc_img_path,
+                          "weapons": self.weap_img_path}
+
+        # Imágenes escaladas en caché; se precargan en segundo plano para todo el catálogo,
+        # desde el atlas de sprites si fue construido (python clue_atlas.py)
+        # Mantener relación de aspecto redimensionando para que quepa en un cuadrado de 500x500
+        image_size, keep_aspect = (500, 500), True
+        self.image_cache = None
+        # Fondo y retratos ya escalados, guardados en disco entre arranques (clue_assets.py)
+        self.assets = AssetCache(os.path.join(self.image_base_path, ".cache"))
+        if not TEXT_ONLY and os.path.isdir(self.image_base_path):
+            atlas = SpriteAtlas.open(self.image_base_path, image_size, keep_aspect)
+            self.image_cache = ImageCache(size=image_size, keep_aspect=keep_aspect, atlas=atlas,
+                                          assets=self.assets)
+            self.image_cache.preload([(self.char_img_path, c) for c in self.characters] +
+                                     [(self.loc_img_path, l) for l in self.locations] +
+                                     [(self.weap_img_path, w) for w in self.weapons])
+
+        self.advisor = None  # se crea la primera vez que el jugador activa el asesor
+
+        # Crear notebook de pestañas
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Crear pestañas
+        self.tab_story = ttk.Frame(self.notebook)
+        self.tab_investigate = ttk.Frame(self.notebook)
+        self.tab_guess = ttk.Frame(self.notebook)
+
+        self.notebook.add(self.tab_story, text="Narrativa Inicial")
+        self.notebook.add(self.tab_investigate, text="Interrogar & Pistas")
+        self.notebook.add(self.tab_guess, text="Hacer Adivinanza")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Solo la narrativa se construye ahora; las otras pestañas empiezan deshabilitadas
+        # y se construyen la primera vez que se visitan, así la pantalla de inicio aparece antes
+        self.create_story_tab()
+        self.investigate_built = False
+        self.guess_built = False
+
+        # Inicio oculto hasta que termine start screen
+        self.withdraw()
+
+        start_bg_path = None if TEXT_ONLY else os.path.join("images", "start_background.png")
+        self.start_screen = StartScreen(self, self.start_after_screen, background_image_path=start_bg_path,
+                                        assets=self.assets)
+        self.start_screen.grab_set()
+        self.init_t1 = time.perf_counter()
+        if MEASURE_STARTUP:
+            self.start_screen.bind("<Expose>", self.on_start_screen_exposed)
+
+    def on_start_screen_exposed(self, event):
+        if event.widget is self.start_screen:
+            self.start_screen.unbind("<Expose>")
+            # Los widgets se redibujan en tareas ociosas; se mide cuando ya terminaron
+            self.start_screen.after_idle(self.report_startup)
+
+    def report_startup(self):
+        self.update_idletasks()
+        painted = time.perf_counter()
+        print(f"Imports: {(self.init_t0 - STARTUP_T0) * 1000:.1f} ms | "
+              f"ClueGame.__init__: {(self.init_t1 - self.init_t0) * 1000:.1f} ms | "
+              f"Pantalla de inicio pintada a los {(painted - STARTUP_T0) * 1000:.1f} ms")
+        self.on_close()
+
+    def start_after_screen(self):
+        self.deiconify()
+        if self.resume_saved_game():
+            return
+        self.new_game()
+        self.notebook.tab(1, state="disabled")
+        self.notebook.tab(2, state="disabled")
+        self.notebook.select(self.tab_story)
+
+    def resume_saved_game(self):
+        # Retoma la partida que quedó a medias al cerrar la ventana (o tras una caída)
+        session = read_snapshot(self.engine, self.autosave.path)
+        if session is None or session.finished:
+            return False
+        if session.card_players != self.card_players:
+            # Guardada con otra variante (con o sin cartas, u otra cantidad de jugadores): sus
+            # descartes no corresponden a las cartas que se repartirían ahora; se empieza otra
+            return False
+        self.show_narrative(self.engine.load_deal(session))
+        self.deal_bots()
+        self.deal_cards()
+        self.notebook.tab(1, state="disabled")
+        self.notebook.tab(2, state="disabled")
+        self.notebook.select(self.tab_story)
+        if session.history is not None:
+            self.goto_investigate_tab()
+            self.restore_investigate_tab()
+        return True
+
+    def save_game(self):
+        self.autosave.save(dump_session(self.engine, self.engine.session))
+
+    def on_close(self):
+        if self.bot_table is not None:
+            self.bot_table.close()
+        if self.image_cache is not None:
+            self.image_cache.close()
+        # Hashes nuevos que la precarga no llegó a guardar (p. ej. el fondo del inicio)
+        self.assets.save()
+        self.autosave.flush()
+        if self.action_log is not None:
+            self.action_log.close()
+        self.destroy()
+
+    def on_tab_changed(self, event):
+        if self.action_log is not None:
+            self.action_log.tab(self.engine.session, self.notebook.index("current"))
+
+    # ----- Pestaña Narrativa -----
+    def create_story_tab(self):
+        lbl_title = tk.Label(self.tab_story, text="Narrativa Inicial",
+                             font=("Russo One", 22, "bold"), fg="#f0b429", bg="#1c1c1c")
+        lbl_title.pack(pady=10)
+
+        self.story_text = tk.Text(self.tab_story, width=105, height=10, wrap="word",
+                                 font=("Helvetica", 13), bg="#282828", fg="#f0f0f0", bd=0, relief=tk.FLAT)
+        self.story_text.pack(padx=20, pady=10)
+        self.story_text.configure(state="disabled")
+
+        self.btn_next_from_story = tk.Button(self.tab_story, text="Siguiente", font=("Russo One", 16, "bold"),
+                                             bg="#f0b429", fg="#222", padx=25, pady=10, command=self.goto_investigate_tab)
+        self.btn_next_from_story.pack(pady=10)
+
+    def goto_investigate_tab(self):
+        if not self.investigate_built:
+            self.create_investigate_tab()
+            self.investigate_built = True
+            self.reset_investigate_tab()
+        self.notebook.tab(1, state="normal")
+        self.notebook.select(self.tab_investigate)
+
+    # ----- Pestaña Interrogatorios y Pistas -----
+    def create_investigate_tab(self):
+        lbl_title = tk.Label(self.tab_investigate, text="Interrogar Personajes, Armas o Locaciones",
+                             font=("Russo One", 20, "bold"), fg="#f0b429", bg="#1c1c1c")
+        lbl_title.pack(pady=8)
+
+        frame_mode = tk.Frame(self.tab_investigate, bg="#1c1c1c")
+        frame_mode.pack(pady=8)
+        self.mode_var = tk.StringVar(value="Personajes")
+
+        modes = ["Personajes", "Locaciones", "Armas"]
+        for i, m in enumerate(modes):
+            rb = tk.Radiobutton(frame_mode, text=m, variable=self.mode_var, value=m, font=("Helvetica", 13, "bold"),
+                                bg="#1c1c1c", fg="#f0b429", activebackground="#1c1c1c", activeforeground="#f0b429",
+                                selectcolor="#1c1c1c", command=self.update_combo_values)
+            rb.grid(row=0, column=i, padx=20, sticky="w")
+
+        frame_select = tk.Frame(self.tab_investigate, bg="#1c1c1c")
+        frame_select.pack(pady=5, fill="x", padx=10)
+        frame_select.columnconfigure(0, weight=1)
+
+        self.select_label = tk.Label(frame_select, text="Seleccionar Personaje:", font=("Helvetica", 13, "bold"), fg="#f0b429", bg="#1c1c1c")
+        self.select_label.grid(row=0, column=0, padx=10, sticky="w")
+
+        self.select_choice = SearchPicker(frame_select, font=("Helvetica", 12))
+        self.select_choice.grid(row=1, column=0, padx=10, sticky="ew")
+        self.select_choice.set('')  # No preseleccionado
+        self.select_choice.bind("<<ComboboxSelected>>", self.on_select_choice)
+
+        # Imagen y texto info
+        self.select_image_label = tk.Label(self.tab_investigate, bg="#1c1c1c")
+        self.select_image_label.pack(pady=8)
+        # Mientras el retrato se decodifica en segundo plano se muestra un recuadro vacío del
+        # mismo tamaño, así la pestaña no salta al llegar la imagen
+        self.portrait_placeholder = None
+        if self.image_cache is not None:
+            width, height = self.image_cache.size
+            self.portrait_placeholder = tk.PhotoImage(width=width, height=height)
+
+        self.info_text = tk.Text(self.tab_investigate, width=105, height=12, wrap="word", font=("Helvetica", 11),
+                                 bg="#333", fg="#eee", bd=0, relief=tk.FLAT)
+        self.info_text.pack(padx=10, pady=(0, 12))
+        self.info_text.configure(state="disabled")
+
+        # Botones: Pedir pista y Siguiente
+        frame_buttons = tk.Frame(self.tab_investigate, bg="#1c1c1c")
+        frame_buttons.pack(pady=10)
+
+        self.clue_button = tk.Button(frame_buttons, text="Pedir Pista", font=("Russo One", 14, "bold"),
+                                     bg="#444", fg="#f0b429", padx=18, pady=8, command=self.provide_clue)
+        self.clue_button.grid(row=0, column=0, padx=12)
+
+        self.btn_next_from_investigate = tk.Button(frame_buttons, text="Siguiente", font=("Russo One", 14, "bold"),
+                                                   bg="#f0b429", fg="#222", padx=18, pady=8, command=self.goto_guess_tab)
+        self.btn_next_from_investigate.grid(row=0, column=1, padx=12)
+
+        self.advisor_var = tk.BooleanVar(value=False)
+        advisor_check = tk.Checkbutton(frame_buttons, text="Mostrar asesor", variable=self.advisor_var,
+                                       font=("Helvetica", 12, "bold"), bg="#1c1c1c", fg="#f0b429",
+                                       activebackground="#1c1c1c", activeforeground="#f0b429",
+                                       selectcolor="#1c1c1c", command=self.update_advisor)
+        advisor_check.grid(row=0, column=2, padx=12)
+
+        self.clues_label = tk.Label(self.tab_investigate, text="", font=("Helvetica", 13, "italic"),
+                                    fg="#f0b429", bg="#1c1c1c")
+        self.clues_label.pack(pady=5)
+
+        self.advisor_label = tk.Label(self.tab_investigate, text="", font=("Helvetica", 11),
+                                      fg="#eee", bg="#1c1c1c", wraplength=880, justify=tk.LEFT)
+        self.advisor_label.pack(padx=10)
+
+        self.bots_label = tk.Label(self.tab_investigate, text="", font=("Helvetica", 11),
+                                   fg="#9fd3ff", bg="#1c1c1c", justify=tk.LEFT)
+        self.bots_label.pack(padx=10)
+
+        self.clues_text = tk.Text(self.tab_investigate, width=105, height=5, wrap="word", font=("Helvetica", 11),
+                                  bg="#333", fg="#eee", bd=0, relief=tk.FLAT)
+        self.clues_text.pack(padx=10, pady=(0,20))
+        self.clues_text.configure(state="disabled")
+
+        self.update_combo_values()
+
+    def on_select_choice(self, event):
+        selection = self.select_choice.get()
+        if not selection:
+            return
+        if not self.engine.has_clues_left():
+            self.info_insert("\n\nYa no quedan pistas disponibles para interrogar.")
+            self.render.configure(self.clue_button, state="disabled")
+            return
+        self.provide_interrogation_info()
+
+    def goto_guess_tab(self):
+        if not self.guess_built:
+            self.create_guess_tab()
+            self.guess_built = True
+            self.reset_guess_tab()
+        self.notebook.tab(2, state="normal")
+        self.notebook.select(self.tab_guess)
+
+    # ----- Pestaña Adivinanza -----
+    def create_guess_tab(self):
+        lbl_title = tk.Label(self.tab_guess, text="Adivinanza Final",
+                             font=("Russo One", 22, "bold"), fg="#f0b429", bg="#1c1c1c")
+        lbl_title.pack(pady=10)
+
+        frame_select = tk.Frame(self.tab_guess, bg="#1c1c1c")
+        frame_select.pack(pady=5, fill="x", padx=10)
+        frame_select.columnconfigure([0,1,2], weight=1)
+
+        self.guess_char_choice = SearchPicker(frame_select, values=self.characters, font=("Helvetica", 13))
+        self.guess_char_choice.grid(row=0, column=0, padx=10, pady=8)
+        self.guess_char_choice.set('')
+
+        self.guess_loc_choice = SearchPicker(frame_select, values=self.locations, font=("Helvetica", 13))
+        self.guess_loc_choice.grid(row=0, column=1, padx=10, pady=8)
+        self.guess_loc_choice.set('')
+
+        self.guess_weap_choice = SearchPicker(frame_select, values=self.weapons, font=("Helvetica", 13))
+        self.guess_weap_choice.grid(row=0, column=2, padx=10, pady=8)
+        self.guess_weap_choice.set('')
+
+        frame_guess_buttons = tk.Frame(self.tab_guess, bg="#1c1c1c")
+        frame_guess_buttons.pack(pady=15)
+
+        self.guess_button = tk.Button(frame_guess_buttons, text="Hacer Adivinanza", font=("Russo One", 16, "bold"),
+                                      bg="#f0b429", fg="#222", padx=30, pady=10, command=self.make_guess)
+        self.guess_button.grid(row=0, column=0, padx=12)
+
+        # En la variante con cartas, los mismos tres campos sirven para sugerir
+        self.suggest_button = None
+        if self.card_players:
+            self.suggest_button = tk.Button(frame_guess_buttons, text="Sugerir", font=("Russo One", 16, "bold"),
+                                            bg="#444", fg="#f0b429", padx=30, pady=10, command=self.suggest)
+            self.suggest_button.grid(row=0, column=1, padx=12)
+
+        self.guess_result_text = tk.Text(self.tab_guess, width=105, height=15, wrap="word",
+                                         font=("Helvetica", 12), bg="#282828", fg="#f0f0f0", bd=0, relief=tk.FLAT)
+        self.guess_result_text.pack(padx=10, pady=10)
+        self.guess_result_text.configure(state="disabled")
+
+        self.btn_reset = tk.Button(self.tab_guess, text="Juego Nuevo", font=("Russo One", 14, "bold"),
+                                   bg="#222", fg="#f0b429", padx=25, pady=8, command=self.reset_to_story_tab)
+        self.btn_reset.pack(pady=10)
+
+    def reset_to_story_tab(self):
+        # new_game limpia cada pestaña una sola vez y toma un reparto que ya estaba listo
+        self.new_game()
+        self.notebook.select(self.tab_story)
+
+    def update_combo_values(self):
+        mode = self.mode_var.get()
+        self.render.clear_text(self.info_text)
+        if self.image_cache is not None:
+            self.image_cache.cancel("portrait")
+        self.render.configure(self.select_image_label, image="", text="")
+
+        if mode == "Personajes":
+            values = self.characters
+            self.render.configure(self.select_label, text="Seleccionar Personaje:")
+        elif mode == "Locaciones":
+            values = self.locations
+            self.render.configure(self.select_label, text="Seleccionar Locación:")
+        else:
+            values = self.weapons
+            self.render.configure(self.select_label, text="Seleccionar Arma:")
+
+        self.select_choice['values'] = values
+        self.select_choice.set('')  # No preseleccionado al cambiar de modo
+
+    def provide_interrogation_info(self):
+        if not self.engine.has_clues_left():
+            self.info_insert("\n\nYa no quedan pistas disponibles para interrogar.")
+            self.render.configure(self.clue_button, state="disabled")
+            return
+        selection = self.select_choice.get()
+        if not selection:
+            return
+        kind = MODE_KINDS[self.mode_var.get()]
+        text = self.engine.interrogate(kind, selection)
+        self.show_interrogation(kind, selection, text)
+
+        self.use_clue_on_interrogation()
+        self.update_advisor()
+        self.save_game()
+        self.play_bots()
+
+    def show_interrogation(self, kind, selection, text):
+        self.render.set_text(self.info_text, text)
+        if self.image_cache is None:
+            self.show_portrait(None)
+        elif not self.image_cache.get_async(self, "portrait", self.img_paths[kind], selection,
+                                            self.show_portrait):
+            # Se decodifica fuera del hilo de Tk; si el jugador elige otra cosa antes, se descarta
+            self.render.configure(self.select_image_label, image=self.portrait_placeholder, text="")
+
+    def show_portrait(self, image):
+        if image:
+            self.render.configure(self.select_image_label, image=image, text="")
+            self.select_image_label.image = image
+        elif TEXT_ONLY:
+            self.render.configure(self.select_image_label, image="", text="")
+        else:
+            self.render.configure(self.select_image_label, image="", text="No Img")
+
+    def info_insert(self, text):
+        self.render.append_text(self.info_text, text)
+
+    def update_advisor(self):
+        if not self.investigate_built:
+            return
+        if not self.advisor_var.get():
+            if self.advisor is not None:
+                self.advisor.detach()
+            self.render.configure(self.advisor_label, text="")
+            return
+        if self.advisor is None:
+            self.advisor = InformationAdvisor(self.engine)
+        else:
+            self.advisor.attach()
+        self.render.configure(self.advisor_label, text=self.advisor.summary())
+
+    def use_clue_on_interrogation(self):
+        # El motor ya descontó la pista del interrogatorio; solo se refleja en la interfaz
+        self.render.configure(self.clues_label, text=f"Pistas disponibles: {self.engine.clues_left()}")
+        if not self.engine.has_clues_left():
+            self.render.configure(self.clue_button, state="disabled")
+
+    def insert_investigate_clue(self, text):
+        self.render.append_text(self.clues_text, text)
+
+    def provide_clue(self):
+        if not self.engine.has_clues_left():
+            self.render.configure(self.clues_label, text=f"Pistas disponibles: 0")
+            self.insert_investigate_clue("\n\nYa no quedan pistas disponibles.")
+            self.render.configure(self.clue_button, state="disabled")
+            return
+
+        clue_text = self.engine.provide_clue()
+        if clue_text is None:
+            self.render.configure(self.clue_button, state="disabled")
+            self.insert_investigate_clue("\n\nYa no quedan pistas disponibles.")
+            return
+
+        self.render.configure(self.clues_label, text=f"Pistas disponibles: {self.engine.clues_left()}")
+
+        self.insert_investigate_clue("\n\n" + clue_text)
+        self.update_advisor()
+        self.save_game()
+        self.play_bots()
+
+        if not self.engine.has_clues_left():
+            self.render.configure(self.clue_button, state="disabled")
+            self.insert_investigate_clue("\n\nHas agotado todas las pistas.\nSigue intentando hacer tu adivinanza.")
+
+    def make_guess(self):
+        guess_char = self.guess_char_choice.get()
+        guess_loc = self.guess_loc_choice.get()
+        guess_weap = self.guess_weap_choice.get()
+
+        if not guess_char or not guess_loc or not guess_weap:
+            self.render.set_text(self.guess_result_text, "Por favor, selecciona un Personaje, una Locación y un Arma para hacer la adivinanza.")
+            return
+
+        self.engine.make_guess(guess_char, guess_loc, guess_weap)
+
+        narrative = self.engine.guess_narrative()
+        if self.bot_table is not None and self.bot_table.winner is not None:
+            narrative += f"\n\n{self.bot_table.winner.name} resolvió el caso antes que tú."
+        self.render.set_text(self.guess_result_text, narrative)
+        self.render.configure(self.guess_button, state="disabled")
+        self.render.configure(self.clue_button, state="disabled")
+        if self.suggest_button is not None:
+            self.render.configure(self.suggest_button, state="disabled")
+        self.save_game()
+
+    def new_game(self):
+        self.show_narrative(self.engine.load_deal(*self.deal_pool.take()))
+        self.deal_bots()
+        self.deal_cards()
+        self.save_game()
+
+        # Las pestañas que todavía no se construyeron no tienen nada que limpiar
+        if self.investigate_built:
+            self.reset_investigate_tab()
+        if self.guess_built:
+            self.reset_guess_tab()
+
+        self.notebook.tab(1, state="disabled")
+        self.notebook.tab(2, state="disabled")
+
+    # ----- Detectives de la computadora -----
+    def deal_bots(self):
+        if self.bot_table is not None:
+            self.bot_table.deal(self.engine.session)
+            self.show_bots(self.bot_table)
+
+    def play_bots(self):
+        # La ronda corre en otros procesos; show_bots llega después por after()
+        if self.bot_table is not None and not self.engine.session.finished:
+            self.bot_table.play_round(self, self.show_bots)
+
+    def show_bots(self, table):
+        if self.investigate_built:
+            self.render.configure(self.bots_label, text=table.describe(KIND_MODES))
+
+    # ----- Variante con cartas -----
+    def player_name(self, player):
+        return "Tú" if player == 0 else f"Jugador {player + 1}"
+
+    def card_name(self, card):
+        kind, index = self.card_game.split_card(card)
+        return self.engine.catalog(kind)[index]
+
+    def deal_cards(self):
+        if not self.card_players:
+            return
+        from clue_cards import CardGame
+        session = self.engine.session
+        session.card_players = self.card_players
+        self.card_game = CardGame.for_session(self.engine, session, self.card_players)
+        # Cartas del sobre que el espacio de hipótesis del motor todavía considera posibles
+        self.envelope_synced = self.card_game.all_cards
+        # Partida retomada: el reparto y las jugadas de los rivales salen de la semilla, así que
+        # repetir las sugerencias guardadas deja las hojas como estaban
+        suggestions = session.suggestions if session.suggestions is not None else ()
+        for i in range(0, len(suggestions), 3):
+            self.play_card_round(tuple(suggestions[i:i + 3]))
+        self.sync_card_sheet()
+        hand = ", ".join(self.card_name(card) for card in iter_set_bits(self.card_game.hands[0]))
+        self.render.append_text(self.story_text, f"\n\nJuegas con {self.card_players - 1} rivales. "
+                                                 f"Tus cartas: {hand}.")
+        if suggestions:
+            self.render.append_text(self.story_text, f" Llevas {len(suggestions) // 3} sugerencias.")
+
+    def sync_card_sheet(self):
+        # Lo que la hoja del jugador descartó del sobre se descarta también en el motor, así el
+        # asesor y el conteo de tríos posibles reflejan las refutaciones
+        sheet = self.card_game.sheets[0]
+        possible = sheet.can_hold[sheet.envelope]
+        removed = self.envelope_synced & ~possible
+        self.envelope_synced = possible
+        for card in iter_set_bits(removed):
+            kind, index = self.card_game.split_card(card)
+            self.engine.exclude(kind, index)
+
+    def suggest(self):
+        names = (self.guess_char_choice.get(), self.guess_loc_choice.get(), self.guess_weap_choice.get())
+        triple = tuple(self.engine.index[kind].get(name) for kind, name in zip(MODE_KINDS.values(), names))
+        if None in triple:
+            self.render.set_text(self.guess_result_text, "Por favor, selecciona un Personaje, una Locación y un Arma para sugerir.")
+            return
+
+        session = self.engine.session
+        if session.suggestions is None:
+            session.suggestions = array("I")
+        session.suggestions.extend(triple)
+        lines = self.play_card_round(triple)
+
+        game = self.card_game
+        self.sync_card_sheet()
+        sheet = game.sheets[0]
+        counts = [sheet.envelope_possible(kind).bit_count() for kind in MODE_KINDS.values()]
+        lines.append(f"\nTu hoja: en el sobre pueden estar {counts[0]} personajes, {counts[1]} locaciones "
+                     f"y {counts[2]} armas ({self.engine.remaining_candidates()} tríos posibles).")
+        if game.winner is not None:
+            # Ganó un rival: la partida terminó y no se retoma al volver a abrir
+            session.finished = True
+            solution = self.engine.solution
+            lines.append(f"La verdad era: {solution['character']}, en {solution['location']}, "
+                         f"con {solution['weapon']}.")
+            self.render.configure(self.guess_button, state="disabled")
+            self.render.configure(self.suggest_button, state="disabled")
+        self.render.set_text(self.guess_result_text, "\n".join(lines))
+        self.update_advisor()
+        self.save_game()
+
+    def play_card_round(self, triple):
+        # Tu sugerencia y los turnos de los rivales hasta que vuelva a tocarte o alguien acierte;
+        # devuelve las líneas que lo cuentan
+        game = self.card_game
+        names = ", ".join(self.engine.catalog(kind)[index] for kind, index in zip(MODE_KINDS.values(), triple))
+        game.turn = 0
+        refuter, card = game.suggest(0, triple)
+        if refuter is None:
+            lines = [f"Sugeriste {names}: nadie pudo refutarlo."]
+        else:
+            lines = [f"Sugeriste {names}: {self.player_name(refuter)} te mostró {self.card_name(card)}."]
+
+        player = game.next_player()
+        while player not in (0, None) and not game.finished:
+            move, rival_triple, result = game.play_turn(player)
+            rival_names = ", ".join(self.engine.catalog(kind)[index] for kind, index in zip(MODE_KINDS.values(), rival_triple))
+            if move == "accuse":
+                if result:
+                    lines.append(f"{self.player_name(player)} acusó a {rival_names} y acertó.")
+                else:
+                    lines.append(f"{self.player_name(player)} acusó a {rival_names} y se equivocó.")
+            elif result[0] is None:
+                lines.append(f"{self.player_name(player)} sugirió {rival_names}: nadie pudo refutarlo.")
+            else:
+                lines.append(f"{self.player_name(player)} sugirió {rival_names}: lo refutó {self.player_name(result[0])}.")
+            player = game.next_player()
+        return lines
+
+    def show_narrative(self, narrative):
+        self.render.set_text(self.story_text, narrative)
+
+    def reset_investigate_tab(self):
+        self.mode_var.set("Personajes")
+        self.update_combo_values()
+
+        self.render.configure(self.clues_label, text=f"Pistas disponibles: {self.engine.clues_left()}")
+        self.render.clear_text(self.clues_text)
+        self.render.configure(self.clue_button, state="normal")
+        self.update_advisor()
+        if self.bot_table is not None:
+            self.show_bots(self.bot_table)
+
+    def restore_investigate_tab(self):
+        # Vuelve a mostrar las pistas y el último interrogatorio de una partida retomada
+        last_interrogation = None
+        last_was_clue = False
+        for kind, index, is_clue in self.engine.history():
+            if is_clue:
+                self.insert_investigate_clue("\n\n" + self.engine.clue_text(kind, index))
+            else:
+                last_interrogation = kind, index
+            last_was_clue = is_clue
+        if last_interrogation is not None:
+            kind, index = last_interrogation
+            self.mode_var.set(KIND_MODES[kind])
+            self.update_combo_values()
+            selection = self.engine.catalog(kind)[index]
+            self.select_choice.set(selection)
+            self.show_interrogation(kind, selection, self.engine.interrogation_text(kind, index))
+        self.use_clue_on_interrogation()
+        self.update_advisor()
+        if last_was_clue and not self.engine.has_clues_left():
+            self.insert_investigate_clue("\n\nHas agotado todas las pistas.\nSigue intentando hacer tu adivinanza.")
+
+    def reset_guess_tab(self):
+        self.guess_char_choice.set('')
+        self.guess_loc_choice.set('')
+        self.guess_weap_choice.set('')
+
+        self.render.clear_text(self.guess_result_text)
+        self.render.configure(self.guess_button, state="normal")
+        if self.suggest_button is not None:
+            self.render.configure(self.suggest_button, state="normal")
+
+if __name__ == "__main__":
+    if PROFILE_UI:
+        # Tiene que instalarse antes de crear los widgets; sin la opción no se importa
+        from clue_latency import FRAME_BUDGET_MS, install
+        profiler = install(float(os.environ.get("CLUE_FRAME_BUDGET_MS", FRAME_BUDGET_MS)))
+    app = ClueGame()
+    if PROFILE_UI:
+        app.render.current_action = profiler.current_handler
+        profiler.sections.append(app.render.summary)
+    app.mainloop()
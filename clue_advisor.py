@@ -0,0 +1,250 @@
+import math
+
+from clue_engine import KINDS
+from clue_hypothesis import iter_set_bits, repeat_bits
+
+# Asesor de interrogatorios: ordena qué personaje, locación o arma conviene interrogar
+# según la reducción esperada de entropía sobre las soluciones que siguen siendo posibles
+# (estrategia de árboles de decisión, ver "Arboles de decicion Clue.pdf").
+#
+# Para que refrescar la recomendación sea barato aunque los catálogos sean enormes, el asesor
+# escucha al espacio de hipótesis y mantiene incrementalmente cuántos tríos posibles contienen
+# a cada entidad. La ganancia solo depende de ese conteo, así que las entidades se agrupan por
+# (tipo, conteo) y en cada refresco se evalúa un grupo en lugar de cada entidad. Cada grupo es
+# un campo de bits con un bit por entidad. Con el espacio factorizado de los catálogos grandes
+# (clue_hypothesis.FactoredSpace) no hace falta escuchar: todas las entidades vivas de un tipo
+# están en el mismo número de tríos y los grupos salen directo del espacio en cada refresco.
+#
+# Los descartes se cuentan con aritmética de máscaras y no bit por bit: los tríos descartados se
+# parten en bloques de personaje (L·W bits), partiendo a la mitad y saltando las mitades vacías,
+# y los bloques se suman en contadores "por rebanadas de bits" (el plano j guarda el bit j de cada
+# contador de posición (l, w)). De los planos salen los descuentos de cada locación (una fila de
+# W bits) y de cada arma (una columna) con unos pocos bit_count por entidad.
+
+KIND_LABELS = {"characters": "Personaje", "locations": "Locación", "weapons": "Arma"}
+TAIL_SD = 12  # desvíos estándar de la binomial que se suman a cada lado de la media
+
+
+def expected_log_share(n, p, alive, single=0.0):
+    # E[log2(1 - K / alive + single·[K = 1])] con K ~ Binomial(n, p): fracción (en bits) que
+    # queda de un tipo cuando se descartan K de sus `alive` entidades vivas; `single` es lo que
+    # vuelve a sumarse si se descarta exactamente una (la caja "fue aquí" sigue posible). Se
+    # suman solo los términos a TAIL_SD desvíos de la media; el resto pesa menos que 1e-30.
+    if n <= 0 or p <= 0 or alive <= 1:
+        return 0.0
+    p = min(p, 1.0)
+    if p == 1.0:
+        return math.log2(max(1 - n / alive, 1 / alive) + single * (n == 1))
+    mean = n * p
+    spread = TAIL_SD * math.sqrt(mean * (1 - p)) + TAIL_SD
+    log_p, log_q = math.log(p), math.log1p(-p)
+    log_n = math.lgamma(n + 1)
+    total = 0.0
+    for k in range(max(0, int(mean - spread)), min(n, int(mean + spread)) + 1):
+        weight = math.exp(log_n - math.lgamma(k + 1) - math.lgamma(n - k + 1) + k * log_p + (n - k) * log_q)
+        total += weight * math.log2(max(1 - k / alive, 1 / alive) + single * (k == 1))
+    return total
+
+
+class InformationAdvisor:
+    def __init__(self, engine):
+        self.engine = engine
+        self.sizes = {kind: len(engine.catalog(kind)) for kind in KINDS}
+        self.counts = {}
+        self.groups = {}  # tipo -> {conteo: campo de bits de las entidades con ese conteo}
+        self.alive = {}
+        self.watching = False
+        n_locations, n_weapons = self.sizes["locations"], self.sizes["weapons"]
+        self.block = n_locations * n_weapons
+        self.row = (1 << n_weapons) - 1
+        self.column = repeat_bits(1, n_weapons, n_locations)  # arma 0 en cada fila de un bloque
+        self.attach()
+
+    def attach(self):
+        # Con el espacio denso, escucha los descartes (se sincroniza con lo ya descartado)
+        if self.engine.space.dense and not self.watching:
+            self.watching = True
+            self.engine.space.watch(self)
+
+    def detach(self):
+        # Con el asesor oculto nadie mira la recomendación: deja de pagar cada descarte
+        if self.watching:
+            self.watching = False
+            self.engine.space.unwatch(self)
+
+    def refresh(self):
+        # Con el espacio factorizado, cada entidad viva está en el producto de los otros tipos
+        space = self.engine.space
+        if space.dense:
+            return
+        bits = {kind: space.alive(kind) for kind in KINDS}
+        alive = {kind: bits[kind].bit_count() for kind in KINDS}
+        for kind in KINDS:
+            count = space.remaining // alive[kind] if alive[kind] else 0
+            self.alive[kind] = alive[kind]
+            self.groups[kind] = {count: bits[kind]} if count else {}
+
+    # ----- Mantenimiento incremental -----
+    def on_reset(self):
+        size = self.engine.space.size
+        for kind in KINDS:
+            n = self.sizes[kind]
+            per_entity = size // n
+            self.counts[kind] = [per_entity] * n
+            self.groups[kind] = {per_entity: (1 << n) - 1}
+            self.alive[kind] = n
+
+    def on_remove(self, removed):
+        block = self.block
+        dec_c = {}
+        planes = []
+        # Bloques de personaje no vacíos: (personaje inicial, cantidad de bloques, bits)
+        pending = [(0, self.sizes["characters"], removed)]
+        while pending:
+            start, count, bits = pending.pop()
+            if count > 1:
+                half = count >> 1
+                low = bits & ((1 << (half * block)) - 1)
+                if low:
+                    pending.append((start, half, low))
+                high = bits >> (half * block)
+                if high:
+                    pending.append((start + half, count - half, high))
+                continue
+            dec_c[start] = bits.bit_count()
+            # Suma el bloque a los contadores: como un contador binario, cada acarreo sube un plano
+            carry, j = bits, 0
+            while carry:
+                if j == len(planes):
+                    planes.append(0)
+                planes[j], carry = planes[j] ^ carry, planes[j] & carry
+                j += 1
+
+        dec_l, dec_w = {}, {}
+        n_weapons = self.sizes["weapons"]
+        for l in range(self.sizes["locations"]):
+            amount = sum(((plane >> (l * n_weapons)) & self.row).bit_count() << j for j, plane in enumerate(planes))
+            if amount:
+                dec_l[l] = amount
+        for w in range(n_weapons):
+            column = self.column << w
+            amount = sum((plane & column).bit_count() << j for j, plane in enumerate(planes))
+            if amount:
+                dec_w[w] = amount
+        decrements = {"characters": dec_c, "locations": dec_l, "weapons": dec_w}
+
+        for kind in KINDS:
+            counts = self.counts[kind]
+            groups = self.groups[kind]
+            for index, amount in decrements[kind].items():
+                old = counts[index]
+                new = old - amount
+                counts[index] = new
+                bit = 1 << index
+                group = groups[old] ^ bit
+                if group:
+                    groups[old] = group
+                else:
+                    del groups[old]
+                if new:
+                    groups[new] = groups.get(new, 0) | bit
+                else:
+                    self.alive[kind] -= 1
+
+    # ----- Puntuación -----
+    def expected_gain(self, kind, count):
+        # Ganancia esperada (en bits) de interrogar una entidad contenida en `count` tríos posibles:
+        # entropía actual menos la esperanza de la entropía después, sobre los resultados posibles
+        # del interrogatorio según el modelo de coartadas del reparto (ver clue_engine.alibi_of).
+        # Con probabilidad p = count / total la entidad es parte de la solución:
+        #
+        #     personaje: la coartada del culpable se distingue y delata el trío (0 bits)
+        #     locación:  se ve solo al culpable con el arma del crimen, igual que en una locación
+        #                con un único visto: se descartan la locación, el visto y su arma, y el
+        #                trío de la caja "fue aquí" sigue posible
+        #     arma:      la porta solo el culpable: quedan los ~count/vivos_c tríos de la caja
+        #                "fue con esta" más los de afuera sin él
+        #
+        # Si no (1 - p), se descarta la entidad (quedan total - count tríos) y además lo que muestre:
+        #
+        #     personaje: su coartada nombra una locación y un arma que no son la solución, al azar;
+        #                cada una sigue viva con probabilidad (vivas - 1) / (catálogo - 1)
+        #     locación:  cada personaje vivo (no culpable) fue visto ahí con prob. 1 / (L - 1), y
+        #                cada arma viva (no del crimen) aparece con prob. 1 - (1 - 1/((L-1)(W-1)))^(C-1)
+        #     arma:      cada personaje vivo (no culpable) la porta con probabilidad 1 / (W - 1); con
+        #                un único portador, la caja "fue con esta" sigue posible
+        #
+        # Aproximaciones (y sus cotas): los tríos posibles se toman como equiprobables y repartidos
+        # por igual entre las entidades vivas de cada tipo, así descartar k de ellas deja la
+        # fracción 1 - k/vivas. Es exacto con el espacio factorizado y con el denso hasta el primer
+        # interrogatorio de locación o arma, que acopla los tipos. Las armas encontradas en una
+        # locación se cuentan como binomiales independientes de los personajes vistos, y el único
+        # trío de la caja "fue aquí" de una locación que no es la del crimen se ignora (sobrestima
+        # la ganancia en a lo sumo log2(1 + 1 / restantes) bits).
+        total = self.engine.space.remaining
+        if total <= 1 or count == 0:
+            return 0.0
+        p = count / total
+        alive_c = self.alive["characters"]
+        alive_l = self.alive["locations"]
+        alive_w = self.alive["weapons"]
+        n_c = self.sizes["characters"]
+        n_l = self.sizes["locations"]
+        n_w = self.sizes["weapons"]
+        remaining_out = total - count
+        share_c = 1 - 1 / alive_c
+        share_w = 1 - 1 / alive_w
+
+        if kind == "characters":
+            entropy_in = 0.0
+        elif kind == "locations":
+            entropy_in = math.log2(remaining_out * share_c * share_w + 1)
+        else:
+            entropy_in = math.log2(remaining_out * share_c + count / alive_c)
+        if remaining_out < 1:
+            return math.log2(total) - p * entropy_in
+
+        entropy_out = math.log2(remaining_out)
+        if kind == "characters":
+            entropy_out += expected_log_share(1, (alive_l - 1) / max(n_l - 1, 1), alive_l)
+            entropy_out += expected_log_share(1, (alive_w - 1) / max(n_w - 1, 1), alive_w)
+        elif kind == "locations":
+            entropy_out += expected_log_share(alive_c - 1, 1 / max(n_l - 1, 1), alive_c)
+            found = 1 - (1 - 1 / max((n_l - 1) * (n_w - 1), 1)) ** (n_c - 1)
+            entropy_out += expected_log_share(alive_w - 1, found, alive_w)
+        else:
+            entropy_out += expected_log_share(alive_c - 1, 1 / max(n_w - 1, 1), alive_c,
+                                              count / alive_c / remaining_out)
+        return math.log2(total) - p * entropy_in - (1 - p) * max(entropy_out, 0.0)
+
+    def ranking(self, top=3):
+        # Devuelve hasta `top` recomendaciones como (ganancia_bits, tipo, nombre)
+        if self.engine.space.remaining <= 1:
+            return []
+        self.refresh()
+        scored = []
+        for kind in KINDS:
+            for count in self.groups[kind]:
+                scored.append((self.expected_gain(kind, count), kind, count))
+        # Empates: orden de los tipos y después el conteo; dentro de un grupo, por índice
+        scored.sort(key=lambda item: (-item[0], KINDS.index(item[1]), -item[2]))
+
+        result = []
+        for gain, kind, count in scored:
+            if gain <= 0:
+                break
+            interrogated = self.engine.kind_bits(self.engine.session.interrogated, kind)
+            catalog = self.engine.catalog(kind)
+            for index in iter_set_bits(self.groups[kind][count] & ~interrogated):
+                result.append((gain, kind, catalog[index]))
+                if len(result) >= top:
+                    return result
+        return result
+
+    def summary(self, top=3):
+        ranking = self.ranking(top)
+        if not ranking:
+            return "Asesor: ya no hay nada más que averiguar interrogando."
+        options = [f"{position}) {KIND_LABELS[kind]}: {name} ({gain:.2f} bits)"
+                   for position, (gain, kind, name) in enumerate(ranking, start=1)]
+        return "Asesor - conviene interrogar:  " + "   ".join(options)
@@ -0,0 +1,148 @@
+import hashlib
+import io
+import json
+import os
+import struct
+import threading
+
+from clue_images import decode_scaled, pillow
+from clue_snapshot import write_atomic
+
+# Caché en disco de imágenes derivadas (el fondo de la pantalla de inicio escalado a 900x600 y
+# los retratos escalados), para no volver a decodificar y remuestrear en cada arranque. Cada
+# entrada se identifica por el hash del archivo fuente y el tamaño pedido:
+#
+#     images/.cache/<hash>_<ancho>x<alto>[_aspect].ppm    fondo opaco; Tk lo lee sin Pillow
+#     images/.cache/<hash>_<ancho>x<alto>[_aspect].rgba   retrato: cabecera + píxeles RGBA crudos
+#
+# Para no leer el archivo fuente completo en cada arranque, index.json recuerda el hash de cada
+# fuente junto a su fecha de modificación y tamaño; solo se vuelve a calcular si cambian. Los
+# hashes nuevos quedan en memoria y save() guarda el índice una vez por tanda (al terminar la
+# precarga y al cerrar); ahí también se borran las entradas de fuentes que cambiaron o
+# desaparecieron. Todo se escribe en un temporal y se reemplaza (clue_snapshot.write_atomic), así
+# una caché a medio escribir nunca se lee.
+
+INDEX_FILENAME = "index.json"
+HASH_LENGTH = 20
+RGBA_MAGIC = b"CLRGBA\x01\x00"
+RGBA_HEADER = struct.Struct("<8sII")
+
+
+def entry_name(digest, size, keep_aspect, extension):
+    name = f"{digest[:HASH_LENGTH]}_{size[0]}x{size[1]}"
+    return (name + "_aspect" if keep_aspect else name) + "." + extension
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AssetCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # una sola limpieza a la vez; no frena source_hash
+        self._index = None  # ruta absoluta de la fuente -> [mtime_ns, tamaño, hash]
+        self._dirty = False  # hay hashes nuevos que save() todavía no guardó
+
+    # ----- Índice de fuentes -----
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_FILENAME), encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def source_hash(self, source):
+        # Hash de la fuente; se recalcula solo si cambió su fecha o su tamaño
+        source = os.path.abspath(source)
+        stat = os.stat(source)
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        with self._lock:
+            index = self._load_index()
+            known = index.get(source)
+            if known is not None and known[:2] == stamp:
+                return known[2]
+        digest = file_hash(source)
+        with self._lock:
+            self._load_index()[source] = stamp + [digest]
+            self._dirty = True
+        return digest
+
+    def save(self):
+        # Si hubo hashes nuevos: quita del índice las fuentes que ya no existen, lo guarda y
+        # borra las entradas cuyo hash no es el actual de ninguna fuente
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                index = dict(self._index)
+            gone = [source for source in index if not os.path.isfile(source)]
+            for source in gone:
+                del index[source]
+            try:
+                write_atomic(os.path.join(self.directory, INDEX_FILENAME), json.dumps(index).encode("utf-8"))
+                names = os.listdir(self.directory)
+            except OSError:
+                return  # sin permisos de escritura: el hash se recalcula en cada arranque
+            with self._lock:
+                for source in gone:
+                    self._index.pop(source, None)
+                # Del índice en memoria y después de listar: una entrada recién escrita ya tiene
+                # su hash ahí aunque haya llegado después de la copia que se guardó
+                current = {known[2][:HASH_LENGTH] for known in self._index.values()}
+            for name in names:
+                # Los .tmp pueden ser escrituras en curso de otro hilo
+                if name == INDEX_FILENAME or name.endswith(".tmp") or name.split("_", 1)[0] in current:
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    # ----- Imágenes derivadas -----
+    def scaled_ppm(self, source, size, keep_aspect=False):
+        # Ruta de la versión escalada y opaca (PPM, que tk.PhotoImage abre sin Pillow); la
+        # primera vez se genera con Pillow. None si no se pudo escribir la caché.
+        try:
+            path = os.path.join(self.directory, entry_name(self.source_hash(source), size, keep_aspect, "ppm"))
+            if not os.path.isfile(path):
+                buffer = io.BytesIO()
+                decode_scaled(source, size, keep_aspect).convert("RGB").save(buffer, "PPM")
+                write_atomic(path, buffer.getvalue())
+        except OSError:
+            return None
+        return path
+
+    def warm_image(self, source, size, keep_aspect=False):
+        # Genera la entrada RGBA de scaled_image si falta, sin leerla si ya está
+        path = os.path.join(self.directory, entry_name(self.source_hash(source), size, keep_aspect, "rgba"))
+        if not os.path.isfile(path):
+            self.scaled_image(source, size, keep_aspect)
+
+    def scaled_image(self, source, size, keep_aspect=False):
+        # Imagen PIL escalada (RGBA), leída de la caché o generada y guardada
+        Image, _ = pillow()
+        path = os.path.join(self.directory, entry_name(self.source_hash(source), size, keep_aspect, "rgba"))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, width, height = RGBA_HEADER.unpack_from(data)
+            if magic == RGBA_MAGIC and len(data) == RGBA_HEADER.size + 4 * width * height:
+                pixels = memoryview(data)[RGBA_HEADER.size:]
+                return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+        except (OSError, struct.error):
+            pass
+        img = decode_scaled(source, size, keep_aspect).convert("RGBA")
+        try:
+            write_atomic(path, RGBA_HEADER.pack(RGBA_MAGIC, img.width, img.height) + img.tobytes())
+        except OSError:
+            pass
+        return img
@@ -0,0 +1,121 @@
+import argparse
+import json
+import mmap
+import os
+
+from clue_images import decode_scaled, pillow
+
+# Atlas de sprites: todas las imágenes de images/characters, images/locations e images/weapons
+# ya escaladas a cada tamaño que usan las interfaces, guardadas como píxeles RGBA crudos en un
+# único archivo por tamaño, más un índice JSON con la posición de cada sprite. En ejecución el
+# atlas se abre con mmap y cada imagen se sirve como una vista de esos bytes, sin abrir ni
+# decodificar un PNG por ítem.
+#
+# Construcción (paso de build, repetir cuando cambien las imágenes):
+#     python clue_atlas.py --images images
+
+ATLAS_VERSION = 1
+INDEX_FILENAME = "atlas_index.json"
+FOLDERS = ("characters", "locations", "weapons")
+
+# Tamaños que usan las interfaces: 100x100 exacto en clue3.py y hasta 500x500 conservando
+# la relación de aspecto en "Clue Spiderman.py"
+DISPLAY_SIZES = (((100, 100), False), ((500, 500), True))
+
+
+def atlas_name(size, keep_aspect):
+    name = f"{size[0]}x{size[1]}"
+    return name + "_aspect" if keep_aspect else name
+
+
+def sprite_key(folder, item_name):
+    return os.path.basename(os.path.normpath(folder)) + "/" + item_name
+
+
+def build_atlas(images_dir, sizes=DISPLAY_SIZES):
+    index = {"version": ATLAS_VERSION, "atlases": {}}
+    sources = []
+    for folder in FOLDERS:
+        folder_path = os.path.join(images_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for filename in sorted(os.listdir(folder_path)):
+            if filename.lower().endswith(".png"):
+                sources.append((folder, filename[:-4], os.path.join(folder_path, filename)))
+
+    for size, keep_aspect in sizes:
+        name = atlas_name(size, keep_aspect)
+        data_filename = f"atlas_{name}.rgba"
+        sprites = {}
+        offset = 0
+        tmp_path = os.path.join(images_dir, data_filename + ".tmp")
+        with open(tmp_path, "wb") as out:
+            for folder, item_name, path in sources:
+                img = decode_scaled(path, size, keep_aspect).convert("RGBA")
+                pixels = img.tobytes()
+                out.write(pixels)
+                sprites[folder + "/" + item_name] = [offset, img.width, img.height]
+                offset += len(pixels)
+        os.replace(tmp_path, os.path.join(images_dir, data_filename))
+        index["atlases"][name] = {"file": data_filename, "sprites": sprites}
+
+    tmp_index = os.path.join(images_dir, INDEX_FILENAME + ".tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_index, os.path.join(images_dir, INDEX_FILENAME))
+    return index
+
+
+class SpriteAtlas:
+    def __init__(self, data_path, sprites):
+        self.sprites = sprites
+        self._file = open(data_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    @classmethod
+    def open(cls, images_dir, size, keep_aspect=False):
+        # Devuelve el atlas del tamaño pedido, o None si no se construyó
+        index_path = os.path.join(images_dir, INDEX_FILENAME)
+        if not os.path.isfile(index_path):
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != ATLAS_VERSION:
+            return None
+        atlas = index["atlases"].get(atlas_name(size, keep_aspect))
+        if atlas is None:
+            return None
+        data_path = os.path.join(images_dir, atlas["file"])
+        if not os.path.isfile(data_path) or os.path.getsize(data_path) == 0:
+            return None
+        return cls(data_path, atlas["sprites"])
+
+    def __contains__(self, key):
+        return key in self.sprites
+
+    def has(self, folder, item_name):
+        return sprite_key(folder, item_name) in self.sprites
+
+    def get(self, folder, item_name):
+        # Imagen PIL que comparte memoria con el mmap, o None si el ítem no está en el atlas
+        sprite = self.sprites.get(sprite_key(folder, item_name))
+        if sprite is None:
+            return None
+        offset, width, height = sprite
+        Image, _ = pillow()
+        pixels = self._view[offset:offset + width * height * 4]
+        return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el atlas de sprites del Juego Clue")
+    parser.add_argument("--images", default="images", help="carpeta base de imágenes")
+    args = parser.parse_args(argv)
+    index = build_atlas(args.images)
+    for name, atlas in index["atlases"].items():
+        print(f"{name}: {len(atlas['sprites'])} sprites -> {os.path.join(args.images, atlas['file'])}")
+
+
+if __name__ == "__main__":
+    main()
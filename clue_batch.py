@@ -0,0 +1,114 @@
+import numpy as np  # NumPy must be installed (pip install numpy)
+
+from clue_engine import (DRAW_CHARACTER, DRAW_LOCATION, DRAW_WEAPON, DRAW_VICTIM, DRAW_CLUE_KIND,
+                         DRAW_CLUE_ENTITY, DRAW_STORY, DRAW_PHRASE, DRAW_ALIBIS)
+from clue_rng import GOLDEN_GAMMA, MASK64
+
+# Generación vectorizada de repartos: el reparto i de un lote es idéntico al que produce
+# ClueEngine.new_game(seed + i), porque repite las mismas cuentas de clue_engine.deal_indices
+# sobre arreglos de NumPy en lugar de hacerlo partida por partida.
+
+DEFAULT_CHUNK = 1 << 20
+
+FIELDS = ("character", "location", "weapon", "victim", "clue_kind", "clue_entity", "story", "phrase",
+          "fake_locations", "fake_weapons")
+
+_U30 = np.uint64(30)
+_U27 = np.uint64(27)
+_U31 = np.uint64(31)
+_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+_MUL2 = np.uint64(0x94D049BB133111EB)
+
+
+def mix64(x):
+    # Misma mezcla que clue_rng.mix64; la aritmética uint64 de NumPy ya es módulo 2**64
+    x = (x ^ (x >> _U30)) * _MUL1
+    x = (x ^ (x >> _U27)) * _MUL2
+    return x ^ (x >> _U31)
+
+
+def draw(keys, k, n):
+    return mix64(keys + np.uint64(((k + 1) * GOLDEN_GAMMA) & MASK64)) % np.uint64(n)
+
+
+def draw_other(keys, k, n, excluded):
+    values = draw(keys, k, n - 1)
+    return values + (values >= excluded)
+
+
+def index_dtype(n):
+    return np.min_scalar_type(max(n - 1, 0))
+
+
+def deal_chunk(first_seed, count, n_characters, n_locations, n_weapons, n_stories, phrase_counts):
+    seeds = np.arange(count, dtype=np.uint64) + np.uint64(first_seed & MASK64)
+    keys = mix64(seeds)
+
+    character = draw(keys, DRAW_CHARACTER, n_characters)
+    location = draw(keys, DRAW_LOCATION, n_locations)
+    weapon = draw(keys, DRAW_WEAPON, n_weapons)
+    victim = draw_other(keys, DRAW_VICTIM, n_characters, character)
+
+    clue_kind = draw(keys, DRAW_CLUE_KIND, 3)
+    clue_entity = np.select(
+        [clue_kind == 0, clue_kind == 1],
+        [draw_other(keys, DRAW_CLUE_ENTITY, n_characters, character),
+         draw_other(keys, DRAW_CLUE_ENTITY, n_locations, location)],
+        draw_other(keys, DRAW_CLUE_ENTITY, n_weapons, weapon)
+    )
+    story = draw(keys, DRAW_STORY, n_stories)
+    phrase_draw = mix64(keys + np.uint64(((DRAW_PHRASE + 1) * GOLDEN_GAMMA) & MASK64))
+    phrase = phrase_draw % np.asarray(phrase_counts, dtype=np.uint64)[clue_kind]
+
+    loc_dtype = index_dtype(n_locations)
+    weap_dtype = index_dtype(n_weapons)
+    fake_locations = np.empty((count, n_characters), dtype=loc_dtype)
+    fake_weapons = np.empty((count, n_characters), dtype=weap_dtype)
+    for i in range(n_characters):
+        is_culprit = character == i
+        fake_locations[:, i] = np.where(is_culprit, location,
+                                        draw_other(keys, DRAW_ALIBIS + 2 * i, n_locations, location))
+        fake_weapons[:, i] = np.where(is_culprit, weapon,
+                                      draw_other(keys, DRAW_ALIBIS + 2 * i + 1, n_weapons, weapon))
+
+    char_dtype = index_dtype(n_characters)
+    entity_dtype = index_dtype(max(n_characters, n_locations, n_weapons))
+    return {
+        "character": character.astype(char_dtype),
+        "location": location.astype(loc_dtype),
+        "weapon": weapon.astype(weap_dtype),
+        "victim": victim.astype(char_dtype),
+        "clue_kind": clue_kind.astype(np.uint8),
+        "clue_entity": clue_entity.astype(entity_dtype),
+        "story": story.astype(index_dtype(n_stories)),
+        "phrase": phrase.astype(index_dtype(max(phrase_counts))),
+        "fake_locations": fake_locations,
+        "fake_weapons": fake_weapons
+    }
+
+
+def iter_deal_batches(count, seed, n_characters, n_locations, n_weapons, n_stories, phrase_counts,
+                      chunk=DEFAULT_CHUNK):
+    # Genera los repartos por bloques para acotar la memoria con lotes de decenas de millones
+    done = 0
+    while done < count:
+        size = min(chunk, count - done)
+        yield deal_chunk(seed + done, size, n_characters, n_locations, n_weapons, n_stories, phrase_counts)
+        done += size
+
+
+def deal_batch(count, seed, n_characters, n_locations, n_weapons, n_stories, phrase_counts,
+               chunk=DEFAULT_CHUNK):
+    chunks = list(iter_deal_batches(count, seed, n_characters, n_locations, n_weapons, n_stories,
+                                    phrase_counts, chunk))
+    if len(chunks) == 1:
+        return chunks[0]
+    if not chunks:
+        chunks = [deal_chunk(seed, 0, n_characters, n_locations, n_weapons, n_stories, phrase_counts)]
+    return {field: np.concatenate([c[field] for c in chunks]) for field in FIELDS}
+
+
+def engine_deal_batch(engine, count, seed, chunk=DEFAULT_CHUNK):
+    # Lote de repartos con los tamaños de catálogo de un ClueEngine
+    return deal_batch(count, seed, len(engine.characters), len(engine.locations), len(engine.weapons),
+                      len(engine.stories), engine.phrase_counts(), chunk)
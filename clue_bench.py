@@ -0,0 +1,412 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from clue_assets import AssetCache
+from clue_catalog import ENTITY_KINDS, compile_catalog, default_catalog, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_images import ImageCache, decode_scaled, image_path, pillow
+from clue_rng import GameRng
+from clue_sim import scaled_catalog
+
+# Microbenchmarks de los caminos calientes del juego, para distintos tamaños de catálogo. Cada
+# tamaño es la cantidad de entradas de cada tipo: personajes, locaciones y armas crecen juntos
+# (con catálogos grandes el espacio de hipótesis se factoriza por tipo, ver clue_hypothesis.py,
+# así que 10000 de cada uno entra en memoria). --side-limit topea locaciones y armas para medir
+# catálogos desparejos. Se informan operaciones por segundo y latencia media, p50 y p99 de cada
+# operación, y se guarda un JSON con el commit, así dos corridas se comparan y las regresiones
+# aparecen entre commits.
+#
+#     python clue_bench.py                                  # tamaños 5, 100, 1000 y 10000
+#     python clue_bench.py --sizes 5,10000 --out antes.json
+#     python clue_bench.py --compare antes.json             # sale con 1 si algo empeoró
+#
+# Operaciones:
+#     new_game, provide_clue, interrogate, make_guess   lo que hace el motor en cada acción de la
+#         interfaz (interrogate es el trabajo de provide_interrogation_info)
+#     catalog_load, catalog_compile   leer el catálogo con caché y sin ella, más armar el motor
+#     load_image_decode   decodificar y escalar un retrato a 100x100 (lo que hace ImageCache)
+#     load_image          ImageCache.get recorriendo el catálogo al azar (LRU; necesita pantalla)
+#     start_background    escalar el fondo de la pantalla de inicio a 900x600 (no depende del tamaño)
+#     start_background_cached   lo mismo desde la caché de imágenes derivadas (clue_assets.py)
+#     startup             clue3.py --measure-startup hasta pintar la pantalla de inicio (necesita pantalla)
+#
+# Las imágenes son sintéticas (no hay images/ en el repositorio) y a lo sumo IMAGE_LIMIT
+# distintas por tamaño, para que generarlas no domine la corrida.
+
+RESULTS_FORMAT = 1
+DEFAULT_SIZES = (5, 100, 1000, 10000)
+SIDE_LIMIT = 0  # sin tope: los tres tipos crecen con el tamaño
+IMAGE_LIMIT = 256
+PORTRAIT_SOURCE = (400, 400)
+BACKGROUND_SOURCE = (1920, 1080)
+STARTUP_PAINTED = re.compile(r"pintada a los ([\d.]+) ms")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ----- Medición -----
+def measure(step, min_time, max_ops, warmup=3):
+    # step() ejecuta una operación y devuelve los nanosegundos de la parte medida (la
+    # preparación de cada operación, como repartir antes de pedir una pista, queda afuera)
+    for _ in range(warmup):
+        step()
+    samples = []
+    total = 0
+    budget = int(min_time * 1e9)
+    while total < budget and len(samples) < max_ops:
+        elapsed = step()
+        samples.append(elapsed)
+        total += elapsed
+    samples.sort()
+    count = len(samples)
+    return {
+        "ops": count,
+        "ops_per_s": count / (total / 1e9) if total else 0.0,
+        "mean_us": total / count / 1000,
+        "p50_us": samples[count // 2] / 1000,
+        "p99_us": samples[min(count - 1, int(0.99 * count))] / 1000
+    }
+
+
+def timed(op, *args):
+    start = time.perf_counter_ns()
+    op(*args)
+    return time.perf_counter_ns() - start
+
+
+# ----- Catálogos e imágenes sintéticos -----
+def sized_catalog(size, side_limit):
+    base = default_catalog()
+    side = min(size, side_limit) if side_limit else size
+    catalog = {key: base[key] for key in ("stories", "clue_indications")}
+    for kind, label, count in zip(ENTITY_KINDS, ("Personaje", "Locación", "Arma"), (size, side, side)):
+        catalog[kind] = scaled_catalog(base[kind], count, label)
+    return catalog
+
+
+def synthetic_png(path, size, seed):
+    # Degradado con ruido: se comprime y decodifica como una foto, no como un color plano
+    Image, _ = pillow()
+    noise = Image.effect_noise(size, 40).convert("L")
+    gradient = Image.linear_gradient("L").resize(size)
+    img = Image.merge("RGB", (noise, gradient, Image.new("L", size, seed * 37 % 256)))
+    img.save(path)
+
+
+def tk_root():
+    # Ventana oculta para crear PhotoImage, o None si no hay pantalla
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    return root
+
+
+# ----- Operaciones -----
+def engine_benches(engine, args):
+    rng = GameRng(args.seed)
+    results = {}
+
+    def new_game():
+        return timed(engine.new_game, rng.next_seed())
+
+    results["new_game"] = measure(new_game, args.min_time, args.max_ops)
+
+    def provide_clue():
+        if not engine.can_give_clue():
+            engine.new_game(rng.next_seed())
+        return timed(engine.provide_clue)
+
+    engine.new_game(rng.next_seed())
+    results["provide_clue"] = measure(provide_clue, args.min_time, args.max_ops)
+
+    def interrogate():
+        if not engine.has_clues_left():
+            engine.new_game(rng.next_seed())
+        kind = KINDS[rng.randrange(3)]
+        return timed(engine.interrogate, kind, rng.choice(engine.catalog(kind)))
+
+    results["interrogate"] = measure(interrogate, args.min_time, args.max_ops)
+
+    def make_guess():
+        engine.new_game(rng.next_seed())
+        return timed(engine.make_guess, rng.choice(engine.characters), rng.choice(engine.locations),
+                     rng.choice(engine.weapons))
+
+    results["make_guess"] = measure(make_guess, args.min_time, args.max_ops)
+    return results
+
+
+def catalog_benches(catalog_file, args):
+    def catalog_load():
+        start = time.perf_counter_ns()
+        ClueEngine.from_catalog(load_catalog(catalog_file))
+        return time.perf_counter_ns() - start
+
+    def catalog_compile():
+        start = time.perf_counter_ns()
+        ClueEngine.from_catalog(load_catalog(catalog_file, use_cache=False))
+        return time.perf_counter_ns() - start
+
+    # Las cargas de catálogos grandes tardan milisegundos: pocas repeticiones alcanzan
+    return {
+        "catalog_load": measure(catalog_load, args.min_time, args.max_ops, warmup=1),
+        "catalog_compile": measure(catalog_compile, args.min_time, args.max_ops, warmup=1)
+    }
+
+
+def image_benches(names, folder, root, args):
+    rng = GameRng(args.seed)
+    results = {}
+
+    def decode():
+        return timed(decode_scaled, image_path(folder, rng.choice(names)), (100, 100))
+
+    results["load_image_decode"] = measure(decode, args.min_time, args.max_ops)
+
+    if root is not None:
+        # Misma configuración que clue3.py, sin precarga: se mide el costo que ve el hilo de Tk
+        cache = ImageCache(size=(100, 100))
+
+        def load_image():
+            return timed(cache.get, folder, rng.choice(names))
+
+        results["load_image"] = measure(load_image, args.min_time, args.max_ops)
+    return results
+
+
+def background_bench(path, args):
+    # Lo mismo que StartScreen: abrir el PNG y escalarlo a la ventana de 900x600
+    def scale():
+        return timed(decode_scaled, path, (900, 600))
+
+    return measure(scale, args.min_time, args.max_ops, warmup=1)
+
+
+def cached_background_bench(path, workdir, root, args):
+    # Arranques posteriores al primero: buscar la copia escalada y abrirla (con Tk si hay
+    # pantalla, como StartScreen; si no, con Pillow)
+    assets = AssetCache(os.path.join(workdir, ".cache"))
+    assets.scaled_ppm(path, (900, 600))
+    assets.save()  # lo que hace el juego al cerrar: el próximo arranque ya conoce el hash
+    Image, _ = pillow()
+
+    def load():
+        start = time.perf_counter_ns()
+        # Caché nueva (índice sin leer), como en un arranque
+        cached = AssetCache(assets.directory).scaled_ppm(path, (900, 600))
+        if root is not None:
+            import tkinter as tk
+            tk.PhotoImage(file=cached)
+        else:
+            Image.open(cached).load()
+        return time.perf_counter_ns() - start
+
+    return measure(load, args.min_time, args.max_ops, warmup=1)
+
+
+def startup_bench(catalog_file, workdir, args):
+    # Arranque completo en un proceso nuevo; CLUE_* apunta a un directorio temporal para no
+    # tocar la partida guardada ni el registro de acciones del usuario
+    env = dict(os.environ, CLUE_MEASURE_STARTUP="1", CLUE_CATALOG=catalog_file,
+               CLUE_AUTOSAVE=os.path.join(workdir, "partida.clue"),
+               CLUE_ACTION_LOG=os.path.join(workdir, "acciones.cluelog"))
+    runs = max(1, args.startup_runs)
+
+    def start():
+        output = subprocess.run([sys.executable, os.path.join(HERE, "clue3.py")], cwd=HERE, env=env,
+                                capture_output=True, text=True, timeout=60).stdout
+        match = STARTUP_PAINTED.search(output)
+        if match is None:
+            raise RuntimeError("clue3.py --measure-startup no informó el tiempo de arranque")
+        return int(float(match.group(1)) * 1e6)
+
+    return measure(start, 0, runs, warmup=1)
+
+
+# ----- Corrida completa -----
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+def run(args):
+    results = []
+    skipped = []
+
+    def record(bench, size, result):
+        results.append(dict(bench=bench, size=size, **result))
+        print(f"{bench:<24} {'-' if size is None else size:>6} {result['ops']:>8} "
+              f"{result['ops_per_s']:>12,.0f} {result['mean_us']:>10.1f} {result['p50_us']:>10.1f} "
+              f"{result['p99_us']:>10.1f}")
+
+    try:
+        pillow()
+        has_pillow = True
+    except ImportError:
+        has_pillow = False
+        skipped.append("imágenes: Pillow no está instalado")
+    root = tk_root()
+    if root is None:
+        skipped.append("load_image y startup: no hay pantalla para Tk")
+
+    print(f"{'operación':<24} {'tamaño':>6} {'ops':>8} {'ops/s':>12} {'media µs':>10} {'p50 µs':>10} "
+          f"{'p99 µs':>10}")
+    with tempfile.TemporaryDirectory(prefix="clue-bench-") as workdir:
+        folder = os.path.join(workdir, "images", "characters")
+        os.makedirs(folder)
+        generated = 0
+
+        for size in args.sizes:
+            catalog = sized_catalog(size, args.side_limit)
+            catalog_file = os.path.join(workdir, f"catalogo_{size}.json")
+            with open(catalog_file, "w", encoding="utf-8") as f:
+                json.dump(catalog, f, ensure_ascii=False)
+            load_catalog(catalog_file)  # deja la caché compilada lista
+
+            engine = ClueEngine.from_catalog(compile_catalog(catalog), max_clues=args.max_clues)
+            for bench, result in engine_benches(engine, args).items():
+                record(bench, size, result)
+            del engine  # las máscaras de un catálogo grande ocupan cientos de MB
+            for bench, result in catalog_benches(catalog_file, args).items():
+                record(bench, size, result)
+
+            if has_pillow:
+                names = catalog["characters"][:IMAGE_LIMIT]
+                for i in range(generated, len(names)):
+                    synthetic_png(image_path(folder, catalog["characters"][i]), PORTRAIT_SOURCE, i)
+                generated = max(generated, len(names))
+                for bench, result in image_benches(names, folder, root, args).items():
+                    record(bench, size, result)
+            if root is not None and args.startup_runs:
+                record("startup", size, startup_bench(catalog_file, workdir, args))
+
+        if has_pillow:
+            background = os.path.join(workdir, "start_background.png")
+            synthetic_png(background, BACKGROUND_SOURCE, 0)
+            record("start_background", None, background_bench(background, args))
+            record("start_background_cached", None, cached_background_bench(background, workdir, root, args))
+
+    if root is not None:
+        root.destroy()
+    for reason in skipped:
+        print(f"Omitido: {reason}")
+
+    commit, dirty = git_commit()
+    return {
+        "format": RESULTS_FORMAT,
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "settings": {"sizes": args.sizes, "min_time": args.min_time, "max_ops": args.max_ops,
+                     "side_limit": args.side_limit, "seed": args.seed, "max_clues": args.max_clues},
+        "skipped": skipped,
+        "results": results
+    }
+
+
+def default_output(report):
+    # Junto al resto de los archivos generados (.cache/ no se versiona), uno por commit
+    name = (report["commit"] or "local")[:12] + ("-dirty" if report["dirty"] else "")
+    return os.path.join(HERE, ".cache", "bench", name + ".json")
+
+
+# ----- Comparación -----
+def compare(base, report, threshold):
+    # Compara la latencia media de cada (operación, tamaño) presente en las dos corridas y
+    # devuelve las que empeoraron más que threshold
+    if base.get("format") != RESULTS_FORMAT:
+        raise ValueError("la corrida base tiene otro formato de resultados")
+    if base.get("settings", {}).get("side_limit") != report["settings"]["side_limit"]:
+        # Con otro tope los catálogos de cada tamaño no son los mismos
+        raise ValueError("la corrida base usó otro --side-limit")
+    before = {(r["bench"], r["size"]): r for r in base["results"]}
+    print(f"\nComparación con {(base.get('commit') or 'local')[:12]} ({base.get('date', '?')}):")
+    print(f"{'operación':<24} {'tamaño':>6} {'antes µs':>10} {'ahora µs':>10} {'cambio':>8}")
+    regressions = []
+    for r in report["results"]:
+        old = before.get((r["bench"], r["size"]))
+        if old is None or not old["mean_us"]:
+            continue
+        change = r["mean_us"] / old["mean_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  << más lento"
+            regressions.append((r["bench"], r["size"], change))
+        elif change < -threshold:
+            flag = "  más rápido"
+        print(f"{r['bench']:<24} {'-' if r['size'] is None else r['size']:>6} {old['mean_us']:>10.1f} "
+              f"{r['mean_us']:>10.1f} {change * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def parse_sizes(value):
+    sizes = [int(part) for part in value.split(",") if part.strip()]
+    if not sizes or min(sizes) < 2:
+        raise argparse.ArgumentTypeError("cada tamaño necesita al menos 2 entradas")
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks del Juego Clue")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help="tamaños de catálogo separados por comas")
+    parser.add_argument("--side-limit", type=int, default=SIDE_LIMIT,
+                        help="tope de locaciones y armas (0 = crecen igual que los personajes)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="segundos medidos por operación")
+    parser.add_argument("--max-ops", type=int, default=200000, help="tope de operaciones por medición")
+    parser.add_argument("--startup-runs", type=int, default=3, help="arranques de clue3.py por tamaño (0 = no)")
+    parser.add_argument("--max-clues", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="archivo de resultados (por defecto .cache/bench/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="resultados de otra corrida para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="empeoramiento relativo de la media que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding="utf-8") as f:
+                base = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"{args.compare}: {e}\n")
+
+    report = run(args)
+    out = args.out or default_output(report)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Resultados en {out}")
+
+    if base is not None:
+        try:
+            regressions = compare(base, report, args.threshold)
+        except ValueError as e:
+            parser.exit(2, f"{args.compare}: {e}\n")
+        if regressions:
+            print(f"{len(regressions)} regresiones de más del {args.threshold * 100:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
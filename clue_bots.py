@@ -0,0 +1,311 @@
+import argparse
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from clue_advisor import InformationAdvisor
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_rng import GameRng
+from clue_snapshot import dump_session, load_session
+
+# Detectives de la computadora: varios bots investigan el mismo reparto que el jugador, por
+# turnos (una ronda de bots después de cada interrogatorio o pista del jugador). Cada bot tiene
+# su propio estado de conocimiento, una GameSession del mismo reparto, que viaja como
+# instantánea (clue_snapshot.py, ~100 bytes) a un pool de procesos: ahí cada trabajador tiene
+# su propio motor y un InformationAdvisor, carga la sesión del bot, decide y aplica la jugada,
+# y devuelve la sesión actualizada. El hilo de Tk solo reparte las tareas y revisa con after()
+# si terminaron, así los turnos de los bots nunca lo bloquean.
+#
+# Presupuesto de tiempo: cada jugada mira el reloj entre pasos y, si se pasó del presupuesto,
+# juega lo más barato que tenga (pedir pista o adivinar). Además la ronda entera tiene un plazo
+# en el hilo de Tk; el bot cuya jugada no llegó a tiempo pierde el turno y su resultado tardío
+# se descarta. Los bots de una mesa se reparten entre los trabajadores en tandas, así una mesa
+# con muchos bots cuesta una tarea por trabajador y no una por bot.
+#
+#     python clue3.py --bots 3                       (o CLUE_BOTS=3)
+#     python clue_bots.py --bots 100 --games 20      (mesas sin jugador humano, sin interfaz)
+
+TURN_BUDGET_MS = 100
+POLL_MS = 20
+ROUND_SLACK_MS = 250  # margen de la ronda para arrancar procesos y mover las instantáneas
+
+_worker = threading.local()
+
+
+# ----- Trabajadores -----
+def worker_engine(catalog_path, max_clues):
+    # Un motor (y su asesor) por proceso o hilo trabajador, creado la primera vez que se usa
+    key = (catalog_path, max_clues)
+    if getattr(_worker, "key", None) != key:
+        _worker.engine = ClueEngine.from_catalog(load_catalog(catalog_path), max_clues=max_clues)
+        _worker.advisor = InformationAdvisor(_worker.engine)
+        _worker.key = key
+    return _worker.engine, _worker.advisor
+
+
+def warm_up(catalog_path, max_clues):
+    worker_engine(catalog_path, max_clues)
+
+
+def clue_gain(engine, advisor):
+    # Ganancia esperada (en bits) de una pista: descarta una entidad al azar entre las que
+    # todavía pueden darse como pista, y con ella ~1/vivas de los tríos posibles de su tipo
+    total = engine.space.remaining
+    clueable = engine.session.clueable
+    if total <= 1 or not clueable:
+        return 0.0
+    removed = 0.0
+    for kind in KINDS:
+        alive = advisor.alive[kind]
+        if alive > 1:
+            share = (alive - 1) / clueable
+            removed += share * total / alive
+    return math.log2(total) - math.log2(max(total - removed, 1.0))
+
+
+def guess_move(engine, rng):
+    c, l, w = engine.space.nth_candidate(rng.randrange(engine.remaining_candidates()))
+    correct = engine.make_guess(engine.characters[c], engine.locations[l], engine.weapons[w])
+    return "guess", (c, l, w), correct
+
+
+def choose_move(engine, advisor, rng, deadline):
+    # Jugada del bot sobre la sesión adjunta: adivina si ya sabe la solución o no le quedan
+    # pistas; si no, interroga lo que recomienda el asesor salvo que una pista valga más
+    if engine.space.is_solved() or not engine.has_clues_left():
+        return guess_move(engine, rng)
+    if time.perf_counter() < deadline:
+        ranking = advisor.ranking(1)
+        if ranking:
+            gain, kind, name = ranking[0]
+            if gain >= clue_gain(engine, advisor) or not engine.can_give_clue():
+                index = engine.index[kind][name]
+                engine.apply_interrogation(kind, index)
+                return "interrogate", kind, index
+    # Sin tiempo o sin nada mejor que hacer: la jugada más barata
+    clue = engine.apply_clue()
+    if clue is None:
+        return guess_move(engine, rng)
+    return ("clue",) + clue
+
+
+def play_turns(task):
+    # Turnos de una tanda de bots: (catálogo, max_clues, semilla, presupuesto, [(bot, instantánea, turno)])
+    catalog_path, max_clues, seed, budget_ms, turns = task
+    engine, advisor = worker_engine(catalog_path, max_clues)
+    results = []
+    for bot, snapshot, turn in turns:
+        start = time.perf_counter()
+        session = load_session(engine, snapshot)
+        engine.attach(session)
+        # El azar de cada jugada sale de (semilla de la mesa, bot, turno): no depende de qué
+        # trabajador la juegue
+        move = choose_move(engine, advisor, GameRng(seed).substream(bot).substream(turn),
+                           start + budget_ms / 1000)
+        elapsed = (time.perf_counter() - start) * 1000
+        results.append((bot, move, engine.remaining_candidates(), dump_session(engine, session), elapsed))
+    return results
+
+
+# ----- Mesa -----
+class Bot:
+    __slots__ = ("name", "snapshot", "turns", "last_move", "remaining", "finished", "won", "forfeits",
+                 "clues_spent")
+
+    def __init__(self, name, snapshot, remaining):
+        self.name = name
+        self.snapshot = snapshot
+        self.turns = 0
+        self.last_move = None
+        self.remaining = remaining
+        self.finished = False
+        self.won = False
+        self.forfeits = 0
+        self.clues_spent = 0
+
+
+class BotTable:
+    def __init__(self, engine, catalog_path, bots=3, budget_ms=TURN_BUDGET_MS, workers=None, processes=True):
+        self.engine = engine
+        self.catalog_path = os.path.abspath(catalog_path)
+        self.count = bots
+        self.budget_ms = budget_ms
+        self.workers = max(1, min(workers or os.cpu_count() or 1, bots))
+        self.processes = processes
+        self.executor = None  # se crea con el primer reparto, no al abrir el juego
+        self.bots = []
+        self.seed = None
+        self.generation = 0  # cambia con cada reparto; descarta rondas de repartos viejos
+        self.round = None  # (generación, futuros, plazo, función a llamar al terminar)
+        self.queued = 0
+        self.latencies = []  # ms de cada jugada, para informes
+        self.winner = None  # primer bot que resolvió el caso
+
+    def deal(self, session):
+        # Los bots reciben el mismo reparto que la sesión del jugador, cada uno con su sesión
+        self.generation += 1
+        self.round = None
+        self.queued = 0
+        self.seed = session.seed
+        self.winner = None
+        self._executor()
+        self.bots = []
+        for i in range(self.count):
+            fresh = self.engine.prepare_deal(session.seed)
+            self.bots.append(Bot(f"Detective {i + 1}", dump_session(self.engine, fresh), self.engine.space.size))
+
+    def active(self):
+        return [i for i, bot in enumerate(self.bots) if not bot.finished]
+
+    def tasks(self):
+        # Una tanda por trabajador, repartiendo los bots activos en forma alternada
+        active = self.active()
+        max_clues = self.engine.max_clues
+        return [(self.catalog_path, max_clues, self.seed, self.budget_ms,
+                 [(i, self.bots[i].snapshot, self.bots[i].turns) for i in active[w::self.workers]])
+                for w in range(self.workers) if active[w::self.workers]]
+
+    def apply(self, results):
+        for i, move, remaining, snapshot, elapsed in results:
+            bot = self.bots[i]
+            bot.snapshot = snapshot
+            bot.turns += 1
+            bot.last_move = move
+            bot.remaining = remaining
+            self.latencies.append(elapsed)
+            if move[0] == "clue" or move[0] == "interrogate":
+                bot.clues_spent += 1
+            elif move[0] == "guess":
+                bot.finished = True
+                bot.won = move[2]
+                if bot.won and self.winner is None:
+                    self.winner = bot
+
+    def play_round_sync(self):
+        # Una ronda en el hilo que llama (pruebas y simulaciones sin interfaz)
+        for task in self.tasks():
+            self.apply(play_turns(task))
+
+    def _executor(self):
+        if self.executor is None:
+            if self.processes:
+                # spawn y no fork: el proceso de la interfaz ya tiene Tk y otros hilos andando
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="clue-bot")
+            # Calentamiento: cada trabajador arranca y carga el catálogo antes de la primera ronda,
+            # así esa ronda no paga el arranque dentro de su plazo
+            for _ in range(self.workers):
+                self.executor.submit(warm_up, self.catalog_path, self.engine.max_clues)
+        return self.executor
+
+    def play_round(self, widget, on_done):
+        # Lanza una ronda sin bloquear; on_done(mesa) se llama en el hilo de Tk al terminar. Si
+        # ya hay una ronda en curso, la nueva se juega cuando esa termine.
+        if self.round is not None:
+            self.queued += 1
+            return
+        tasks = self.tasks()
+        if not tasks:
+            return
+        executor = self._executor()
+        batches = [(executor.submit(play_turns, task), [turn[0] for turn in task[4]]) for task in tasks]
+        # Cada trabajador juega su tanda en serie: el plazo crece con los bots por trabajador
+        per_worker = max(len(bots) for _, bots in batches)
+        deadline = time.perf_counter() + (self.budget_ms * per_worker + ROUND_SLACK_MS) / 1000
+        self.round = (self.generation, batches, deadline, on_done)
+        widget.after(POLL_MS, self._poll, widget)
+
+    def _poll(self, widget):
+        if self.round is None:
+            return
+        generation, batches, deadline, on_done = self.round
+        if generation != self.generation:
+            return  # hubo un reparto nuevo mientras tanto
+        if time.perf_counter() <= deadline and not all(future.done() for future, _ in batches):
+            widget.after(POLL_MS, self._poll, widget)
+            return
+        for future, bots in batches:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.apply(future.result())
+            else:
+                # Fuera de plazo (o con error): esos bots pierden el turno y lo tardío se descarta
+                future.cancel()
+                for i in bots:
+                    self.bots[i].forfeits += 1
+        self.round = None
+        on_done(self)
+        if self.queued:
+            self.queued -= 1
+            self.play_round(widget, on_done)
+
+    def describe(self, kind_labels):
+        lines = []
+        for bot in self.bots:
+            if bot.finished:
+                status = "¡resolvió el caso!" if bot.won else "se equivocó al acusar"
+            elif bot.last_move is None:
+                status = "esperando su turno"
+            elif bot.last_move[0] == "clue":
+                status = f"pidió una pista ({kind_labels[bot.last_move[1]]})"
+            else:
+                kind, index = bot.last_move[1:]
+                status = f"interrogó a {self.engine.catalog(kind)[index]}"
+            lines.append(f"{bot.name}: {status} · {bot.clues_spent} pistas usadas · "
+                         f"{bot.remaining} tríos posibles")
+        return "\n".join(lines)
+
+    def close(self):
+        self.round = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ----- Mesas sin interfaz -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesas de detectives de la computadora del Juego Clue")
+    parser.add_argument("--bots", type=int, default=8, help="bots por mesa")
+    parser.add_argument("--games", type=int, default=20, help="mesas (repartos) a jugar")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--threads", action="store_true", help="hilos en lugar de procesos")
+    parser.add_argument("--budget-ms", type=float, default=TURN_BUDGET_MS, help="presupuesto por jugada")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--max-clues", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    engine = ClueEngine.from_catalog(load_catalog(args.catalog), max_clues=args.max_clues, seed=args.seed)
+    table = BotTable(engine, args.catalog, bots=args.bots, budget_ms=args.budget_ms, workers=args.workers,
+                     processes=not args.threads)
+    executor = table._executor()
+    wins = turns = first_wins = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        table.deal(engine.prepare_deal())
+        while table.active():
+            for results in executor.map(play_turns, table.tasks()):
+                table.apply(results)
+        wins += sum(bot.won for bot in table.bots)
+        turns += sum(bot.turns for bot in table.bots)
+        first_wins += table.winner is not None
+    elapsed = time.perf_counter() - start
+    table.close()
+
+    latencies = sorted(table.latencies)
+    played = args.games * args.bots
+    print(f"Mesas: {args.games} con {args.bots} bots ({table.workers} "
+          f"{'hilos' if args.threads else 'procesos'})  |  Tiempo: {elapsed:.2f} s")
+    print(f"Bots que resolvieron el caso: {wins / played * 100:.1f}%  |  Mesas resueltas: "
+          f"{first_wins / args.games * 100:.1f}%  |  Turnos por bot: {turns / played:.1f}")
+    print(f"Jugadas: {len(latencies)}  |  p50 {latencies[len(latencies) // 2]:.2f} ms  |  "
+          f"p99 {latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]:.2f} ms  |  "
+          f"máx {latencies[-1]:.2f} ms  (presupuesto {args.budget_ms:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import argparse
+import time
+from collections import deque
+
+from clue_engine import KINDS
+from clue_hypothesis import iter_set_bits, nth_set_bit
+from clue_rng import GameRng
+
+# Variante clásica con cartas: las entidades que no son la solución se reparten entre los
+# jugadores como cartas. En su turno cada jugador sugiere un trío (personaje, locación, arma) y
+# los demás, en orden, intentan refutarlo: el primero que tiene alguna de las tres cartas le
+# muestra una en secreto al que sugirió; los que no tienen ninguna pasan. El que sugirió ve la
+# carta; el resto solo ve quién refutó. Gana el primero que acusa con el trío correcto.
+#
+# Cada jugador lleva una hoja de deducción (ClueSheet) con, para cada dueño posible (los
+# jugadores y el sobre de la solución), el campo de bits de las cartas que todavía puede tener y
+# el de las que se sabe que tiene. Las cartas usan los mismos bits que los campos de la sesión
+# (personajes desde el bit 0, después locaciones y armas). Las restricciones son:
+#
+#     cada carta tiene exactamente un dueño
+#     cada jugador tiene exactamente tantas cartas como le tocaron (es público)
+#     el sobre tiene exactamente una carta de cada tipo
+#     "el jugador p tiene al menos una de estas tres" (refutaciones que no vimos)
+#
+# Cada observación entra como un descarte o una asignación y se propaga con una cola de trabajo:
+# solo se revisan las cartas que perdieron un dueño posible y las restricciones de ese dueño,
+# nunca la hoja entera. Cada par (dueño, carta) se descarta una sola vez en toda la partida,
+# así el trabajo total es proporcional a lo que se deduce y no al tamaño del catálogo por turno.
+#
+#     python clue3.py --cards 4                  (o CLUE_CARDS=4: tú y tres rivales)
+#     python clue_cards.py --players 6 --characters 2000 --games 20    (partidas sin interfaz)
+
+CARDS_STREAM = 1 << 20  # subflujo de la semilla de la partida para repartir las cartas
+CHOICES_STREAM = CARDS_STREAM + 1  # y para las cartas mostradas y las sugerencias de los rivales
+
+
+def random_bit(mask, rng):
+    return nth_set_bit(mask, rng.randrange(mask.bit_count()))
+
+
+class ClueSheet:
+    def __init__(self, game, player):
+        self.game = game
+        self.player = player
+        self.envelope = game.players  # el sobre es el último dueño
+        owners = game.players + 1
+        self.hand_sizes = [hand.bit_count() for hand in game.hands] + [len(KINDS)]
+        self.can_hold = [game.all_cards] * owners  # dueño -> cartas que todavía puede tener
+        self.known = [0] * owners  # dueño -> cartas que se sabe que tiene
+        self.holders = [(1 << owners) - 1] * game.n_cards  # carta -> dueños posibles
+        # Restricciones "al menos una" de cada jugador, indexadas por carta: un descarte solo
+        # revisa las que contienen las cartas descartadas
+        self.clauses = [{} for _ in range(owners)]  # jugador -> {id: cartas todavía posibles}
+        self.watching = [{} for _ in range(owners)]  # jugador -> carta -> ids que la contienen
+        self.clause_cards = [0] * owners  # jugador -> unión de sus restricciones
+        self.next_clause = 0
+        self.pending = deque()
+        self.steps = 0  # descartes y asignaciones aplicados, para los informes
+        self.assign(player, game.hands[player])
+
+    # ----- Observaciones -----
+    def assign(self, owner, cards):
+        self.pending.append((True, owner, cards))
+        self._propagate()
+
+    def eliminate(self, owner, cards):
+        self.pending.append((False, owner, cards))
+        self._propagate()
+
+    def observe_pass(self, player, cards):
+        # No pudo refutar: no tiene ninguna de las tres
+        self.eliminate(player, cards)
+
+    def observe_show(self, player, card):
+        self.assign(player, 1 << card)
+
+    def observe_refute(self, player, cards):
+        # Refutó pero no vimos la carta: tiene al menos una de las tres
+        if cards & self.known[player]:
+            return
+        possible = cards & self.can_hold[player]
+        if not possible:
+            raise ValueError("Observaciones contradictorias: refutación imposible")
+        if possible & (possible - 1):
+            self._add_clause(player, possible)
+        else:
+            self.assign(player, possible)
+
+    # ----- Propagación -----
+    def _propagate(self):
+        pending = self.pending
+        while pending:
+            is_assign, owner, cards = pending.popleft()
+            if is_assign:
+                self._assign(owner, cards)
+            else:
+                self._eliminate(owner, cards)
+
+    def _assign(self, owner, cards):
+        new = cards & ~self.known[owner]
+        if not new:
+            return
+        if new & ~self.can_hold[owner]:
+            raise ValueError("Observaciones contradictorias: carta asignada a un dueño imposible")
+        self.steps += 1
+        self.known[owner] |= new
+        for other, can_hold in enumerate(self.can_hold):
+            if other != owner and can_hold & new:
+                self.pending.append((False, other, new))
+        known = self.known[owner]
+        if owner == self.envelope:
+            for kind_mask in self.game.kind_masks:
+                if new & kind_mask:
+                    self.pending.append((False, owner, kind_mask & ~new))
+        elif known.bit_count() == self.hand_sizes[owner]:
+            # Mano completa: no tiene ninguna otra
+            self.pending.append((False, owner, self.can_hold[owner] & ~known))
+        elif known.bit_count() > self.hand_sizes[owner]:
+            raise ValueError("Observaciones contradictorias: más cartas que las de la mano")
+        # Las restricciones que contienen una carta que ya se sabe suya quedan cumplidas
+        for card in iter_set_bits(new & self.clause_cards[owner]):
+            for clause_id in list(self.watching[owner].get(card, ())):
+                self._drop_clause(owner, clause_id)
+
+    def _eliminate(self, owner, cards):
+        removed = self.can_hold[owner] & cards
+        if not removed:
+            return
+        if removed & self.known[owner]:
+            raise ValueError("Observaciones contradictorias: se descartó una carta conocida")
+        self.steps += 1
+        left = self.can_hold[owner] ^ removed
+        self.can_hold[owner] = left
+        holders = self.holders
+        not_owner = ~(1 << owner)
+        for card in iter_set_bits(removed):
+            remaining = holders[card] & not_owner
+            holders[card] = remaining
+            if not remaining & (remaining - 1):
+                if not remaining:
+                    raise ValueError("Observaciones contradictorias: carta sin dueño posible")
+                self.pending.append((True, remaining.bit_length() - 1, 1 << card))
+
+        if owner == self.envelope:
+            for kind_mask in self.game.kind_masks:
+                if removed & kind_mask and not self.known[owner] & kind_mask:
+                    possible = left & kind_mask
+                    if not possible & (possible - 1):
+                        if not possible:
+                            raise ValueError("Observaciones contradictorias: el sobre quedó sin cartas de un tipo")
+                        self.pending.append((True, owner, possible))
+            return
+        size = self.hand_sizes[owner]
+        count = left.bit_count()
+        if count == size and left != self.known[owner]:
+            # Solo le quedan tantas posibles como cartas tiene: son todas suyas
+            self.pending.append((True, owner, left))
+        elif count < size:
+            raise ValueError("Observaciones contradictorias: menos cartas posibles que las de la mano")
+        self._check_clauses(owner, removed)
+
+    def _add_clause(self, owner, cards):
+        clause_id = self.next_clause
+        self.next_clause += 1
+        self.clauses[owner][clause_id] = cards
+        watching = self.watching[owner]
+        for card in iter_set_bits(cards):
+            watching.setdefault(card, set()).add(clause_id)
+        self.clause_cards[owner] |= cards
+
+    def _drop_clause(self, owner, clause_id):
+        watching = self.watching[owner]
+        for card in iter_set_bits(self.clauses[owner].pop(clause_id)):
+            ids = watching[card]
+            ids.discard(clause_id)
+            if not ids:
+                del watching[card]
+                self.clause_cards[owner] &= ~(1 << card)
+
+    def _check_clauses(self, owner, removed):
+        # Reduce solo las restricciones "al menos una" que contenían las cartas descartadas
+        touched = removed & self.clause_cards[owner]
+        if not touched:
+            return
+        self.clause_cards[owner] ^= touched
+        watching = self.watching[owner]
+        ids = set()
+        for card in iter_set_bits(touched):
+            ids |= watching.pop(card)
+        clauses = self.clauses[owner]
+        can_hold = self.can_hold[owner]
+        for clause_id in ids:
+            clause = clauses[clause_id] & can_hold
+            if not clause:
+                raise ValueError("Observaciones contradictorias: refutación imposible")
+            clauses[clause_id] = clause
+            if not clause & (clause - 1):
+                # Queda una sola carta posible: es suya
+                self._drop_clause(owner, clause_id)
+                self.pending.append((True, owner, clause))
+
+    # ----- Consultas -----
+    def holder(self, card):
+        # Dueño de la carta (un jugador o el sobre), o None si todavía no se sabe
+        owners = self.holders[card]
+        if owners & (owners - 1):
+            return None
+        return owners.bit_length() - 1
+
+    def envelope_possible(self, kind):
+        return self.can_hold[self.envelope] & self.game.kind_masks[KINDS.index(kind)]
+
+    def solution(self):
+        # Índices (personaje, locación, arma) del sobre, None en los tipos que todavía no se saben
+        known = self.known[self.envelope]
+        return tuple(self.game.split_card(nth_set_bit(known & kind_mask, 0))[1] if known & kind_mask else None
+                     for kind_mask in self.game.kind_masks)
+
+    def is_solved(self):
+        return self.known[self.envelope].bit_count() == len(KINDS)
+
+
+class CardGame:
+    def __init__(self, sizes, solution, players, seed):
+        if players < 2:
+            raise ValueError("La variante con cartas necesita al menos 2 jugadores")
+        self.sizes = sizes
+        self.offsets = (0, sizes[0], sizes[0] + sizes[1])
+        self.n_cards = sum(sizes)
+        self.all_cards = (1 << self.n_cards) - 1
+        self.kind_masks = tuple(((1 << size) - 1) << offset for size, offset in zip(sizes, self.offsets))
+        self.players = players
+        self.solution_cards = sum(1 << (offset + index) for offset, index in zip(self.offsets, solution))
+
+        # Reparto en ronda de las cartas mezcladas; el mismo reparto de la sesión da las mismas
+        # manos para la misma cantidad de jugadores
+        cards = [card for card in range(self.n_cards) if not self.solution_cards >> card & 1]
+        GameRng(seed).substream(CARDS_STREAM).shuffle(cards)
+        self.hands = [sum(1 << card for card in cards[player::players]) for player in range(players)]
+        self.rng = GameRng(seed).substream(CHOICES_STREAM)
+        self.sheets = [ClueSheet(self, player) for player in range(players)]
+        self.shown = {}  # (quien refutó, quien sugirió) -> cartas que ya le mostró
+        self.out = [False] * players  # acusó mal: ya no juega, pero sigue refutando
+        self.turn = 0  # jugador al que le toca
+        self.turns = 0
+        self.winner = None
+
+    @classmethod
+    def for_session(cls, engine, session, players):
+        # La variante sobre el reparto de una partida del motor: misma solución y misma semilla
+        return cls(tuple(len(engine.catalog(kind)) for kind in KINDS),
+                   (session.character, session.location, session.weapon), players, session.seed)
+
+    def card(self, kind, index):
+        return self.offsets[KINDS.index(kind)] + index
+
+    def split_card(self, card):
+        # (tipo, índice dentro del catálogo) de una carta
+        for kind, offset in zip(reversed(KINDS), reversed(self.offsets)):
+            if card >= offset:
+                return kind, card - offset
+
+    def cards_of(self, mask):
+        return [self.split_card(card) for card in iter_set_bits(mask)]
+
+    @property
+    def finished(self):
+        return self.winner is not None or all(self.out)
+
+    # ----- Turnos -----
+    def suggest(self, player, triple):
+        # triple = índices (personaje, locación, arma). Devuelve (quién refutó, carta mostrada),
+        # o (None, None) si nadie pudo refutar; actualiza las hojas de todos los jugadores
+        cards = sum(1 << (offset + index) for offset, index in zip(self.offsets, triple))
+        self.turns += 1
+        for step in range(1, self.players):
+            other = (player + step) % self.players
+            matching = self.hands[other] & cards
+            if not matching:
+                for sheet in self.sheets:
+                    if sheet.player != other:
+                        sheet.observe_pass(other, cards)
+                continue
+            card = self.choose_shown(other, player, matching)
+            for sheet in self.sheets:
+                if sheet.player == player:
+                    sheet.observe_show(other, card)
+                elif sheet.player != other:
+                    sheet.observe_refute(other, cards)
+            return other, card
+        return None, None
+
+    def choose_shown(self, refuter, suggester, matching):
+        # Se muestra, si se puede, una carta que el que sugirió ya vio: así aprende lo menos posible
+        key = (refuter, suggester)
+        seen = self.shown.get(key, 0) & matching
+        card = nth_set_bit(seen, 0) if seen else random_bit(matching, self.rng)
+        self.shown[key] = self.shown.get(key, 0) | 1 << card
+        return card
+
+    def accuse(self, player, triple):
+        cards = sum(1 << (offset + index) for offset, index in zip(self.offsets, triple))
+        if cards == self.solution_cards:
+            self.winner = player
+            return True
+        self.out[player] = True
+        return False
+
+    def next_player(self):
+        # Siguiente jugador que todavía puede acusar, después del turno actual
+        for step in range(1, self.players + 1):
+            player = (self.turn + step) % self.players
+            if not self.out[player]:
+                return player
+        return None
+
+    def plan(self, player):
+        # Jugada de un rival automático: acusa si su hoja ya resolvió el sobre; si no, sugiere en
+        # cada tipo una carta que todavía puede estar en el sobre (o una propia si ese tipo ya
+        # está resuelto, para que no lo refuten por ese lado)
+        sheet = self.sheets[player]
+        if sheet.is_solved():
+            return "accuse", sheet.solution()
+        triple = []
+        envelope = sheet.can_hold[sheet.envelope]
+        for kind_mask, offset in zip(self.kind_masks, self.offsets):
+            possible = envelope & kind_mask
+            if possible & (possible - 1):
+                card = random_bit(possible, self.rng)
+            else:
+                own = self.hands[player] & kind_mask
+                card = random_bit(own, self.rng) if own else nth_set_bit(possible, 0)
+            triple.append(card - offset)
+        return "suggest", tuple(triple)
+
+    def play_turn(self, player):
+        # Turno completo de un rival automático: devuelve (jugada, trío, resultado)
+        self.turn = player
+        move, triple = self.plan(player)
+        if move == "accuse":
+            return move, triple, self.accuse(player, triple)
+        return move, triple, self.suggest(player, triple)
+
+
+# ----- Partidas sin interfaz -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partidas de la variante con cartas entre rivales automáticos")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--characters", type=int, default=10)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--weapons", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = (args.characters, args.locations, args.weapons)
+    rng = GameRng(args.seed)
+    wins = [0] * args.players
+    turns = 0
+    latencies = []
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        solution = tuple(rng.randrange(size) for size in sizes)
+        game = CardGame(sizes, solution, args.players, rng.next_seed())
+        player = 0
+        while not game.finished:
+            t0 = time.perf_counter()
+            game.play_turn(player)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            player = game.next_player()
+        if game.winner is not None:
+            wins[game.winner] += 1
+        turns += game.turns
+        steps += sum(sheet.steps for sheet in game.sheets)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Partidas: {args.games} | Jugadores: {args.players} | Cartas: {sum(sizes)} "
+          f"({sizes[0]}+{sizes[1]}+{sizes[2]}) | Tiempo: {elapsed:.2f} s")
+    print(f"Sugerencias por partida: {turns / args.games:.1f} | Pasos de propagación por partida: "
+          f"{steps / args.games:.0f}")
+    print("Victorias por asiento: " + "  ".join(f"{seat + 1}: {count / args.games * 100:.0f}%"
+                                                for seat, count in enumerate(wins)))
+    print(f"Turno (todas las hojas actualizadas): p50 {latencies[len(latencies) // 2]:.3f} ms | "
+          f"p99 {latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]:.3f} ms | "
+          f"máx {latencies[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import marshal
+import os
+import string
+
+from clue_snapshot import write_atomic
+
+# Catálogos de contenido (personajes, locaciones, armas, narrativas y frases de indicios)
+# cargados desde archivos de datos, para poder armar ediciones temáticas sin tocar el código.
+# Formato: un JSON con las claves de REQUIRED_KEYS; ver catalogs/marvel.json.
+#
+# Para ediciones grandes, cada catálogo se compila a una caché binaria (.cache/<nombre>.cluecat
+# junto al archivo fuente) que ya trae las listas, las frases de indicios partidas en (prefijo,
+# sufijo) y las tablas de índices; se carga con una sola lectura. La caché se regenera sola si
+# cambian la fecha de modificación o el tamaño del archivo fuente y su hash no coincide. Se
+# escribe en un temporal y se reemplaza (clue_snapshot.write_atomic), así varios procesos que
+# arrancan a la vez nunca leen una caché a medio escribir.
+#
+# La caché usa marshal y no pickle: una edición puede traer su carpeta .cache y leerla nunca debe
+# poder ejecutar código (marshal solo arma valores). Al leerla se revisa la forma (check_cache):
+# contenedores, claves y largos, sin recorrer cada entrada; la caché no merece más confianza que
+# el JSON del que sale, que tampoco se revisa entrada por entrada. Con cualquier diferencia se
+# descarta y el catálogo se recompila.
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")
+DEFAULT_CATALOG = os.path.join(CATALOG_DIR, "marvel.json")
+
+ENTITY_KINDS = ("characters", "locations", "weapons")
+REQUIRED_KEYS = ENTITY_KINDS + ("stories", "clue_indications")
+
+CACHE_MAGIC = b"CLUECAT\x03"
+CACHE_DIRNAME = ".cache"
+
+_default = None
+
+
+def split_template(template, source="catálogo"):
+    # "Se dice que {} tuvo..." -> ("Se dice que ", " tuvo..."); exige un único campo {}
+    prefix, suffix, fields = [], [], 0
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        (suffix if fields else prefix).append(literal)
+        if field is not None:
+            if field not in ("", "0") or spec or conversion:
+                raise ValueError(f"{source}: frase de indicio no soportada: {template!r}")
+            fields += 1
+    if fields != 1:
+        raise ValueError(f"{source}: cada frase de indicio necesita exactamente un {{}}: {template!r}")
+    return "".join(prefix), "".join(suffix)
+
+
+def validate_catalog(catalog, source="catálogo"):
+    missing = [key for key in REQUIRED_KEYS if key not in catalog]
+    if missing:
+        raise ValueError(f"{source}: faltan las claves {', '.join(missing)}")
+    for kind in ENTITY_KINDS:
+        entries = catalog[kind]
+        if len(entries) < 2:
+            raise ValueError(f"{source}: '{kind}' necesita al menos 2 entradas")
+        if len(set(entries)) != len(entries):
+            raise ValueError(f"{source}: '{kind}' tiene entradas repetidas")
+        if not catalog["clue_indications"].get(kind):
+            raise ValueError(f"{source}: faltan frases de indicios para '{kind}'")
+    if not catalog["stories"]:
+        raise ValueError(f"{source}: 'stories' está vacío")
+    return catalog
+
+
+def compile_catalog(catalog, source="catálogo"):
+    # Agrega al catálogo lo que el motor necesitaría calcular en cada arranque
+    validate_catalog(catalog, source)
+    compiled = {key: catalog[key] for key in REQUIRED_KEYS}
+    compiled["templates"] = {kind: [split_template(t, source) for t in catalog["clue_indications"][kind]]
+                             for kind in ENTITY_KINDS}
+    compiled["index"] = {kind: {name: i for i, name in enumerate(catalog[kind])} for kind in ENTITY_KINDS}
+    return compiled
+
+
+def check_cache(payload):
+    # (marca, hash, catálogo) de una caché leída de disco; ValueError si no tiene la forma esperada
+    if not isinstance(payload, tuple) or len(payload) != 3:
+        raise ValueError("caché de catálogo con forma inesperada")
+    stamp, digest, catalog = payload
+    if (not isinstance(stamp, tuple) or len(stamp) != 2 or not all(type(v) is int for v in stamp)
+            or not isinstance(digest, str) or not isinstance(catalog, dict)
+            or set(catalog) != set(REQUIRED_KEYS) | {"templates", "index"}):
+        raise ValueError("caché de catálogo con forma inesperada")
+    stories, phrases, templates, index = (catalog[key] for key in ("stories", "clue_indications", "templates", "index"))
+    if (not isinstance(stories, list) or not stories
+            or not all(isinstance(table, dict) for table in (phrases, templates, index))):
+        raise ValueError("caché de catálogo con forma inesperada")
+    for kind in ENTITY_KINDS:
+        entries, kind_phrases, kind_templates, kind_index = (catalog[kind], phrases.get(kind), templates.get(kind),
+                                                            index.get(kind))
+        if (not isinstance(entries, list) or len(entries) < 2
+                or not isinstance(kind_index, dict) or len(kind_index) != len(entries)
+                or not isinstance(kind_phrases, list) or not kind_phrases
+                or not isinstance(kind_templates, list) or len(kind_templates) != len(kind_phrases)):
+            raise ValueError("caché de catálogo con forma inesperada")
+    return payload
+
+
+def cache_path(path):
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIRNAME, os.path.splitext(filename)[0] + ".cluecat")
+
+
+def read_cache(path):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(CACHE_MAGIC):
+        return None
+    try:
+        return check_cache(marshal.loads(memoryview(data)[len(CACHE_MAGIC):]))
+    except (ValueError, EOFError, TypeError):
+        # Caché corrupta, ajena o de otra versión: se regenera
+        return None
+
+
+def write_cache(path, stamp, digest, catalog):
+    try:
+        write_atomic(path, CACHE_MAGIC + marshal.dumps((stamp, digest, catalog)))
+    except (OSError, ValueError):
+        pass  # sin permisos de escritura (o un valor que marshal no guarda): la caché no se usa
+
+
+def load_catalog(path=DEFAULT_CATALOG, use_cache=True):
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached_path = cache_path(path)
+
+    payload = read_cache(cached_path) if use_cache else None
+    if payload is not None and payload[0] == stamp:
+        return payload[2]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if payload is not None and payload[1] == digest:
+        # Solo cambió la fecha (p. ej. tras un checkout): se renueva la marca sin recompilar
+        write_cache(cached_path, stamp, digest, payload[2])
+        return payload[2]
+
+    catalog = compile_catalog(json.loads(raw.decode("utf-8")), path)
+    if use_cache:
+        write_cache(cached_path, stamp, digest, catalog)
+    return catalog
+
+
+def default_catalog():
+    # El catálogo por defecto se lee una sola vez por proceso
+    global _default
+    if _default is None:
+        _default = load_catalog(DEFAULT_CATALOG)
+    return _default
@@ -0,0 +1,476 @@
+from array import array
+
+from clue_catalog import default_catalog, split_template
+from clue_hypothesis import make_space, nth_set_bit
+from clue_rng import GameRng, draw, draw_other, seed_key
+from clue_session import GameSession
+
+# Motor del juego sin dependencias de tkinter ni Pillow: la interfaz gráfica lo maneja,
+# y también puede usarse directamente desde procesos de simulación, servidores o pruebas.
+# Los catálogos vienen de archivos de datos (ver clue_catalog.py y catalogs/marvel.json).
+
+KINDS = ("characters", "locations", "weapons")
+
+CLUE_TEXTS = {
+    "characters": "La persona culpable no es {}.",
+    "locations": "No ocurrió en el lugar llamado {}.",
+    "weapons": "No se usó el arma {}."
+}
+
+# ----- Reparto a partir de una semilla -----
+# Una partida queda definida por su semilla: el sorteo k de la partida es la salida k del flujo
+# GameRng(semilla) (clue_rng.py), que se calcula directamente como draw(seed_key(semilla), k, n)
+# sin depender de los anteriores. clue_batch.py hace exactamente las mismas cuentas con NumPy
+# para generar millones de repartos a la vez.
+#
+# Número de sorteo de cada decisión; las coartadas usan DRAW_ALIBIS + 2*i (locación falsa)
+# y DRAW_ALIBIS + 2*i + 1 (arma falsa) para el personaje i, saltando la solución
+DRAW_CHARACTER = 0
+DRAW_LOCATION = 1
+DRAW_WEAPON = 2
+DRAW_VICTIM = 3
+DRAW_CLUE_KIND = 4
+DRAW_CLUE_ENTITY = 5
+DRAW_STORY = 6
+DRAW_PHRASE = 7
+DRAW_ALIBIS = 8
+# La k-ésima pista pedida durante la partida usa el sorteo DRAW_CLUES + k (muy por encima de
+# los de las coartadas), así una partida se puede repetir exactamente a partir de su semilla
+DRAW_CLUES = 1 << 32
+
+# Con más personajes que esto, las coartadas de una sesión se indexan además por locación y
+# por arma; con menos, recorrer el array de coartadas es más barato que guardar los índices
+INDEXED_ALIBIS = 64
+
+
+def deal_header(key, n_characters, n_locations, n_weapons, n_stories, phrase_counts):
+    # Solución, víctima, indicio de la narrativa, historia y frase del indicio, como índices
+    character = draw(key, DRAW_CHARACTER, n_characters)
+    location = draw(key, DRAW_LOCATION, n_locations)
+    weapon = draw(key, DRAW_WEAPON, n_weapons)
+    victim = draw_other(key, DRAW_VICTIM, n_characters, character)
+
+    clue_kind = draw(key, DRAW_CLUE_KIND, 3)
+    if clue_kind == 0:
+        clue_entity = draw_other(key, DRAW_CLUE_ENTITY, n_characters, character)
+    elif clue_kind == 1:
+        clue_entity = draw_other(key, DRAW_CLUE_ENTITY, n_locations, location)
+    else:
+        clue_entity = draw_other(key, DRAW_CLUE_ENTITY, n_weapons, weapon)
+    story = draw(key, DRAW_STORY, n_stories)
+    phrase = draw(key, DRAW_PHRASE, phrase_counts[clue_kind])
+    return character, location, weapon, victim, clue_kind, clue_entity, story, phrase
+
+
+def alibi_of(key, i, character, location, weapon, n_locations, n_weapons):
+    # Locación y arma de la coartada del personaje i; el culpable "delata" la solución
+    if i == character:
+        return location, weapon
+    return (draw_other(key, DRAW_ALIBIS + 2 * i, n_locations, location),
+            draw_other(key, DRAW_ALIBIS + 2 * i + 1, n_weapons, weapon))
+
+
+def deal_indices(seed, n_characters, n_locations, n_weapons, n_stories, phrase_counts):
+    # Reparto completo en forma de índices: solución, víctima, indicio de la narrativa y,
+    # para cada personaje, la locación y el arma de su coartada
+    key = seed_key(seed)
+    header = deal_header(key, n_characters, n_locations, n_weapons, n_stories, phrase_counts)
+    character, location, weapon = header[:3]
+    alibis = [alibi_of(key, i, character, location, weapon, n_locations, n_weapons)
+              for i in range(n_characters)]
+    deal = dict(zip(("character", "location", "weapon", "victim", "clue_kind", "clue_entity",
+                     "story", "phrase"), header))
+    deal["fake_locations"] = [place for place, _ in alibis]
+    deal["fake_weapons"] = [weapon for _, weapon in alibis]
+    return deal
+
+
+def alibi_indexes(alibis):
+    # locación -> personajes vistos ahí, arma -> portadores, locación -> armas asociadas (todo
+    # en índices), a partir del array intercalado [locación0, arma0, locación1, arma1, ...]
+    characters_by_location = {}
+    holders_by_weapon = {}
+    weapons_by_location = {}
+    for character, (place, weapon) in enumerate(zip(alibis[0::2], alibis[1::2])):
+        characters_by_location.setdefault(place, []).append(character)
+        holders_by_weapon.setdefault(weapon, []).append(character)
+        weapons_by_location.setdefault(place, {})[weapon] = None
+    weapons_by_location = {place: list(weapons) for place, weapons in weapons_by_location.items()}
+    return characters_by_location, holders_by_weapon, weapons_by_location
+
+
+class ClueEngine:
+    def __init__(self, characters=None, locations=None, weapons=None, stories=None,
+                 clue_indications=None, max_clues=5, templates=None, index=None, seed=None):
+        catalog = default_catalog()
+        self.characters = list(characters or catalog["characters"])
+        self.locations = list(locations or catalog["locations"])
+        self.weapons = list(weapons or catalog["weapons"])
+        self.stories = list(stories or catalog["stories"])
+        self.clue_indications = dict(clue_indications or catalog["clue_indications"])
+
+        # Frases de indicios partidas en (prefijo, sufijo) y tablas nombre -> índice; un catálogo
+        # compilado (clue_catalog.load_catalog) ya las trae hechas
+        self.clue_templates = templates or {kind: [split_template(t) for t in self.clue_indications[kind]]
+                                            for kind in KINDS}
+        self.index = index or {kind: {name: i for i, name in enumerate(self.catalog(kind))} for kind in KINDS}
+        # Denso para catálogos chicos, factorizado por tipo para los grandes (clue_hypothesis.py)
+        self.space = make_space(len(self.characters), len(self.locations), len(self.weapons))
+        # Primer bit de cada tipo en los campos de bits de la sesión (pistas e interrogatorios)
+        self.offsets = {
+            "characters": 0,
+            "locations": len(self.characters),
+            "weapons": len(self.characters) + len(self.locations)
+        }
+
+        largest = max(len(self.locations), len(self.weapons))
+        self.alibi_typecode = "B" if largest <= 1 << 8 else "H" if largest <= 1 << 16 else "I"
+
+        self.max_clues = max_clues
+        # Partida en curso (clue_session.GameSession); el motor solo guarda catálogos y tablas
+        # compartidas, así un servidor puede atender miles de sesiones con un único motor
+        self.session = None
+        # Registro de acciones opcional (clue_log.ActionLog.for_engine)
+        self.log = None
+        # Flujo del que salen las semillas de las partidas nuevas sin semilla explícita; con
+        # seed, la sucesión de repartos del motor es reproducible
+        self.rng = GameRng(seed)
+
+    @classmethod
+    def from_catalog(cls, catalog, max_clues=5, seed=None):
+        return cls(catalog["characters"], catalog["locations"], catalog["weapons"], catalog["stories"],
+                   catalog["clue_indications"], max_clues=max_clues,
+                   templates=catalog.get("templates"), index=catalog.get("index"), seed=seed)
+
+    def catalog(self, kind):
+        if kind == "characters":
+            return self.characters
+        if kind == "locations":
+            return self.locations
+        return self.weapons
+
+    # ----- Estado de la partida en curso -----
+    @property
+    def seed(self):
+        return self.session.seed
+
+    @property
+    def clues_spent(self):
+        return self.session.clues_spent
+
+    @property
+    def finished(self):
+        return self.session.finished
+
+    @property
+    def won(self):
+        return self.session.won
+
+    @property
+    def solution_index(self):
+        s = self.session
+        return {"characters": s.character, "locations": s.location, "weapons": s.weapon}
+
+    @property
+    def solution(self):
+        s = self.session
+        return {
+            'character': self.characters[s.character],
+            'location': self.locations[s.location],
+            'weapon': self.weapons[s.weapon]
+        }
+
+    @property
+    def narrative(self):
+        return self.render_narrative(self.session)
+
+    def kind_bits(self, bits, kind):
+        # Extrae de un campo de bits de la sesión los bits de un tipo de entidad
+        return (bits >> self.offsets[kind]) & ((1 << len(self.catalog(kind))) - 1)
+
+    def was_interrogated(self, kind, index):
+        return bool(self.session.interrogated >> (self.offsets[kind] + index) & 1)
+
+    def was_hinted(self, kind, index):
+        return bool(self.session.hinted >> (self.offsets[kind] + index) & 1)
+
+    def record(self, kind, index, is_clue):
+        s = self.session
+        if s.history is None:
+            s.history = array("I")
+        s.history.append((self.offsets[kind] + index) << 1 | is_clue)
+
+    def history(self):
+        # (tipo, índice, es_pista) de cada interrogatorio y pista de la partida, en orden
+        if self.session.history is None:
+            return
+        for code in self.session.history:
+            bit = code >> 1
+            for kind in reversed(KINDS):
+                if bit >= self.offsets[kind]:
+                    yield kind, bit - self.offsets[kind], bool(code & 1)
+                    break
+
+    def clues_left(self):
+        return self.max_clues - self.session.clues_spent
+
+    def has_clues_left(self):
+        return self.session.clues_spent < self.max_clues
+
+    def can_give_clue(self):
+        return self.session.clueable > 0 and self.session.clues_spent < self.max_clues
+
+    def remaining_candidates(self):
+        return self.space.remaining
+
+    def clueable_total(self):
+        return len(self.characters) + len(self.locations) + len(self.weapons) - 3
+
+    def phrase_counts(self):
+        return tuple(len(self.clue_indications[kind]) for kind in KINDS)
+
+    # ----- Repartos -----
+    def new_game(self, seed=None):
+        # La misma semilla produce siempre el mismo reparto (ver deal_indices)
+        return self.load_deal(self.prepare_deal(seed))
+
+    def prepare_deal(self, seed=None):
+        # Sesión nueva lista para jugar, sin tocar la partida en curso; puede llamarse desde
+        # otro hilo (ver clue_pool.py)
+        if seed is None:
+            seed = self.rng.next_seed()
+        deal = deal_header(seed_key(seed), len(self.characters), len(self.locations), len(self.weapons),
+                           len(self.stories), self.phrase_counts())
+        return GameSession(seed, deal, self.space.full, self.clueable_total())
+
+    def load_deal(self, session, narrative=None):
+        # Empieza (o retoma) la partida de una sesión y devuelve su narrativa (la ya armada, si
+        # viene de la reserva de repartos)
+        self.attach(session)
+        if self.log is not None and session.game is None:
+            self.log.game_started(session, resumed=session.history is not None or session.finished)
+        return narrative if narrative is not None else self.render_narrative(session)
+
+    def attach(self, session):
+        # Cambia la partida en curso; el espacio de hipótesis (y sus observadores) se
+        # sincroniza con lo que la sesión ya descartó
+        self.session = session
+        self.space.load(session.candidates)
+
+    def restrict_any(self, boxes):
+        self.space.restrict_any(boxes)
+        self.session.candidates = self.space.candidates
+
+    def exclude(self, kind, index):
+        self.space.exclude(kind, index)
+        self.session.candidates = self.space.candidates
+
+    def render_narrative(self, session):
+        victim = self.characters[session.victim]
+        clue_type = KINDS[session.clue_kind]
+        clue_entity = self.catalog(clue_type)[session.clue_entity]
+        prefix, suffix = self.clue_templates[clue_type][session.phrase]
+        return (
+            f"Una tragedia ha ocurrido: {victim} ha sido encontrado muerto.\n\n"
+            f"{self.stories[session.story]}\n{prefix}{clue_entity}{suffix}\n\n"
+            "La investigación comienza y debes descubrir la verdad."
+        )
+
+    # ----- Coartadas -----
+    def alibi(self, character):
+        # (locación, arma) de la coartada del personaje, calculada desde la semilla
+        s = self.session
+        return alibi_of(seed_key(s.seed), character, s.character, s.location, s.weapon,
+                        len(self.locations), len(self.weapons))
+
+    def alibi_tables(self, session=None):
+        # Locación y arma de la coartada de cada personaje, intercaladas en un array compacto, y
+        # los índices invertidos si el catálogo es grande; se arman una vez por sesión (la
+        # reserva de repartos los arma de antemano pasando la sesión)
+        s = session or self.session
+        if s.tables is None:
+            key = seed_key(s.seed)
+            alibis = array(self.alibi_typecode)
+            for i in range(len(self.characters)):
+                alibis.extend(alibi_of(key, i, s.character, s.location, s.weapon,
+                                       len(self.locations), len(self.weapons)))
+            indexes = alibi_indexes(alibis) if len(self.characters) > INDEXED_ALIBIS else None
+            s.tables = (alibis, indexes)
+        return s.tables
+
+    def alibi_text(self, character):
+        place, weapon = self.alibi(character)
+        if character == self.session.character:
+            return (f"Se sabe que {self.characters[character]} estuvo visto cerca de {self.locations[place]}, "
+                    f"aunque no hay pruebas claras de lo que hizo con {self.weapons[weapon]}.")
+        return f"Afirmó haber estado en {self.locations[place]} durante el incidente, y no portar ningún arma peculiar."
+
+    def characters_at(self, location):
+        alibis, indexes = self.alibi_tables()
+        if indexes is not None:
+            return indexes[0].get(location, [])
+        return [i for i, place in enumerate(alibis[0::2]) if place == location]
+
+    def weapons_at(self, location):
+        alibis, indexes = self.alibi_tables()
+        if indexes is not None:
+            return indexes[2].get(location, [])
+        return list(dict.fromkeys(alibis[2 * i + 1] for i in self.characters_at(location)))
+
+    def holders_of(self, weapon):
+        alibis, indexes = self.alibi_tables()
+        if indexes is not None:
+            return indexes[1].get(weapon, [])
+        return [i for i, held in enumerate(alibis[1::2]) if held == weapon]
+
+    # ----- Interrogatorios -----
+    def interrogate(self, kind, selection):
+        # Devuelve el texto del interrogatorio y gasta una pista, o None si ya no quedan
+        if not self.has_clues_left():
+            return None
+        index = self.index[kind].get(selection)
+        if index is None:
+            return ""
+        text = self.interrogation_text(kind, index)
+        self.apply_interrogation(kind, index)
+        return text
+
+    def apply_interrogation(self, kind, index):
+        # El efecto del interrogatorio sin armar el texto (repeticiones, simulaciones)
+        self.observe_interrogation(kind, index)
+        self.record(kind, index, False)
+        self.session.clues_spent += 1
+        if self.log is not None:
+            self.log.interrogation(self.session, kind, index)
+
+    def names(self, kind, indices):
+        catalog = self.catalog(kind)
+        return ", ".join(catalog[i] for i in indices)
+
+    def interrogation_text(self, kind, index):
+        if kind == "characters":
+            place, weapon = self.alibi(index)
+            text = f"Interrogando a {self.characters[index]}:\n\n"
+            text += f"Coartada: {self.alibi_text(index)}\n"
+            text += "Lugares donde fue visto: " + self.locations[place] + "\n"
+            text += "Armas asociadas o encontradas: " + self.weapons[weapon] + "\n"
+            return text
+
+        if kind == "locations":
+            text = f"Información sobre la locación: {self.locations[index]}\n\nPersonajes vistos aquí:\n"
+            chars_here = self.characters_at(index)
+            if chars_here:
+                text += self.names("characters", chars_here)
+            else:
+                text += "Ninguno"
+            text += "\n\nArmas encontradas o asociadas aquí:\n"
+            weapons_here = self.weapons_at(index)
+            if weapons_here:
+                text += self.names("weapons", weapons_here)
+            else:
+                text += "Ninguna"
+            return text
+
+        text = f"Información sobre el arma: {self.weapons[index]}\n\nPersonajes asociados con esta arma:\n"
+        holders = self.holders_of(index)
+        if holders:
+            text += self.names("characters", holders)
+        else:
+            text += "Ninguno"
+        return text
+
+    def observe_interrogation(self, kind, index):
+        # Traduce lo que el jugador acaba de ver a cajas del espacio de hipótesis
+        s = self.session
+        s.interrogated |= 1 << (self.offsets[kind] + index)
+
+        if kind == "characters":
+            place, weapon = self.alibi(index)
+            # La coartada del culpable lo delata junto con su locación y su arma
+            inside = index == s.character
+            boxes = [{"characters": ((index,), inside), "locations": ((place,), inside),
+                      "weapons": ((weapon,), inside)}]
+        elif kind == "locations":
+            seen = self.characters_at(index)
+            found = self.weapons_at(index)
+            # O bien nadie visto aquí es culpable, o bien fue aquí; en la locación del crimen
+            # solo se ve al culpable (las coartadas falsas nunca la nombran)
+            boxes = [{"locations": ((index,), False), "characters": (seen, False), "weapons": (found, False)}]
+            if len(seen) == 1:
+                boxes.append({"locations": ((index,), True), "characters": (seen, True), "weapons": (found, True)})
+        else:
+            holders = self.holders_of(index)
+            # Lo mismo con el arma: el arma del crimen solo la porta el culpable
+            boxes = [{"weapons": ((index,), False), "characters": (holders, False)}]
+            if len(holders) == 1:
+                boxes.append({"weapons": ((index,), True), "characters": (holders, True)})
+        self.restrict_any(boxes)
+
+    # ----- Pistas -----
+    def provide_clue(self):
+        # Devuelve el texto de una pista nueva, o None si ya no hay pistas posibles
+        clue = self.apply_clue()
+        if clue is None:
+            return None
+        return self.clue_text(*clue)
+
+    def apply_clue(self):
+        # Da la siguiente pista y devuelve (tipo, índice), sin armar el texto
+        if not self.can_give_clue():
+            return None
+
+        # Se elige al azar entre todas las entidades que no son solución ni se dieron ya como pista
+        s = self.session
+        solution = (s.character, s.location, s.weapon)
+        given = self.clueable_total() - s.clueable
+        choice = draw(seed_key(s.seed), DRAW_CLUES + given, s.clueable)
+        for kind, solution_index in zip(KINDS, solution):
+            available = ((1 << len(self.catalog(kind))) - 1) & ~self.kind_bits(s.hinted, kind) & ~(1 << solution_index)
+            count = available.bit_count()
+            if choice < count:
+                break
+            choice -= count
+        index = nth_set_bit(available, choice)
+
+        s.hinted |= 1 << (self.offsets[kind] + index)
+        s.clueable -= 1
+        self.exclude(kind, index)
+        self.record(kind, index, True)
+        s.clues_spent += 1
+        if self.log is not None:
+            self.log.clue(s, kind, index)
+        return kind, index
+
+    def clue_text(self, kind, index):
+        return CLUE_TEXTS[kind].format(self.catalog(kind)[index])
+
+    # ----- Adivinanza -----
+    def make_guess(self, character, location, weapon):
+        s = self.session
+        guess = (self.index["characters"].get(character), self.index["locations"].get(location),
+                 self.index["weapons"].get(weapon))
+        correct = guess == (s.character, s.location, s.weapon)
+        s.finished = True
+        s.won = correct
+        if self.log is not None:
+            self.log.guess(s, guess, correct)
+        return correct
+
+    def guess_narrative(self):
+        solution = self.solution
+        if self.session.won:
+            return (
+                f"¡Felicidades! Has adivinado correctamente:\n\n"
+                f"🔸 Culpable: {solution['character']}\n"
+                f"🔸 Locación: {solution['location']}\n"
+                f"🔸 Arma: {solution['weapon']}\n\n"
+                "¡La verdad ha sido revelada! 🎉"
+            )
+        return (
+            f"Respuesta incorrecta.\n\n"
+            f"La verdad era:\n"
+            f"🔸 Culpable: {solution['character']}\n"
+            f"🔸 Locación: {solution['location']}\n"
+            f"🔸 Arma: {solution['weapon']}\n\n"
+            "Sigue investigando y no te rindas!"
+        )
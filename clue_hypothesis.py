@@ -0,0 +1,272 @@
+# Espacio de hipótesis del juego: cada trío candidato (personaje, locación, arma) es un bit
+# de un entero, en la posición (c * n_locations + l) * n_weapons + w. Cada pista o resultado
+# de interrogatorio se aplica como un AND con una máscara; las máscaras de cada entidad se
+# calculan una sola vez por tamaño de catálogo y se comparten entre partidas.
+#
+# Ese espacio denso ocupa C·L·W bits y sus máscaras unos (C+L+W)·C·L·W/8 bytes: con catálogos
+# de cientos o miles de entradas por tipo no entra en memoria. Por encima de DENSE_LIMIT_BYTES
+# el motor usa FactoredSpace, que guarda solo qué entidades de cada tipo siguen siendo posibles
+# (C+L+W bits). Las restricciones llegan a los dos como "cajas" (ver restrict_any): el espacio
+# factorizado es exacto mientras cada observación deja una sola caja posible, y si quedan dos
+# se queda con la unión por tipo de ambas, que contiene a todos los tríos posibles y tal vez
+# alguno más.
+
+import itertools
+import re
+
+NONZERO_BYTE = re.compile(b"[^\x00]")
+KIND_ORDER = ("characters", "locations", "weapons")
+DENSE_LIMIT_BYTES = 32 << 20  # memoria máxima de las máscaras del espacio denso
+
+
+def iter_set_bits(x):
+    # Recorre los bits encendidos saltando los bytes en cero a velocidad de C
+    data = x.to_bytes((x.bit_length() + 7) // 8, "little")
+    for match in NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        byte = data[match.start()]
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+def nth_set_bit(x, n):
+    # Índice del n-ésimo bit encendido (en orden, desde 0). Se parte el entero a la mitad según
+    # cuántos bits tiene cada mitad (bit_count es de C), así el trabajo en Python crece con el
+    # logaritmo del ancho y no con n; al final quedan a lo sumo 64 bits
+    base = 0
+    width = x.bit_length()
+    while width > 64:
+        half = width >> 1
+        low = x & ((1 << half) - 1)
+        count = low.bit_count()
+        if n < count:
+            x = low
+        else:
+            n -= count
+            x >>= half
+            base += half
+        width = x.bit_length()
+    for _ in range(n):
+        x &= x - 1
+    return base + (x & -x).bit_length() - 1
+
+
+def index_bits(indices):
+    bits = 0
+    for i in indices:
+        bits |= 1 << i
+    return bits
+
+
+def make_space(n_characters, n_locations, n_weapons):
+    # Espacio denso si sus máscaras entran en DENSE_LIMIT_BYTES; si no, factorizado por tipo
+    size = n_characters * n_locations * n_weapons
+    if (n_characters + n_locations + n_weapons) * size // 8 <= DENSE_LIMIT_BYTES:
+        return HypothesisSpace(HypothesisMasks(n_characters, n_locations, n_weapons))
+    return FactoredSpace(n_characters, n_locations, n_weapons)
+
+
+def repeat_bits(pattern, stride, count):
+    # Repite un patrón `count` veces cada `stride` bits, duplicando en lugar de sumar uno a uno
+    result = 0
+    chunk, chunk_count = pattern, 1
+    shift = 0
+    while count:
+        if count & 1:
+            result |= chunk << shift
+            shift += chunk_count * stride
+        chunk |= chunk << (chunk_count * stride)
+        chunk_count *= 2
+        count >>= 1
+    return result
+
+
+class HypothesisMasks:
+    def __init__(self, n_characters, n_locations, n_weapons):
+        self.n_characters = n_characters
+        self.n_locations = n_locations
+        self.n_weapons = n_weapons
+        self.size = n_characters * n_locations * n_weapons
+        self.full = (1 << self.size) - 1
+
+        block = n_locations * n_weapons
+        weapons_run = (1 << n_weapons) - 1
+        # Patrones repetidos: un bit por cada bloque de personaje y un bit por cada fila de armas
+        every_character = repeat_bits(1, block, n_characters)
+        every_row = repeat_bits(1, n_weapons, n_characters * n_locations)
+
+        self.characters = [((1 << block) - 1) << (c * block) for c in range(n_characters)]
+        self.locations = [(weapons_run << (l * n_weapons)) * every_character for l in range(n_locations)]
+        self.weapons = [every_row << w for w in range(n_weapons)]
+
+    def of_kind(self, kind):
+        if kind == "characters":
+            return self.characters
+        if kind == "locations":
+            return self.locations
+        return self.weapons
+
+    def union(self, kind, indices):
+        masks = self.of_kind(kind)
+        result = 0
+        for i in indices:
+            result |= masks[i]
+        return result
+
+    def triple(self, bit):
+        rest, w = divmod(bit, self.n_weapons)
+        c, l = divmod(rest, self.n_locations)
+        return c, l, w
+
+
+class HypothesisSpace:
+    dense = True
+
+    def __init__(self, masks):
+        self.masks = masks
+        self.size = masks.size
+        self.full = masks.full
+        self.candidates = masks.full
+        self.remaining = masks.size
+        self.listeners = []  # objetos con on_reset() y on_remove(bits_descartados)
+
+    def watch(self, listener):
+        # Un observador que llega a mitad de partida se sincroniza con lo ya descartado
+        self.listeners.append(listener)
+        self.sync(listener)
+
+    def unwatch(self, listener):
+        self.listeners.remove(listener)
+
+    def sync(self, listener):
+        listener.on_reset()
+        removed = self.masks.full & ~self.candidates
+        if removed:
+            listener.on_remove(removed)
+
+    def load(self, candidates):
+        # Retoma los candidatos de otra partida (p. ej. otra sesión del servidor)
+        self.candidates = candidates
+        self.remaining = candidates.bit_count()
+        for listener in self.listeners:
+            self.sync(listener)
+
+    def reset(self):
+        self.candidates = self.masks.full
+        self.remaining = self.masks.size
+        for listener in self.listeners:
+            listener.on_reset()
+
+    def restrict(self, mask):
+        # El conteo se actualiza aquí para que consultarlo después sea O(1)
+        removed = self.candidates & ~mask
+        if not removed:
+            return
+        self.candidates ^= removed
+        self.remaining = self.candidates.bit_count()
+        for listener in self.listeners:
+            listener.on_remove(removed)
+
+    def restrict_any(self, boxes):
+        # Se queda con los tríos de alguna de las cajas; cada caja es {tipo: (índices, adentro)}
+        # y los tipos que no nombra quedan libres
+        masks = self.masks
+        mask = 0
+        for box in boxes:
+            box_mask = masks.full
+            for kind, (indices, inside) in box.items():
+                union = masks.union(kind, indices)
+                box_mask &= union if inside else ~union
+            mask |= box_mask
+        self.restrict(mask)
+
+    def exclude(self, kind, index):
+        self.restrict(~self.masks.of_kind(kind)[index])
+
+    def is_possible(self, kind, index):
+        return bool(self.candidates & self.masks.of_kind(kind)[index])
+
+    def is_solved(self):
+        return self.remaining == 1
+
+    def nth_candidate(self, n):
+        # Devuelve el n-ésimo trío candidato (en orden de bits) como índices (c, l, w)
+        return self.masks.triple(nth_set_bit(self.candidates, n))
+
+    def candidate_triples(self):
+        for bit in iter_set_bits(self.candidates):
+            yield self.masks.triple(bit)
+
+
+class FactoredSpace:
+    # Entidades posibles de cada tipo; candidates las guarda en un solo entero con el mismo
+    # orden de bits que los campos de la sesión (personajes, después locaciones y armas)
+    dense = False
+
+    def __init__(self, n_characters, n_locations, n_weapons):
+        self.sizes = (n_characters, n_locations, n_weapons)
+        self.shifts = (0, n_characters, n_characters + n_locations)
+        self.size = n_characters * n_locations * n_weapons
+        self.full = (1 << sum(self.sizes)) - 1
+        self.reset()
+
+    def _update(self):
+        self.candidates = sum(bits << shift for bits, shift in zip(self.kinds, self.shifts))
+        self.remaining = 1
+        for bits in self.kinds:
+            self.remaining *= bits.bit_count()
+
+    def load(self, candidates):
+        self.kinds = [(candidates >> shift) & ((1 << n) - 1) for n, shift in zip(self.sizes, self.shifts)]
+        self._update()
+
+    def reset(self):
+        self.kinds = [(1 << n) - 1 for n in self.sizes]
+        self._update()
+
+    def alive(self, kind):
+        return self.kinds[KIND_ORDER.index(kind)]
+
+    def restrict_any(self, boxes):
+        # Unión por tipo de las cajas que siguen siendo posibles (exacto si queda una sola)
+        merged = [0, 0, 0]
+        for box in boxes:
+            parts = []
+            for kind, bits in zip(KIND_ORDER, self.kinds):
+                if kind in box:
+                    indices, inside = box[kind]
+                    selected = index_bits(indices)
+                    bits &= selected if inside else ~selected
+                if not bits:
+                    break
+                parts.append(bits)
+            else:
+                merged = [old | new for old, new in zip(merged, parts)]
+        if merged != self.kinds:
+            self.kinds = merged
+            self._update()
+
+    def exclude(self, kind, index):
+        k = KIND_ORDER.index(kind)
+        if self.kinds[k] >> index & 1:
+            self.kinds[k] ^= 1 << index
+            self._update()
+
+    def is_possible(self, kind, index):
+        return bool(self.alive(kind) >> index & 1) and self.remaining > 0
+
+    def is_solved(self):
+        return self.remaining == 1
+
+    def nth_candidate(self, n):
+        # El n-ésimo trío del producto, en el mismo orden que el espacio denso
+        n_locations = self.kinds[1].bit_count()
+        n_weapons = self.kinds[2].bit_count()
+        rest, w = divmod(n, n_weapons)
+        c, l = divmod(rest, n_locations)
+        return tuple(nth_set_bit(bits, i) for bits, i in zip(self.kinds, (c, l, w)))
+
+    def candidate_triples(self):
+        return itertools.product(*(list(iter_set_bits(bits)) for bits in self.kinds))
@@ -0,0 +1,199 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Caché de imágenes de personajes, locaciones y armas. Las imágenes se decodifican y escalan
+# en un pool de hilos (la precarga al iniciar y cada pedido con get_async), así al cambiar de
+# selección no se lee disco ni se decodifica un PNG en el hilo de Tk; en el hilo principal solo
+# se crea el PhotoImage (barato) la primera vez que se muestra. La caché es LRU y acotada para
+# controlar la memoria. Si hay un atlas de sprites construido (clue_atlas.py), las imágenes
+# salen de él en lugar de los PNG; si no, de la caché de imágenes derivadas (clue_assets.py),
+# que guarda cada retrato ya escalado la primera vez que se decodifica.
+#
+# get_async entrega la imagen en el hilo de Tk: el hilo de Tk revisa con after() los pedidos
+# terminados. Cada pedido ocupa un lugar ("slot", p. ej. el retrato de la pestaña de
+# interrogatorios); un pedido nuevo en el mismo lugar descarta el anterior, que se cancela si
+# todavía no empezó y si ya empezó termina en la caché pero no se entrega.
+
+# Pillow no se importa al cargar el módulo: solo la primera vez que de verdad hay una imagen
+# que decodificar. Las instalaciones sin carpeta images/ (o en modo solo texto) no lo cargan nunca.
+
+MISSING = object()  # la imagen no existe en disco; se recuerda para no volver a buscarla
+POLL_MS = 15  # cada cuánto mira el hilo de Tk si terminaron los pedidos pendientes
+
+
+def pillow():
+    from PIL import Image, ImageTk  # Pillow must be installed (pip install pillow)
+    return Image, ImageTk
+
+
+def image_path(folder, item_name):
+    return os.path.join(folder, item_name + ".png")
+
+
+def decode_scaled(filepath, size, keep_aspect=False):
+    Image, _ = pillow()
+    img = Image.open(filepath)
+    if keep_aspect:
+        # Mantener relación de aspecto redimensionando para que quepa en el tamaño pedido
+        img.thumbnail(size, Image.ANTIALIAS)
+    else:
+        img = img.resize(size, Image.ANTIALIAS)
+    img.load()
+    return img
+
+
+class ImageCache:
+    def __init__(self, size=(100, 100), keep_aspect=False, max_entries=48, atlas=None, workers=2, assets=None):
+        self.size = size
+        self.keep_aspect = keep_aspect
+        self.max_entries = max_entries
+        self.atlas = atlas
+        self.assets = assets
+        # clave (carpeta, nombre, tamaño) -> [imagen PIL escalada, PhotoImage o None]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Con más de un hilo la precarga no demora lo que pide el jugador
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clue-image")
+        self._pending = {}  # lugar -> (futuro, función que recibe el PhotoImage o None)
+        self._polling = False
+        # close() corta la precarga que ya está corriendo: sin esto la salida espera a que
+        # termine de recorrer todo el catálogo (concurrent.futures une sus hilos al salir)
+        self._stop = threading.Event()
+
+    def key(self, folder, item_name):
+        return folder, item_name, self.size
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        return entry
+
+    def _decode(self, folder, item_name):
+        if self.atlas is not None:
+            img = self.atlas.get(folder, item_name)
+            if img is not None:
+                return [img, None]
+        filepath = image_path(folder, item_name)
+        if not os.path.isfile(filepath):
+            return [MISSING, None]
+        if self.assets is not None:
+            return [self.assets.scaled_image(filepath, self.size, self.keep_aspect), None]
+        return [decode_scaled(filepath, self.size, self.keep_aspect), None]
+
+    def _load(self, folder, item_name):
+        # En un hilo del pool: decodifica (si nadie lo hizo mientras tanto) y guarda en la caché
+        key = self.key(folder, item_name)
+        entry = self._lookup(key)
+        if entry is None:
+            try:
+                entry = self._decode(folder, item_name)
+            except OSError:
+                entry = [MISSING, None]
+            self._store(key, entry)
+        return entry
+
+    def _warm(self, folder, item_name):
+        # Deja la imagen lista en disco sin ocupar la caché en memoria: en el atlas ya está
+        # escalada; si no, se escala una vez en la caché de imágenes derivadas
+        if self.atlas is not None and self.atlas.has(folder, item_name):
+            return
+        filepath = image_path(folder, item_name)
+        if self.assets is not None and os.path.isfile(filepath):
+            try:
+                self.assets.warm_image(filepath, self.size, self.keep_aspect)
+            except OSError:
+                pass
+
+    def preload(self, items):
+        # Precarga en segundo plano cada (carpeta, nombre); no bloquea el hilo de Tk. Las
+        # primeras max_entries quedan decodificadas en memoria; las demás no entran en la caché
+        # acotada, así que se dejan escaladas en disco y mostrarlas después no decodifica el PNG
+        items = list(items)
+
+        def worker():
+            try:
+                for i, (folder, item_name) in enumerate(items):
+                    if self._stop.is_set():
+                        return
+                    if i < self.max_entries:
+                        self._load(folder, item_name)
+                    else:
+                        self._warm(folder, item_name)
+            finally:
+                # El índice de la caché en disco se guarda una vez por precarga, no por imagen
+                if self.assets is not None:
+                    self.assets.save()
+
+        self._pool.submit(worker)
+
+    def _photo(self, entry):
+        image, photo = entry
+        if image is MISSING:
+            return None
+        if photo is None:
+            _, ImageTk = pillow()
+            photo = ImageTk.PhotoImage(image)
+            entry[1] = photo
+        return photo
+
+    def get(self, folder, item_name):
+        # Devuelve el PhotoImage listo para mostrar, o None si no hay imagen. Solo desde el hilo de Tk.
+        key = self.key(folder, item_name)
+        entry = self._lookup(key)
+        if entry is None:
+            # Todavía no precargada (o desalojada): se decodifica ahora
+            entry = self._decode(folder, item_name)
+            self._store(key, entry)
+        return self._photo(entry)
+
+    def get_async(self, widget, slot, folder, item_name, deliver):
+        # Pide la imagen para un lugar de la interfaz; deliver(PhotoImage o None) se llama en el
+        # hilo de Tk. Devuelve True si ya estaba en la caché y se entregó en el acto; si no, el
+        # que llama muestra algo provisorio hasta la entrega.
+        self.cancel(slot)
+        entry = self._lookup(self.key(folder, item_name))
+        if entry is not None:
+            deliver(self._photo(entry))
+            return True
+        self._pending[slot] = (self._pool.submit(self._load, folder, item_name), deliver)
+        if not self._polling:
+            self._polling = True
+            widget.after(POLL_MS, self._poll, widget)
+        return False
+
+    def cancel(self, slot):
+        # Descarta el pedido pendiente de un lugar (la selección cambió antes de que llegara)
+        pending = self._pending.pop(slot, None)
+        if pending is not None:
+            pending[0].cancel()
+
+    def _poll(self, widget):
+        for slot, (future, deliver) in list(self._pending.items()):
+            if future.done():
+                del self._pending[slot]
+                try:
+                    entry = future.result()
+                except Exception:
+                    entry = [MISSING, None]  # imagen dañada: se muestra como si no existiera
+                deliver(self._photo(entry))
+        if self._pending:
+            widget.after(POLL_MS, self._poll, widget)
+        else:
+            self._polling = False
+
+    def close(self):
+        # Al cerrar la ventana: lo que no empezó se descarta, así la salida no espera decodificaciones
+        self._stop.set()
+        self._pending.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,137 @@
+import atexit
+import sys
+import time
+import tkinter as tk
+
+# Medición de latencia de la interfaz (opcional): cronometra cada comando y manejador de eventos
+# de Tk (botones, bind, trace de variables y after) y arma un histograma por manejador. Los que
+# superan el presupuesto de un cuadro se avisan por stderr en el momento y al salir se imprime
+# un resumen ordenado por tiempo total.
+#
+#     python clue3.py --profile-ui          (o CLUE_PROFILE_UI=1)
+#     CLUE_FRAME_BUDGET_MS=8 python clue3.py --profile-ui
+#
+# Funciona reemplazando tkinter.CallWrapper, la clase con la que Tk envuelve todo callback de
+# Python al registrarlo; por eso install() tiene que llamarse antes de crear los widgets. Si no
+# se instala, no queda nada en el camino de los manejadores: el costo desactivado es cero.
+
+FRAME_BUDGET_MS = 1000 / 60
+# Límites superiores (ms) de los cubos del histograma; el último cubo no tiene límite
+BUCKETS_MS = (0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266, 533, 1066)
+
+_original_wrapper = tk.CallWrapper
+_profiler = None
+
+
+def handler_name(func):
+    # "ClueGame.provide_clue", o "after:save_game" para lo que se programa con after()
+    target = getattr(func, "__func__", func)
+    qualname = getattr(target, "__qualname__", None) or type(target).__name__
+    if qualname.startswith("Misc.after"):
+        return "after:" + target.__name__
+    return qualname
+
+
+class HandlerStats:
+    __slots__ = ("calls", "total", "worst", "slow", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.slow = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms, budget):
+        self.calls += 1
+        self.total += ms
+        if ms > self.worst:
+            self.worst = ms
+        if ms > budget:
+            self.slow += 1
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction):
+        # Límite superior del cubo donde cae el percentil (el máximo para el último cubo)
+        target = fraction * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.worst
+        return self.worst
+
+
+class UiProfiler:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, stream=None):
+        self.budget = budget_ms
+        self.stream = stream or sys.stderr
+        self.stats = {}  # nombre del manejador -> HandlerStats
+        self.started = time.perf_counter()
+        self.current = None  # manejador que se está ejecutando
+        self.sections = []  # funciones que devuelven más texto para el resumen (clue_render.py)
+
+    def current_handler(self):
+        return self.current
+
+    def record(self, name, ms):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = HandlerStats()
+        stats.add(ms, self.budget)
+        if ms > self.budget:
+            print(f"[ui] {name} tardó {ms:.1f} ms (presupuesto {self.budget:.1f} ms)", file=self.stream)
+
+    def summary(self):
+        # La columna se ensancha hasta el nombre más largo: recortarlos juntaba manejadores distintos
+        width = max([44] + [len(name) for name in self.stats])
+        lines = [f"Latencia de manejadores de la interfaz ({time.perf_counter() - self.started:.0f} s, "
+                 f"presupuesto por cuadro {self.budget:.1f} ms):",
+                 f"{'manejador':<{width}} {'llamadas':>8} {'media ms':>9} {'p50 ≤':>7} {'p99 ≤':>7} "
+                 f"{'máx ms':>8} {'lentas':>7}"]
+        for name, s in sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True):
+            lines.append(f"{name:<{width}} {s.calls:>8} {s.total / s.calls:>9.2f} {s.percentile(0.5):>7g} "
+                         f"{s.percentile(0.99):>7g} {s.worst:>8.1f} {s.slow:>7}")
+        histogram = " | ".join(f"≤{bound:g}" for bound in BUCKETS_MS) + f" | >{BUCKETS_MS[-1]:g}"
+        lines.append(f"Histogramas (cubos en ms: {histogram}):")
+        for name, s in sorted(self.stats.items()):
+            lines.append(f"  {name:<{width}} " + " ".join(str(count) for count in s.buckets))
+        return "\n".join(lines)
+
+    def report(self):
+        if self.stats:
+            print(self.summary(), file=self.stream)
+        for section in self.sections:
+            print(section(), file=self.stream)
+
+
+class TimedCallWrapper(_original_wrapper):
+    def __init__(self, func, subst, widget):
+        super().__init__(func, subst, widget)
+        self.name = handler_name(func)
+        self.profiler = _profiler
+
+    def __call__(self, *args):
+        profiler = self.profiler
+        outer, profiler.current = profiler.current, self.name
+        start = time.perf_counter()
+        try:
+            return super().__call__(*args)
+        finally:
+            profiler.record(self.name, (time.perf_counter() - start) * 1000)
+            profiler.current = outer
+
+
+def install(budget_ms=FRAME_BUDGET_MS, stream=None):
+    # Activa la medición para los callbacks que se registren de aquí en adelante
+    global _profiler
+    if _profiler is None:
+        _profiler = UiProfiler(budget_ms, stream)
+        tk.CallWrapper = TimedCallWrapper
+        atexit.register(_profiler.report)
+    return _profiler
+
@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_rng import GameRng
+from clue_server import encode_frame, read_frame
+
+# Generador de carga local para clue_server.py: abre muchas sesiones a la vez sobre unas pocas
+# conexiones persistentes (HTTP keep-alive o WebSocket), las mantiene vivas todas juntas y
+# después juega cada una (interrogatorio, pista, adivinanza). Informa p50/p99 de latencia por
+# operación, el pico de sesiones simultáneas del servidor y las sesiones completas por segundo.
+#
+#     python clue_loadtest.py --spawn --sessions 10000
+#     python clue_loadtest.py --port 8765 --transport ws
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class HttpClient:
+    def __init__(self, reader, writer, host):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, host)
+
+    async def request(self, op, message):
+        body = json.dumps(message).encode("utf-8")
+        self.writer.write(
+            f"POST /{op} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        length = 0
+        for line in header_lines:
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        response = json.loads(await self.reader.readexactly(length))
+        return int(status_line.split(" ")[1]), response
+
+    def close(self):
+        self.writer.close()
+
+
+class WebSocketClient(HttpClient):
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(
+            f"GET /ws HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {os.urandom(16).hex()}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode("latin-1")
+        )
+        head = await reader.readuntil(b"\r\n\r\n")
+        if b" 101 " not in head.split(b"\r\n", 1)[0]:
+            raise ConnectionError("el servidor no aceptó el WebSocket")
+        return cls(reader, writer, host)
+
+    async def request(self, op, message):
+        message = dict(message, op=op)
+        self.writer.write(encode_frame(0x1, json.dumps(message).encode("utf-8"), mask=os.urandom(4)))
+        _, payload = await read_frame(self.reader)
+        response = json.loads(payload)
+        return response.pop("status"), response
+
+    def close(self):
+        self.writer.write(encode_frame(0x8, b"\x03\xe8", mask=os.urandom(4)))
+        self.writer.close()
+
+
+class LoadTest:
+    def __init__(self, args, catalog):
+        self.args = args
+        self.catalog = catalog
+        self.latencies = {}  # operación -> lista de segundos
+        self.errors = {}  # (operación, estado) -> cantidad
+
+    async def call(self, client, op, message):
+        start = time.perf_counter()
+        status, response = await client.request(op, message)
+        self.latencies.setdefault(op, []).append(time.perf_counter() - start)
+        if status != 200:
+            self.errors[op, status] = self.errors.get((op, status), 0) + 1
+        return status, response
+
+    async def open_sessions(self, client, seeds):
+        sessions = []
+        for seed in seeds:
+            status, response = await self.call(client, "new_game", {"seed": seed})
+            if status == 200:
+                sessions.append(response["session"])
+        return sessions
+
+    async def play_sessions(self, client, sessions, rng):
+        catalog = self.catalog
+        for session in sessions:
+            kind = rng.choice(("characters", "locations", "weapons"))
+            await self.call(client, "interrogate",
+                            {"session": session, "kind": kind, "selection": rng.choice(catalog[kind])})
+            await self.call(client, "clue", {"session": session})
+            await self.call(client, "guess", {
+                "session": session,
+                "character": rng.choice(catalog["characters"]),
+                "location": rng.choice(catalog["locations"]),
+                "weapon": rng.choice(catalog["weapons"])
+            })
+            await self.call(client, "end", {"session": session})
+
+    async def run(self, host, port):
+        args = self.args
+        client_class = WebSocketClient if args.transport == "ws" else HttpClient
+        clients = [await client_class.connect(host, port) for _ in range(args.connections)]
+        shares = [range(args.seed + i, args.seed + args.sessions, args.connections) for i in range(args.connections)]
+
+        start = time.perf_counter()
+        opened = await asyncio.gather(*(self.open_sessions(c, share) for c, share in zip(clients, shares)))
+        open_elapsed = time.perf_counter() - start
+        _, stats = await clients[0].request("stats", {})
+
+        play_start = time.perf_counter()
+        rng = GameRng(args.seed)
+        await asyncio.gather(*(self.play_sessions(c, sessions, rng.substream(i))
+                               for i, (c, sessions) in enumerate(zip(clients, opened))))
+        end = time.perf_counter()
+        for client in clients:
+            client.close()
+        return {
+            "opened": sum(len(s) for s in opened),
+            "concurrent": stats["sessions"],
+            "open_elapsed": open_elapsed,
+            "play_elapsed": end - play_start,
+            "elapsed": end - start
+        }
+
+    def report(self, result):
+        args = self.args
+        print(f"Transporte: {args.transport}, conexiones: {args.connections}, sesiones: {args.sessions}")
+        print(f"Sesiones simultáneas en el servidor: {result['concurrent']}")
+        print(f"Apertura: {result['opened']} sesiones en {result['open_elapsed']:.2f} s")
+        print(f"Juego: {result['play_elapsed']:.2f} s")
+        total = sum(len(values) for values in self.latencies.values())
+        print(f"Total: {total} solicitudes en {result['elapsed']:.2f} s "
+              f"({total / result['elapsed']:,.0f} solicitudes/s, "
+              f"{result['opened'] / result['elapsed']:,.0f} sesiones completas/s)")
+        print(f"{'operación':<12} {'cantidad':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        everything = []
+        for op, values in self.latencies.items():
+            values.sort()
+            everything.extend(values)
+            print(f"{op:<12} {len(values):>9} {percentile(values, 0.5) * 1000:>8.2f} "
+                  f"{percentile(values, 0.99) * 1000:>8.2f}")
+        everything.sort()
+        print(f"{'todas':<12} {len(everything):>9} {percentile(everything, 0.5) * 1000:>8.2f} "
+              f"{percentile(everything, 0.99) * 1000:>8.2f}")
+        for (op, status), count in sorted(self.errors.items()):
+            print(f"Respuestas {status} en {op}: {count}")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port, catalog_path, max_sessions):
+    # Servidor en un proceso aparte (un núcleo) para no competir con el generador por el bucle
+    process = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "clue_server.py"),
+                                "--port", str(port), "--catalog", catalog_path,
+                                "--max-sessions", str(max_sessions)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("el servidor no arrancó")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga local del servidor Clue")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spawn", action="store_true", help="arrancar un servidor local en un puerto libre")
+    parser.add_argument("--transport", choices=("http", "ws"), default="http")
+    parser.add_argument("--sessions", type=int, default=10000, help="sesiones abiertas a la vez")
+    parser.add_argument("--connections", type=int, default=64, help="conexiones persistentes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    args = parser.parse_args(argv)
+    args.connections = max(1, min(args.connections, args.sessions))
+
+    server = None
+    host, port = args.host, args.port
+    if args.spawn:
+        host, port = "127.0.0.1", free_port()
+        server = spawn_server(port, args.catalog, max(args.sessions, 100000))
+    try:
+        test = LoadTest(args, load_catalog(args.catalog))
+        test.report(asyncio.run(test.run(host, port)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
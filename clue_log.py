@@ -0,0 +1,131 @@
+import os
+import struct
+import time
+
+from clue_rng import MASK64
+
+# Registro de acciones de los jugadores: un archivo binario de solo agregado con un registro de
+# tamaño fijo por acción (nueva partida con su semilla, interrogatorio, pista, cambio de pestaña
+# y adivinanza), con la hora de cada una. Los registros se juntan en memoria y se escriben por
+# lotes. Como el reparto y las pistas salen de la semilla, cada partida puede repetirse
+# exactamente (ver clue_replay.py).
+#
+# Formato: HEADER (firma, versión, tamaños del catálogo y max_clues) y después registros RECORD:
+#     evento, detalle (tipo de entidad, 1 si la adivinanza fue correcta o si la partida se
+#     retomó de una guardada), ejecución, número de partida, hora (time.time()), semilla y tres
+#     índices.
+# Una partida se identifica por (ejecución, número): la ejecución es un id aleatorio de 64 bits
+# de cada ActionLog abierto y el número cuenta las partidas de esa ejecución. Así varios
+# procesos (p. ej. varias ventanas o servidores) pueden escribir el mismo archivo sin que sus
+# partidas se mezclen, y no hace falta leer el registro al abrirlo.
+
+LOG_MAGIC = b"CLUELOG\x02"
+HEADER = struct.Struct("<8sIIIIH")
+RECORD = struct.Struct("<BBxxQIdQIII")
+
+NEW_GAME = 1
+INTERROGATE = 2
+CLUE = 3
+GUESS = 4
+TAB = 5
+
+KIND_CODES = {"characters": 0, "locations": 1, "weapons": 2}
+NO_ENTITY = 0xFFFFFFFF  # adivinanza con un nombre que no está en el catálogo
+
+
+def log_header(engine):
+    return HEADER.pack(LOG_MAGIC, len(engine.characters), len(engine.locations), len(engine.weapons),
+                       len(engine.stories), engine.max_clues)
+
+
+class ActionLog:
+    def __init__(self, path, header, batch=1024, interval=1.0):
+        self.path = path
+        self.batch = batch * RECORD.size
+        self.interval = interval
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._file = self._open(header)
+        self.run = int.from_bytes(os.urandom(8), "little")
+        self.games = 0
+
+    @classmethod
+    def for_engine(cls, engine, path, **kwargs):
+        # Abre (o crea) el registro y lo conecta al motor para que anote cada acción
+        log = cls(path, log_header(engine), **kwargs)
+        engine.log = log
+        return log
+
+    def _open(self, header):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        f = open(self.path, "a+b", buffering=0)
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            f.write(header)
+            return f
+        f.seek(0)
+        existing = f.read(HEADER.size)
+        if existing != header:
+            f.close()
+            if not existing.startswith(LOG_MAGIC):
+                raise ValueError(f"{self.path}: el registro es de otra versión")
+            raise ValueError(f"{self.path}: el registro es de otro catálogo")
+        # Un registro cortado por una caída se descarta para no desalinear los siguientes
+        complete = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+        if complete != size:
+            f.truncate(complete)
+        f.seek(complete)
+        return f
+
+    def append(self, event, detail, game, seed=0, a=0, b=0, c=0):
+        self._buffer += RECORD.pack(event, detail, self.run, game, time.time(), seed, a, b, c)
+        if len(self._buffer) >= self.batch or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    # ----- Acciones -----
+    def game_started(self, session, resumed=False):
+        session.game = self.games
+        self.games += 1
+        self.append(NEW_GAME, resumed, session.game, session.seed & MASK64)
+
+    def game(self, session):
+        # Una sesión que llega sin número (importada de otro servidor) cuenta como retomada
+        if session.game is None:
+            self.game_started(session, resumed=True)
+        return session.game
+
+    def interrogation(self, session, kind, index):
+        self.append(INTERROGATE, KIND_CODES[kind], self.game(session), a=index)
+
+    def clue(self, session, kind, index):
+        self.append(CLUE, KIND_CODES[kind], self.game(session), a=index)
+
+    def guess(self, session, indices, correct):
+        a, b, c = (NO_ENTITY if i is None else i for i in indices)
+        self.append(GUESS, correct, self.game(session), a=a, b=b, c=c)
+
+    def tab(self, session, tab):
+        if session is not None and session.game is not None:
+            self.append(TAB, 0, session.game, a=tab)
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def read_log(path):
+    # (cabecera, registros desempaquetados) de un registro completo; ignora un último registro cortado
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size or not data.startswith(LOG_MAGIC):
+        raise ValueError(f"{path}: no es un registro de acciones")
+    header = data[:HEADER.size]
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    return header, RECORD.iter_unpack(memoryview(data)[HEADER.size:end])
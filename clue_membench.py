@@ -0,0 +1,62 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_rng import GameRng
+
+# Medición de memoria de las sesiones: crea N sesiones vivas a la vez (como las que guarda
+# clue_server.py) e informa los bytes por sesión recién repartida y después de jugar un poco
+# (una pista y un interrogatorio de cada tipo, que arma las tablas de coartadas).
+#
+#     python clue_membench.py --sessions 100000
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memoria por sesión del Juego Clue")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    engine = ClueEngine.from_catalog(load_catalog(args.catalog))
+    count = args.sessions
+
+    def deal():
+        return {i: engine.prepare_deal(args.seed + i) for i in range(count)}
+
+    sessions, used, elapsed = measure(deal)
+    print(f"{count} sesiones vivas")
+    print(f"Recién repartidas: {used / count:,.0f} bytes/sesión ({used / 2**20:,.1f} MiB en total, "
+          f"{elapsed:.2f} s)")
+
+    def play():
+        rng = GameRng(args.seed)
+        for session in sessions.values():
+            engine.attach(session)
+            engine.provide_clue()
+            for kind in KINDS:
+                engine.interrogate(kind, rng.choice(engine.catalog(kind)))
+
+    _, grown, elapsed = measure(play)
+    print(f"Tras una pista y tres interrogatorios: {(used + grown) / count:,.0f} bytes/sesión "
+          f"({(used + grown) / 2**20:,.1f} MiB en total, {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
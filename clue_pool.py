@@ -0,0 +1,44 @@
+import queue
+import threading
+
+# Reserva de repartos ya preparados: un hilo de fondo mantiene llena una cola acotada con
+# repartos completos, cada uno una sesión nueva (solución e índices) con sus tablas de coartadas
+# ya armadas, junto con su narrativa, para que "Juego Nuevo" solo tenga que tomar uno listo en
+# lugar de armarlo en el hilo de Tk. Las semillas salen de un flujo propio de la reserva
+# (separado del motor con split()), que se puede usar desde los dos hilos.
+
+
+class DealPool:
+    def __init__(self, engine, size=4):
+        self.engine = engine
+        self.rng = engine.rng.split()
+        self.deals = queue.Queue(maxsize=size)
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._fill, name="clue-deal-pool", daemon=True)
+        self._worker.start()
+
+    def _fill(self):
+        while not self._stopped.is_set():
+            deal = self.prepare()
+            while not self._stopped.is_set():
+                try:
+                    self.deals.put(deal, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def prepare(self):
+        session = self.engine.prepare_deal(self.rng.next_seed())
+        self.engine.alibi_tables(session)
+        return session, self.engine.render_narrative(session)
+
+    def take(self):
+        # (sesión, narrativa) de un reparto listo; si la cola se vació (reinicios muy seguidos)
+        # se arma uno en el momento
+        try:
+            return self.deals.get_nowait()
+        except queue.Empty:
+            return self.prepare()
+
+    def stop(self):
+        self._stopped.set()
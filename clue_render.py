@@ -0,0 +1,110 @@
+import tkinter as tk
+
+# Capa de dibujado con cambios agrupados: en lugar de que cada manejador haga
+# configure(state="normal") / delete / insert / configure(state="disabled") sobre los Text y
+# config() sobre etiquetas y botones en el momento, los cambios se anotan y se aplican una sola
+# vez por evento con after_idle. Reemplazar el texto descarta lo anotado antes para ese widget,
+# los agregados se juntan en un único insert y las opciones de un mismo widget se combinan
+# (la última gana). Además se recuerda lo que ya muestra cada widget, así limpiar un texto que
+# ya está vacío o volver a poner la misma etiqueta no cuesta nada: un reinicio o un
+# interrogatorio se reducen a unas pocas llamadas a Tcl. Por eso todos los cambios de estos
+# widgets tienen que pasar por aquí.
+#
+# Cada lote cuenta las llamadas que habría hecho el código directo (pedidas) y las que de verdad
+# se emitieron, por acción; con --profile-ui el resumen sale junto al de clue_latency.py.
+
+# Llamadas a Tcl que costaba cada cambio hecho directamente
+SET_TEXT_CALLS = 4  # normal, delete, insert, disabled
+CLEAR_TEXT_CALLS = 3  # normal, delete, disabled
+APPEND_TEXT_CALLS = 4  # normal, insert, see, disabled
+
+
+class RenderQueue:
+    def __init__(self, root):
+        self.root = root
+        self.texts = {}  # Text -> [texto que reemplaza al actual o None, agregados]
+        self.options = {}  # widget -> opciones combinadas para un único configure()
+        self.shown = {}  # Text -> contenido que ya muestra (los Text se crean vacíos)
+        self.applied = {}  # widget -> opciones que ya tiene
+        self.scheduled = False
+        self.requested = 0
+        self.action = None
+        # Nombre del manejador que originó el lote (clue_latency lo conoce); por defecto ninguno
+        self.current_action = lambda: None
+        self.stats = {}  # acción -> [lotes, llamadas pedidas, llamadas emitidas]
+
+    def _schedule(self, calls):
+        self.requested += calls
+        if not self.scheduled:
+            self.scheduled = True
+            self.action = self.current_action()
+            self.root.after_idle(self.flush)
+
+    # ----- Cambios -----
+    def set_text(self, widget, text):
+        self.texts[widget] = [text, []]
+        self._schedule(SET_TEXT_CALLS if text else CLEAR_TEXT_CALLS)
+
+    def clear_text(self, widget):
+        self.set_text(widget, "")
+
+    def append_text(self, widget, text):
+        self.texts.setdefault(widget, [None, []])[1].append(text)
+        self._schedule(APPEND_TEXT_CALLS)
+
+    def configure(self, widget, **options):
+        self.options.setdefault(widget, {}).update(options)
+        self._schedule(1)
+
+    # ----- Aplicación -----
+    def flush(self):
+        # Aplica todo lo pendiente; también puede llamarse directamente para no esperar al ocio
+        if not self.scheduled:
+            return
+        self.scheduled = False
+        texts, self.texts = self.texts, {}
+        options, self.options = self.options, {}
+        issued = 0
+        for widget, (replacement, appended) in texts.items():
+            text = "".join(appended)
+            shown = self.shown.get(widget, "")
+            if replacement is not None and replacement + text == shown:
+                continue
+            widget.configure(state="normal")
+            if replacement is not None:
+                widget.delete("1.0", tk.END)
+                issued += 1
+                shown = ""
+                text = replacement + text
+            if text:
+                widget.insert(tk.END, text)
+                issued += 1
+            if appended:
+                widget.see(tk.END)
+                issued += 1
+            widget.configure(state="disabled")
+            issued += 2
+            self.shown[widget] = shown + text
+        for widget, widget_options in options.items():
+            applied = self.applied.setdefault(widget, {})
+            changed = {key: value for key, value in widget_options.items()
+                       if key not in applied or applied[key] is not value and applied[key] != value}
+            if changed:
+                widget.configure(**changed)
+                applied.update(changed)
+                issued += 1
+
+        stats = self.stats.setdefault(self.action or "(sin manejador)", [0, 0, 0])
+        stats[0] += 1
+        stats[1] += self.requested
+        stats[2] += issued
+        self.requested = 0
+
+    def summary(self):
+        lines = ["Llamadas a Tcl de los cambios de texto y etiquetas, por lote (una acción):",
+                 f"{'acción':<44} {'lotes':>6} {'pedidas':>8} {'emitidas':>9} {'ahorro':>7}"]
+        for action, (batches, requested, issued) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            saved = 1 - issued / requested if requested else 0
+            lines.append(f"{action[:44]:<44} {batches:>6} {requested / batches:>8.1f} {issued / batches:>9.1f} "
+                         f"{saved * 100:>6.0f}%")
+        return "\n".join(lines)
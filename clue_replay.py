@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_log import CLUE, GUESS, INTERROGATE, NEW_GAME, NO_ENTITY, TAB, log_header, read_log
+
+# Repetición de partidas registradas (clue_log.py) sin interfaz: cada partida se vuelve a
+# repartir desde su semilla y se le aplican las mismas acciones. Sirve como prueba de regresión
+# (cada pista y cada adivinanza tienen que dar lo mismo que cuando se jugó) y para analizar en
+# qué gastan los jugadores sus pistas. Las partidas se reparten entre procesos por su id
+# (ejecución, número; ver clue_log.py).
+#
+#     python clue_replay.py ~/.clue_marvel/acciones.cluelog --workers 4
+
+TAB_NAMES = ("Narrativa", "Interrogar & Pistas", "Adivinanza")
+MAX_REPORTED = 10
+
+_worker_engine = None
+_worker_path = None
+
+
+def init_worker(catalog_path, log_path):
+    global _worker_engine, _worker_path
+    _worker_engine = ClueEngine.from_catalog(load_catalog(catalog_path))
+    _worker_path = log_path
+
+
+def replay_part(part):
+    # Repite las partidas cuyo id cae en esta parte; devuelve contadores para combinar
+    index, parts = part
+    engine = _worker_engine
+    _, records = read_log(_worker_path)
+    games = {}  # partida -> [sesión, hora de inicio, hora de la última acción]
+    current = None
+    stats = Counter()
+    budget = Counter()  # pistas usadas al adivinar
+    wins_by_budget = Counter()
+    think = Counter()  # segundos antes de cada tipo de acción
+    mismatches = []
+
+    def mismatch(game, message):
+        stats["mismatches"] += 1
+        if len(mismatches) < MAX_REPORTED:
+            mismatches.append(f"partida {game[0]:016x}/{game[1]}: {message}")
+
+    for event, detail, run, number, moment, seed, a, b, c in records:
+        if (run ^ number) % parts != index:
+            continue
+        game = (run, number)
+        stats["events"] += 1
+        if event == NEW_GAME:
+            if detail:
+                stats["resumed"] += 1  # empezó desde una partida guardada: no se puede repetir
+                continue
+            games[game] = [engine.prepare_deal(seed), moment, moment]
+            stats["games"] += 1
+            continue
+        entry = games.get(game)
+        if entry is None:
+            stats["skipped"] += 1
+            continue
+        session = entry[0]
+        if current is not session:
+            engine.attach(session)
+            current = session
+        elapsed = moment - entry[2]
+        entry[2] = moment
+
+        if event == INTERROGATE:
+            kind = KINDS[detail]
+            think["interrogate"] += elapsed
+            stats["interrogate_" + kind] += 1
+            if not engine.has_clues_left():
+                mismatch(game, "interrogatorio sin pistas disponibles")
+            else:
+                engine.apply_interrogation(kind, a)
+        elif event == CLUE:
+            think["clue"] += elapsed
+            stats["clues"] += 1
+            clue = engine.apply_clue()
+            if clue is None:
+                mismatch(game, "pista pedida sin pistas disponibles")
+            else:
+                kind, given = clue
+                if clue != (KINDS[detail], a):
+                    mismatch(game, f"la pista fue {kind} {given}, registrada {KINDS[detail]} {a}")
+        elif event == GUESS:
+            think["guess"] += elapsed
+            names = [engine.catalog(kind)[i] if i != NO_ENTITY else "" for kind, i in zip(KINDS, (a, b, c))]
+            if engine.make_guess(*names) != bool(detail):
+                mismatch(game, "la adivinanza dio otro resultado")
+            stats["guesses"] += 1
+            stats["wins"] += bool(detail)
+            stats["game_seconds"] += moment - entry[1]
+            budget[session.clues_spent] += 1
+            wins_by_budget[session.clues_spent] += bool(detail)
+            del games[game]
+            current = None
+        elif event == TAB:
+            stats["tab_" + str(a)] += 1
+    stats["unfinished"] += len(games)
+    return stats, budget, wins_by_budget, think, mismatches
+
+
+def replay(log_path, catalog_path=DEFAULT_CATALOG, workers=1):
+    engine = ClueEngine.from_catalog(load_catalog(catalog_path))
+    header, _ = read_log(log_path)
+    if header != log_header(engine):
+        raise ValueError(f"{log_path}: el registro es de otro catálogo (usar --catalog)")
+
+    parts = [(i, workers) for i in range(workers)]
+    if workers == 1:
+        init_worker(catalog_path, log_path)
+        results = map(replay_part, parts)
+    else:
+        pool = Pool(workers, initializer=init_worker, initargs=(catalog_path, log_path))
+        results = pool.imap_unordered(replay_part, parts)
+
+    stats, budget, wins_by_budget, think = Counter(), Counter(), Counter(), Counter()
+    mismatches = []
+    for part_stats, part_budget, part_wins, part_think, part_mismatches in results:
+        stats.update(part_stats)
+        budget.update(part_budget)
+        wins_by_budget.update(part_wins)
+        think.update(part_think)
+        mismatches += part_mismatches
+    if workers > 1:
+        pool.close()
+    return stats, budget, wins_by_budget, think, mismatches[:MAX_REPORTED]
+
+
+def print_report(stats, budget, wins_by_budget, think, mismatches, elapsed):
+    games = stats["games"]
+    print(f"Partidas repetidas: {games}  |  Acciones: {stats['events']}  |  "
+          f"Tiempo: {elapsed:.2f} s ({games / elapsed if elapsed else 0:,.0f} partidas/s)")
+    print(f"Sin terminar: {stats['unfinished']}  |  Retomadas de una guardada (omitidas): {stats['resumed']}")
+    guesses = stats["guesses"]
+    if guesses:
+        print(f"Tasa de victoria: {stats['wins'] / guesses * 100:.2f}%  |  "
+              f"Duración media de una partida: {stats['game_seconds'] / guesses:.1f} s")
+
+    spent = stats["clues"] + sum(stats["interrogate_" + kind] for kind in KINDS)
+    if spent:
+        print("En qué se gastan las pistas:")
+        for kind in KINDS:
+            count = stats["interrogate_" + kind]
+            print(f"  interrogar {kind:<11} {count / spent * 100:6.2f}%  ({count})")
+        print(f"  pedir pista            {stats['clues'] / spent * 100:6.2f}%  ({stats['clues']})")
+    if budget:
+        print("Pistas usadas al adivinar (victorias):")
+        for used in sorted(budget):
+            print(f"  {used:>3}: {budget[used] / guesses * 100:6.2f}%  ({budget[used]}, "
+                  f"{wins_by_budget[used] / budget[used] * 100:.1f}% ganadas)")
+    actions = {"interrogate": spent - stats["clues"], "clue": stats["clues"], "guess": guesses}
+    if any(actions.values()):
+        print("Tiempo medio antes de cada acción:")
+        for action, count in actions.items():
+            if count:
+                print(f"  {action:<12} {think[action] / count:.2f} s")
+    visits = [(name, stats["tab_" + str(i)]) for i, name in enumerate(TAB_NAMES) if stats["tab_" + str(i)]]
+    if visits:
+        print("Visitas a pestañas: " + ", ".join(f"{name} {count}" for name, count in visits))
+
+    if stats["mismatches"]:
+        print(f"DIFERENCIAS: {stats['mismatches']}")
+        for message in mismatches:
+            print("  " + message)
+    else:
+        print("Sin diferencias con lo registrado")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repite partidas registradas del Juego Clue")
+    parser.add_argument("log", help="registro de acciones (clue_log.py)")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG, help="catálogo con el que se jugaron")
+    parser.add_argument("--workers", type=int, default=1, help="procesos (0 = todos los núcleos)")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    try:
+        results = replay(args.log, args.catalog, workers)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{e}\n")
+    print_report(*results, time.perf_counter() - start)
+    # Código de salida distinto de cero si algo no coincide, para usarlo en pruebas de regresión
+    if results[0]["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
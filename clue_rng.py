@@ -0,0 +1,94 @@
+import itertools
+import os
+
+# Generadores con semilla propia, uno por partida (o por proceso, hilo o tarea), en lugar del
+# módulo random global. Todo sale de SplitMix64 en modo contador: la salida número k de un
+# flujo con clave K es mix64(K + (k + 1) * GOLDEN_GAMMA), así cualquier salida se calcula en O(1)
+# sin depender de las anteriores y dos flujos con claves distintas no comparten estado.
+#
+#     clave de una semilla:   seed_key(seed) = mix64(seed mod 2**64)
+#     sorteo k entre n:       draw(clave, k, n) = salida k del flujo % n
+#     flujo derivado:         GameRng.split() (consume una salida) o substream(i) (no consume)
+#
+# El reparto de una partida es el flujo GameRng(semilla): ver la tabla de sorteos en
+# clue_engine.py. clue_batch.py hace las mismas cuentas con NumPy.
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+STREAM_GAMMA = 0xD1B54A32D192ED03  # separa los subflujos de substream()
+
+
+def mix64(x):
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def seed_key(seed):
+    return mix64(seed & MASK64)
+
+
+def draw(key, k, n):
+    return mix64((key + (k + 1) * GOLDEN_GAMMA) & MASK64) % n
+
+
+def draw_other(key, k, n, excluded):
+    # Sorteo uniforme entre n valores saltando el índice excluido, sin armar listas
+    value = draw(key, k, n - 1)
+    return value + (value >= excluded)
+
+
+def fresh_seed():
+    return int.from_bytes(os.urandom(8), "little")
+
+
+class GameRng:
+    __slots__ = ("key", "_counter")
+
+    def __init__(self, seed=None):
+        # Sin semilla se toma una del sistema operativo
+        self.key = seed_key(fresh_seed() if seed is None else seed)
+        # next() sobre itertools.count es atómico, así un mismo flujo puede usarse desde
+        # varios hilos (p. ej. clue_pool.py) sin repetir salidas
+        self._counter = itertools.count()
+
+    @classmethod
+    def from_key(cls, key):
+        rng = cls.__new__(cls)
+        rng.key = key
+        rng._counter = itertools.count()
+        return rng
+
+    def next64(self):
+        return mix64((self.key + (next(self._counter) + 1) * GOLDEN_GAMMA) & MASK64)
+
+    def at(self, k, n):
+        # Salida k del flujo entre n, sin avanzarlo (igual a draw(self.key, k, n))
+        return draw(self.key, k, n)
+
+    def next_seed(self):
+        return self.next64()
+
+    def randrange(self, n):
+        # El sesgo del módulo es de n / 2**64: despreciable para los tamaños del juego
+        return self.next64() % n
+
+    def random(self):
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def choice(self, seq):
+        return seq[self.randrange(len(seq))]
+
+    def shuffle(self, items):
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randrange(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+    def split(self):
+        # Flujo nuevo e independiente; avanza este flujo una salida
+        return GameRng.from_key(mix64(self.next64()))
+
+    def substream(self, i):
+        # Flujo i derivado de este sin avanzarlo: el mismo i da siempre el mismo flujo, así
+        # tareas repartidas entre procesos no dependen del orden en que se ejecutan
+        return GameRng.from_key(mix64((self.key + (i + 1) * STREAM_GAMMA) & MASK64))
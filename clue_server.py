@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import secrets
+import signal
+import struct
+import time
+import traceback
+
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_log import ActionLog
+from clue_snapshot import export_sessions, import_sessions
+
+# Servidor de partidas: muchas investigaciones simultáneas, una por jugador, en un solo proceso
+# asyncio sin dependencias externas. Un único ClueEngine atiende a todas: cada partida es una
+# GameSession compacta (clue_session.py) que el motor retoma con attach() en cada operación.
+#
+# Operaciones (JSON), por HTTP o por WebSocket:
+#     POST /new_game     {"seed"?, "session"?}              -> sesión nueva (o reinicia la dada)
+#     POST /interrogate  {"session", "kind", "selection"}   -> texto del interrogatorio
+#     POST /clue         {"session"}                        -> texto de la pista
+#     POST /guess        {"session", "character", "location", "weapon"}
+#     POST /end          {"session"}                        -> libera la sesión
+#     GET  /stats
+#     GET  /ws           WebSocket; cada mensaje es {"op": "new_game" | ..., ...} con los mismos campos
+#
+# Con --state ruta, las sesiones se exportan al detenerse y se importan al arrancar (formato de
+# clue_snapshot.py), para reiniciar o mover un servidor sin cortar las partidas. Con --log ruta,
+# cada acción se anota en un registro (clue_log.py) que clue_replay.py puede repetir.
+#
+# Prueba de carga local: python clue_loadtest.py (ver ese archivo).
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class GameServer:
+    def __init__(self, engine, max_sessions=100000, idle_timeout=600):
+        self.engine = engine
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = {}  # id -> [GameSession, último uso]
+        self.peak_sessions = 0
+        self.requests = 0
+        self.operations = {
+            "new_game": self.op_new_game,
+            "interrogate": self.op_interrogate,
+            "clue": self.op_clue,
+            "guess": self.op_guess,
+            "end": self.op_end,
+            "stats": self.op_stats
+        }
+
+    # ----- Operaciones del juego -----
+    def session_id(self, message):
+        # Los campos llegan del cliente: una lista o un objeto no sirven como clave del diccionario
+        session_id = message.get("session")
+        if not isinstance(session_id, str):
+            raise RequestError(400, "'session' debe ser un texto")
+        return session_id
+
+    def session(self, message):
+        entry = self.sessions.get(self.session_id(message))
+        if entry is None:
+            raise RequestError(404, "sesión inexistente o vencida")
+        entry[1] = time.monotonic()
+        self.engine.attach(entry[0])
+        return self.engine
+
+    def playing(self, message):
+        engine = self.session(message)
+        if engine.finished:
+            raise RequestError(409, "la partida ya terminó; pedí un juego nuevo")
+        return engine
+
+    def state(self, session_id, engine, **fields):
+        fields["session"] = session_id
+        fields["clues_left"] = engine.clues_left()
+        fields["finished"] = engine.finished
+        return fields
+
+    def op_new_game(self, message):
+        seed = message.get("seed")
+        if seed is not None and not isinstance(seed, int):
+            raise RequestError(400, "'seed' debe ser un entero")
+        session_id = message.get("session")
+        if session_id is None:
+            if len(self.sessions) >= self.max_sessions:
+                raise RequestError(503, "se alcanzó el máximo de sesiones")
+            session_id = secrets.token_urlsafe(12)
+        elif not isinstance(session_id, str):
+            raise RequestError(400, "'session' debe ser un texto")
+        elif session_id not in self.sessions:
+            raise RequestError(404, "sesión inexistente o vencida")
+        engine = self.engine
+        session = engine.prepare_deal(seed)
+        self.sessions[session_id] = [session, time.monotonic()]
+        self.peak_sessions = max(self.peak_sessions, len(self.sessions))
+        narrative = engine.load_deal(session)
+        return self.state(session_id, engine, narrative=narrative)
+
+    def op_interrogate(self, message):
+        engine = self.playing(message)
+        kind = message.get("kind")
+        if kind not in KINDS:
+            raise RequestError(400, f"'kind' debe ser uno de {', '.join(KINDS)}")
+        selection = message.get("selection")
+        if not isinstance(selection, str):
+            raise RequestError(400, "'selection' debe ser un texto")
+        if selection not in engine.index[kind]:
+            raise RequestError(400, f"'{selection}' no está en el catálogo de {kind}")
+        text = engine.interrogate(kind, selection)
+        if text is None:
+            raise RequestError(409, "no quedan pistas")
+        return self.state(message["session"], engine, text=text)
+
+    def op_clue(self, message):
+        engine = self.playing(message)
+        text = engine.provide_clue()
+        if text is None:
+            raise RequestError(409, "no quedan pistas")
+        return self.state(message["session"], engine, text=text)
+
+    def op_guess(self, message):
+        engine = self.playing(message)
+        guess = [message.get(key) for key in ("character", "location", "weapon")]
+        if not all(isinstance(value, str) for value in guess):
+            raise RequestError(400, "la adivinanza necesita 'character', 'location' y 'weapon'")
+        correct = engine.make_guess(*guess)
+        return self.state(message["session"], engine, correct=correct, text=engine.guess_narrative())
+
+    def op_end(self, message):
+        session_id = self.session_id(message)
+        if session_id not in self.sessions:
+            raise RequestError(404, "sesión inexistente o vencida")
+        del self.sessions[session_id]
+        return {"session": session_id, "ended": True}
+
+    def op_stats(self, message):
+        return {"sessions": len(self.sessions), "peak_sessions": self.peak_sessions, "requests": self.requests}
+
+    def dispatch(self, op, message):
+        # (estado, respuesta) de una operación; compartido por HTTP y WebSocket
+        self.requests += 1
+        if not isinstance(op, str):
+            # Por WebSocket "op" llega del cliente: una lista no sirve como clave del diccionario
+            return 400, {"error": "'op' debe ser un texto"}
+        handler = self.operations.get(op)
+        if handler is None:
+            return 404, {"error": f"operación desconocida: {op}"}
+        if not isinstance(message, dict):
+            return 400, {"error": "el cuerpo debe ser un objeto JSON"}
+        try:
+            return 200, handler(message)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception:
+            # Un error inesperado no debe cortar la conexión (ni las demás operaciones del WebSocket)
+            traceback.print_exc()
+            return 500, {"error": "error interno del servidor"}
+
+    async def expire_idle(self):
+        # Libera las sesiones abandonadas
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            limit = time.monotonic() - self.idle_timeout
+            for session_id in [s for s, (_, used) in self.sessions.items() if used < limit]:
+                del self.sessions[session_id]
+
+    def export_state(self, path):
+        return export_sessions(self.engine, ((session_id, entry[0]) for session_id, entry in self.sessions.items()),
+                               path)
+
+    def import_state(self, path):
+        now = time.monotonic()
+        count = 0
+        for session_id, session in import_sessions(self.engine, path):
+            self.sessions[session_id] = [session, now]
+            count += 1
+        self.peak_sessions = max(self.peak_sessions, len(self.sessions))
+        return count
+
+    # ----- HTTP -----
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                parts = request_line.split(" ")
+                if len(parts) != 3:
+                    break
+                method, path, version = parts
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self.handle_websocket(reader, writer, headers)
+                    break
+
+                length = headers.get("content-length") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    # Sin un largo válido no se sabe dónde termina el cuerpo: se responde y se cierra
+                    self.write_response(writer, 400, {"error": "Content-Length inválido"}, False)
+                    break
+                length = int(length)
+                if length > MAX_BODY:
+                    self.write_response(writer, 413, {"error": "cuerpo demasiado grande"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (headers.get("connection", "").lower() != "close" and version == "HTTP/1.1")
+
+                op = path.strip("/")
+                if method == "GET" and op == "stats":
+                    status, response = self.dispatch(op, {})
+                elif method != "POST":
+                    status, response = 405, {"error": "usar POST"}
+                else:
+                    try:
+                        message = json.loads(body) if body else {}
+                    except ValueError:
+                        status, response = 400, {"error": "JSON inválido"}
+                    else:
+                        status, response = self.dispatch(op, message)
+                self.write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def write_response(self, writer, status, response, keep_alive):
+        body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    # ----- WebSocket (RFC 6455, solo mensajes de texto) -----
+    async def handle_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "").encode("latin-1")
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest()).decode("latin-1")
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+        while True:
+            opcode, payload = await read_frame(reader)
+            if opcode == 0x8:  # cierre
+                writer.write(encode_frame(0x8, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:  # ping
+                writer.write(encode_frame(0xA, payload))
+            elif opcode == 0x1:
+                try:
+                    message = json.loads(payload)
+                except ValueError:
+                    status, response = 400, {"error": "JSON inválido"}
+                else:
+                    op = message.get("op") if isinstance(message, dict) else None
+                    status, response = self.dispatch(op, message)
+                response["status"] = status
+                if isinstance(message, dict) and "id" in message:
+                    response["id"] = message["id"]
+                writer.write(encode_frame(0x1, json.dumps(response, ensure_ascii=False).encode("utf-8")))
+            await writer.drain()
+
+
+async def read_frame(reader):
+    # Un mensaje completo (se juntan los fragmentos); devuelve (opcode, datos)
+    opcode = None
+    chunks = []
+    while True:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", await reader.readexactly(8))
+        if length > MAX_BODY:
+            raise ConnectionError("mensaje WebSocket demasiado grande")
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        data = await reader.readexactly(length)
+        if mask is not None:
+            data = bytes(b ^ mask[i & 3] for i, b in enumerate(data))
+        frame_opcode = first & 0x0F
+        if frame_opcode >= 0x8:
+            # Los mensajes de control pueden llegar entre fragmentos y no se fragmentan
+            return frame_opcode, data
+        if frame_opcode:
+            opcode = frame_opcode
+        chunks.append(data)
+        if first & 0x80:
+            return opcode, b"".join(chunks)
+
+
+def encode_frame(opcode, payload, mask=None):
+    # El servidor envía sin máscara; el cliente de prueba de carga pasa una
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask is not None else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask is not None:
+        header += mask
+        payload = bytes(b ^ mask[i & 3] for i, b in enumerate(payload))
+    return bytes(header) + payload
+
+
+async def serve(server, host, port, ready=None):
+    listener = await asyncio.start_server(server.handle_connection, host, port, backlog=4096)
+    expiry = asyncio.ensure_future(server.expire_idle())
+    if ready is not None:
+        ready(listener.sockets[0].getsockname()[1])
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        expiry.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas del Juego Clue")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG, help="catálogo de contenido (JSON)")
+    parser.add_argument("--max-sessions", type=int, default=100000)
+    parser.add_argument("--idle-timeout", type=float, default=600, help="segundos hasta liberar una sesión inactiva")
+    parser.add_argument("--state", default=None, help="archivo de sesiones para retomar al reiniciar")
+    parser.add_argument("--log", default=None, help="registro de acciones de los jugadores")
+    parser.add_argument("--seed", type=int, default=None, help="semilla de los repartos sin semilla explícita")
+    args = parser.parse_args(argv)
+
+    engine = ClueEngine.from_catalog(load_catalog(args.catalog), seed=args.seed)
+    log = ActionLog.for_engine(engine, args.log) if args.log else None
+    server = GameServer(engine, max_sessions=args.max_sessions, idle_timeout=args.idle_timeout)
+    if args.state and os.path.isfile(args.state):
+        print(f"Sesiones retomadas de {args.state}: {server.import_state(args.state)}", flush=True)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Servidor Clue en http://{args.host}:{args.port} (WebSocket en /ws)", flush=True)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    if log is not None:
+        log.close()
+    if args.state:
+        print(f"Sesiones guardadas en {args.state}: {server.export_state(args.state)}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Estado compacto de una partida: solo enteros. El reparto se guarda como la semilla más los
+# índices de la solución y del indicio de la narrativa; las coartadas no se guardan porque cada
+# una se recalcula en O(1) desde la semilla (ver clue_engine.alibi_of), y todos los textos
+# (narrativa, coartadas, interrogatorios) se arman recién cuando se muestran. Las pistas dadas
+# y las entidades interrogadas son campos de bits con un bit por entidad: los personajes
+# desde el bit 0, después las locaciones y después las armas. El orden de las acciones (para
+# volver a mostrar los textos al retomar una partida guardada) es un array de enteros que se
+# crea con la primera acción. En la variante con cartas (clue_cards.py) alcanza con la cantidad de
+# jugadores y las sugerencias del jugador: el reparto y las jugadas de los rivales salen de la
+# semilla, así que repetirlas reconstruye las hojas de deducción.
+#
+# Medición de memoria por sesión: python clue_membench.py
+
+
+class GameSession:
+    __slots__ = ("seed", "character", "location", "weapon", "victim", "clue_kind", "clue_entity",
+                 "story", "phrase", "candidates", "hinted", "interrogated", "clueable", "clues_spent",
+                 "finished", "won", "history", "card_players", "suggestions", "tables", "game")
+
+    def __init__(self, seed, deal, candidates, clueable):
+        self.seed = seed
+        (self.character, self.location, self.weapon, self.victim,
+         self.clue_kind, self.clue_entity, self.story, self.phrase) = deal
+        self.candidates = candidates  # espacio de hipótesis (ver clue_hypothesis.py)
+        self.hinted = 0
+        self.interrogated = 0
+        self.clueable = clueable  # entidades que todavía pueden darse como pista
+        self.clues_spent = 0  # pistas + interrogatorios usados
+        self.finished = False
+        self.won = False
+        self.history = None  # array("I") de acciones: (bit de la entidad << 1) | es_pista
+        self.card_players = 0  # jugadores de la variante con cartas (0 = sin cartas)
+        self.suggestions = None  # array("I") con los tríos que sugirió el jugador, uno tras otro
+        # Coartadas de todos los personajes en un array (ver ClueEngine.alibi_tables); se arman
+        # solo si se interroga una locación o un arma
+        self.tables = None
+        self.game = None  # número de la partida en el registro de acciones (clue_log.py)
@@ -0,0 +1,180 @@
+import argparse
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from clue_catalog import default_catalog
+from clue_engine import ClueEngine
+from clue_rng import GameRng
+
+# Simulador Monte Carlo: juega millones de partidas con políticas de jugador
+# configurables repartidas en un pool de procesos, para evaluar el balance del juego
+# (max_clues, tamaño de los catálogos, mezcla de pistas) sin jugar a mano.
+
+GAMES_PER_TASK = 10000
+
+
+def scaled_catalog(base, size, label):
+    # Recorta o amplía un catálogo con entradas sintéticas para probar tamaños distintos
+    if size <= len(base):
+        return list(base[:size])
+    return list(base) + [f"{label} {i}" for i in range(len(base) + 1, size + 1)]
+
+
+def build_engine(config):
+    catalog = default_catalog()
+    return ClueEngine(
+        characters=scaled_catalog(catalog["characters"], config["characters"], "Personaje"),
+        locations=scaled_catalog(catalog["locations"], config["locations"], "Locación"),
+        weapons=scaled_catalog(catalog["weapons"], config["weapons"], "Arma"),
+        max_clues=config["max_clues"]
+    )
+
+
+# ----- Políticas de jugador -----
+# Cada política juega una partida ya repartida y devuelve (ganó, pistas_usadas). Lo que el
+# jugador sabe está en engine.space, que se actualiza con cada pista e interrogatorio.
+
+def guess_from(engine, rng):
+    # Adivina un trío al azar entre los que siguen siendo posibles
+    c, l, w = engine.space.nth_candidate(rng.randrange(engine.remaining_candidates()))
+    return engine.make_guess(engine.characters[c], engine.locations[l], engine.weapons[w])
+
+
+def policy_random(engine, rng):
+    return guess_from(engine, rng), 0
+
+
+def policy_clues(engine, rng):
+    while engine.provide_clue() is not None:
+        pass
+    return guess_from(engine, rng), engine.clues_spent
+
+
+def policy_interrogate(engine, rng):
+    order = list(engine.characters)
+    rng.shuffle(order)
+    for character in order:
+        if engine.space.is_solved() or engine.interrogate("characters", character) is None:
+            break
+    return guess_from(engine, rng), engine.clues_spent
+
+
+POLICIES = {
+    "aleatorio": policy_random,
+    "pistas": policy_clues,
+    "interrogar": policy_interrogate
+}
+
+
+# ----- Trabajadores -----
+_worker_engine = None
+_worker_config = None
+
+
+def init_worker(config):
+    global _worker_engine, _worker_config
+    _worker_config = config
+    _worker_engine = build_engine(config)
+
+
+def run_task(task):
+    # Cada tarea usa su propio subflujo de la semilla base (repartos y jugador por separado),
+    # así el resultado no depende de cuántos procesos haya ni de qué proceso reciba la tarea
+    seed, task_index, games = task
+    task_rng = GameRng(seed).substream(task_index)
+    deals = task_rng.split()
+    rng = task_rng.split()
+    engine = _worker_engine
+    policy = POLICIES[_worker_config["policy"]]
+
+    wins = 0
+    clues_used = Counter()
+    for _ in range(games):
+        engine.new_game(deals.next_seed())
+        won, used = policy(engine, rng)
+        wins += won
+        clues_used[used] += 1
+    return games, wins, clues_used
+
+
+def make_tasks(games, seed):
+    tasks = []
+    task_index = 0
+    while games > 0:
+        chunk = min(GAMES_PER_TASK, games)
+        tasks.append((seed, task_index, chunk))
+        games -= chunk
+        task_index += 1
+    return tasks
+
+
+def simulate(config, games, workers=None, seed=0):
+    tasks = make_tasks(games, seed)
+    total_games = 0
+    total_wins = 0
+    clues_used = Counter()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        init_worker(config)
+        results = map(run_task, tasks)
+        for played, wins, used in results:
+            total_games += played
+            total_wins += wins
+            clues_used.update(used)
+    else:
+        with Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+            for played, wins, used in pool.imap_unordered(run_task, tasks):
+                total_games += played
+                total_wins += wins
+                clues_used.update(used)
+
+    return {
+        "games": total_games,
+        "wins": total_wins,
+        "win_rate": total_wins / total_games if total_games else 0.0,
+        "clues_used": dict(sorted(clues_used.items()))
+    }
+
+
+def print_report(config, stats, elapsed):
+    print(f"Política: {config['policy']}  |  Catálogos: {config['characters']} personajes, "
+          f"{config['locations']} locaciones, {config['weapons']} armas  |  max_clues: {config['max_clues']}")
+    print(f"Partidas: {stats['games']}  |  Tasa de victoria: {stats['win_rate'] * 100:.2f}%")
+    print(f"Tiempo: {elapsed:.2f} s  ({stats['games'] / elapsed:,.0f} partidas/s)")
+    print("Pistas usadas:")
+    for used, count in stats["clues_used"].items():
+        print(f"  {used:>3}: {count / stats['games'] * 100:6.2f}%  ({count})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador Monte Carlo del Juego Clue")
+    parser.add_argument("--games", type=int, default=1000000, help="número de partidas a simular")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="pistas", help="política del jugador")
+    parser.add_argument("--workers", type=int, default=None, help="procesos del pool (por defecto, todos los núcleos)")
+    parser.add_argument("--seed", type=int, default=0, help="semilla base de la simulación")
+    parser.add_argument("--max-clues", type=int, default=5)
+    catalog = default_catalog()
+    parser.add_argument("--characters", type=int, default=len(catalog["characters"]))
+    parser.add_argument("--locations", type=int, default=len(catalog["locations"]))
+    parser.add_argument("--weapons", type=int, default=len(catalog["weapons"]))
+    args = parser.parse_args(argv)
+    if min(args.characters, args.locations, args.weapons) < 2:
+        parser.error("cada catálogo necesita al menos 2 entradas")
+
+    config = {
+        "policy": args.policy,
+        "max_clues": args.max_clues,
+        "characters": args.characters,
+        "locations": args.locations,
+        "weapons": args.weapons
+    }
+    start = time.perf_counter()
+    stats = simulate(config, args.games, workers=args.workers, seed=args.seed)
+    print_report(config, stats, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+from clue_rng import MASK64
+from clue_session import GameSession
+
+# Partidas guardadas: una GameSession (clue_session.py) en un formato binario compacto y
+# versionado, para retomar una investigación después de cerrar la ventana o de una caída y
+# para mover sesiones entre servidores. Una instantánea ocupa ~100 bytes y se arma o se lee
+# en unos pocos microsegundos, así puede escribirse después de cada acción.
+#
+# Formato (little-endian), versión 2:
+#     cabecera fija SNAPSHOT (ver abajo): tamaños del catálogo, reparto, contadores y estado
+#     3 enteros de largo variable (u32 largo + bytes): candidatos, pistas dadas, interrogados
+#     u32 cantidad + u32 por acción: historial (ver GameSession.history)
+#     CARDS (jugadores de la variante con cartas, cantidad de sugerencias) + 3 u32 por sugerencia
+# La versión 1 es la misma sin la sección de cartas y se sigue leyendo.
+#
+# Exportación masiva: BULK_MAGIC seguido de registros (u16 largo + id de sesión en UTF-8,
+# u32 largo + instantánea) hasta el final del archivo.
+
+SNAPSHOT_MAGIC = b"CLUS"
+SNAPSHOT_VERSION = 2
+BULK_MAGIC = b"CLUB\x01"
+
+SNAPSHOT = struct.Struct("<4sBHIIIIQIIIIBIIIIHB")
+LENGTH = struct.Struct("<I")
+ID_LENGTH = struct.Struct("<H")
+CARDS = struct.Struct("<HI")
+
+FINISHED = 1
+WON = 2
+
+
+def catalog_sizes(engine):
+    return len(engine.characters), len(engine.locations), len(engine.weapons), len(engine.stories)
+
+
+def pack_int(value):
+    data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    return LENGTH.pack(len(data)) + data
+
+
+def unpack_int(data, offset):
+    length, = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    return int.from_bytes(data[offset:offset + length], "little"), offset + length
+
+
+def dump_session(engine, session):
+    # Instantánea de la sesión; el motor aporta los tamaños del catálogo para validarla al leer
+    s = session
+    flags = (FINISHED if s.finished else 0) | (WON if s.won else 0)
+    history = s.history if s.history is not None else array("I")
+    suggestions = s.suggestions if s.suggestions is not None else array("I")
+    if sys.byteorder != "little":
+        history = array("I", history)
+        history.byteswap()
+        suggestions = array("I", suggestions)
+        suggestions.byteswap()
+    return b"".join((
+        SNAPSHOT.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, engine.max_clues, *catalog_sizes(engine),
+                      s.seed & MASK64, s.character, s.location, s.weapon, s.victim, s.clue_kind,
+                      s.clue_entity, s.story, s.phrase, s.clueable, s.clues_spent, flags),
+        pack_int(s.candidates),
+        pack_int(s.hinted),
+        pack_int(s.interrogated),
+        LENGTH.pack(len(history)),
+        history.tobytes(),
+        CARDS.pack(s.card_players, len(suggestions) // 3),
+        suggestions.tobytes()
+    ))
+
+
+def check_deal(engine, deal):
+    # Los índices del reparto se usan directamente sobre el catálogo: deben estar en rango
+    n_characters, n_locations, n_weapons, n_stories = catalog_sizes(engine)
+    character, location, weapon, victim, clue_kind, clue_entity, story, phrase = deal
+    if (character >= n_characters or location >= n_locations or weapon >= n_weapons
+            or victim >= n_characters or victim == character or clue_kind >= 3 or story >= n_stories):
+        raise ValueError("partida guardada con un reparto fuera del catálogo")
+    solution = (character, location, weapon)[clue_kind]
+    if (clue_entity >= (n_characters, n_locations, n_weapons)[clue_kind] or clue_entity == solution
+            or phrase >= engine.phrase_counts()[clue_kind]):
+        raise ValueError("partida guardada con un reparto fuera del catálogo")
+
+
+def load_session(engine, data):
+    # GameSession a partir de una instantánea; ValueError si está dañada o es de otro catálogo
+    try:
+        fields = SNAPSHOT.unpack_from(data)
+    except struct.error:
+        raise ValueError("partida guardada incompleta")
+    magic, version, max_clues = fields[:3]
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("no es una partida guardada")
+    if version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"versión de partida guardada no soportada: {version}")
+    if max_clues != engine.max_clues or fields[3:7] != catalog_sizes(engine):
+        raise ValueError("la partida guardada es de otro catálogo")
+    seed = fields[7]
+    deal = fields[8:16]
+    clueable, clues_spent, flags = fields[16:]
+    check_deal(engine, deal)
+    if clueable > engine.clueable_total() or clues_spent > max_clues or flags & ~(FINISHED | WON):
+        raise ValueError("partida guardada con contadores inválidos")
+
+    try:
+        offset = SNAPSHOT.size
+        candidates, offset = unpack_int(data, offset)
+        hinted, offset = unpack_int(data, offset)
+        interrogated, offset = unpack_int(data, offset)
+        count, = LENGTH.unpack_from(data, offset)
+    except struct.error:
+        raise ValueError("partida guardada incompleta")
+    offset += LENGTH.size
+    history_end = offset + 4 * count
+    players, suggested = 0, 0
+    if version > 1:
+        try:
+            players, suggested = CARDS.unpack_from(data, history_end)
+        except struct.error:
+            raise ValueError("partida guardada incompleta")
+        cards_offset = history_end + CARDS.size
+    else:
+        cards_offset = history_end
+    if len(data) != cards_offset + 12 * suggested:
+        raise ValueError("partida guardada incompleta")
+    if players == 1 or (suggested and not players):
+        raise ValueError("partida guardada con una variante con cartas inválida")
+    bits = sum(catalog_sizes(engine)[:3])
+    if candidates & ~engine.space.full or hinted >> bits or interrogated >> bits:
+        raise ValueError("partida guardada con candidatos o pistas fuera del catálogo")
+    # apply_clue sortea entre las entidades que no son solución ni se dieron ya como pista: su
+    # cantidad tiene que coincidir con clueable y la solución nunca puede haberse dado como pista
+    offsets = (0, fields[3], fields[3] + fields[4])
+    solution_bits = sum(1 << (offset + index) for offset, index in zip(offsets, deal[:3]))
+    if hinted & solution_bits or clueable != engine.clueable_total() - hinted.bit_count():
+        raise ValueError("partida guardada con pistas que no coinciden con las pendientes")
+
+    session = GameSession(seed, deal, candidates, clueable)
+    session.hinted = hinted
+    session.interrogated = interrogated
+    session.clues_spent = clues_spent
+    session.finished = bool(flags & FINISHED)
+    session.won = bool(flags & WON)
+    if count:
+        session.history = array("I", bytes(data[offset:history_end]))
+        if sys.byteorder != "little":
+            session.history.byteswap()
+        if max(session.history) >> 1 >= bits:
+            raise ValueError("partida guardada con acciones fuera del catálogo")
+    session.card_players = players
+    if suggested:
+        session.suggestions = array("I", bytes(data[cards_offset:]))
+        if sys.byteorder != "little":
+            session.suggestions.byteswap()
+        sizes = catalog_sizes(engine)[:3]
+        if any(max(session.suggestions[i::3]) >= size for i, size in enumerate(sizes)):
+            raise ValueError("partida guardada con sugerencias fuera del catálogo")
+    return session
+
+
+# ----- Archivos -----
+def write_atomic(path, data):
+    # Se escribe en un temporal y se reemplaza, así nunca queda un archivo a medio escribir
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(engine, path):
+    # La sesión guardada en el archivo, o None si no existe o no se puede usar
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        return load_session(engine, data)
+    except (OSError, ValueError):
+        return None
+
+
+class SnapshotWriter:
+    # Guardado continuo sin frenar la interfaz: save() solo deja la última instantánea y un hilo
+    # la escribe; si llegan varias mientras escribe, solo se escribe la más reciente
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._writing = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="clue-snapshot-writer", daemon=True)
+        self._worker.start()
+
+    def save(self, data):
+        with self._condition:
+            self._pending = data
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                data, self._pending = self._pending, None
+                self._writing = True
+            try:
+                write_atomic(self.path, data)
+            except OSError:
+                pass  # sin disco o sin permisos: se pierde el guardado, no la partida
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def flush(self, timeout=2.0):
+        # Espera a que se escriba lo pendiente (al cerrar la ventana)
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+
+# ----- Exportación e importación masiva -----
+def export_sessions(engine, sessions, path):
+    # sessions: pares (id, GameSession); devuelve cuántas se exportaron
+    count = 0
+    parts = [BULK_MAGIC]
+    for session_id, session in sessions:
+        key = session_id.encode("utf-8")
+        snapshot = dump_session(engine, session)
+        parts += (ID_LENGTH.pack(len(key)), key, LENGTH.pack(len(snapshot)), snapshot)
+        count += 1
+    write_atomic(path, b"".join(parts))
+    return count
+
+
+def import_sessions(engine, path):
+    # Recorre los pares (id, GameSession) de una exportación
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(BULK_MAGIC):
+        raise ValueError("no es una exportación de partidas")
+    view = memoryview(data)
+    offset = len(BULK_MAGIC)
+    try:
+        while offset < len(data):
+            key_length, = ID_LENGTH.unpack_from(data, offset)
+            offset += ID_LENGTH.size
+            session_id = str(view[offset:offset + key_length], "utf-8")
+            offset += key_length
+            length, = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            yield session_id, load_session(engine, view[offset:offset + length])
+            offset += length
+    except struct.error:
+        raise ValueError("exportación de partidas incompleta")
@@ -0,0 +1,248 @@
+import tkinter as tk
+
+# Selector con búsqueda incremental para catálogos muy grandes. Reemplaza al ttk.Combobox de
+# solo lectura: al escribir se filtran las entradas (reutilizando el filtro anterior cuando la
+# búsqueda solo se alarga), y la lista desplegable está virtualizada: el Listbox contiene solo
+# las filas visibles y la barra de desplazamiento mueve una ventana sobre los resultados.
+# Mantiene la interfaz del Combobox que usa el juego: get(), set(), picker['values'] = ... y el
+# evento <<ComboboxSelected>> al elegir una entrada.
+
+
+class SearchPicker(tk.Frame):
+    def __init__(self, master, values=(), rows=8, font=None, width=30, **kwargs):
+        kwargs.setdefault("bg", "#1c1c1c")
+        super().__init__(master, **kwargs)
+        self.rows = rows
+        self.font = font
+        self.value = ""
+        self.values = []
+        self.keys = []
+        self.exact = {}  # texto normalizado -> entrada, para resolver lo que se escribe a mano
+        self.matches = []  # índices de las entradas que coinciden con la búsqueda
+        self.query = ""
+        self.top = 0  # primera fila visible dentro de self.matches
+        self.cursor = 0  # fila resaltada dentro de self.matches
+        self.popup = None
+        self.listbox = None
+        self.scrollbar = None
+        self._setting_text = False
+
+        self.columnconfigure(0, weight=1)
+        self.text_var = tk.StringVar()
+        self.entry = tk.Entry(self, textvariable=self.text_var, font=font, width=width)
+        self.entry.grid(row=0, column=0, sticky="ew")
+        self.arrow = tk.Button(self, text="▼", font=font, padx=4, pady=0, bd=1, command=self.toggle_popup)
+        self.arrow.grid(row=0, column=1, sticky="ns")
+
+        self.text_var.trace_add("write", self.on_text_changed)
+        self.entry.bind("<Down>", self.on_key_down)
+        self.entry.bind("<Up>", self.on_key_up)
+        self.entry.bind("<Next>", self.on_page_down)
+        self.entry.bind("<Prior>", self.on_page_up)
+        self.entry.bind("<Return>", self.on_return)
+        self.entry.bind("<Escape>", self.on_escape)
+        self.entry.bind("<FocusOut>", self.on_focus_out)
+
+        self.set_values(values)
+
+    # ----- Interfaz compatible con ttk.Combobox -----
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        self._set_text(value)
+        self.close_popup()
+
+    def __setitem__(self, key, value):
+        if key == "values":
+            self.set_values(value)
+        else:
+            super().__setitem__(key, value)
+
+    def __getitem__(self, key):
+        if key == "values":
+            return tuple(self.values)
+        return super().__getitem__(key)
+
+    def set_values(self, values):
+        self.values = list(values)
+        self.keys = [v.casefold() for v in self.values]
+        self.exact = {key.strip(): value for key, value in zip(self.keys, self.values)}
+        self.value = self.exact.get(self.value.casefold().strip(), "")
+        self.query = ""
+        self.matches = list(range(len(self.values)))
+        self.top = 0
+        self.cursor = 0
+        self.render()
+
+    # ----- Filtro incremental -----
+    def _set_text(self, text):
+        self._setting_text = True
+        self.text_var.set(text)
+        self._setting_text = False
+
+    def on_text_changed(self, *args):
+        if self._setting_text:
+            return
+        # get() devuelve lo que se ve: la entrada si el texto coincide exactamente con una, o ""
+        text = self.text_var.get()
+        self.value = self.exact.get(text.casefold().strip(), "")
+        self.filter(text)
+        self.open_popup()
+
+    def filter(self, query):
+        query = query.casefold().strip()
+        if query == self.query:
+            return
+        keys = self.keys
+        if self.query and query.startswith(self.query):
+            # La búsqueda se alargó: basta con filtrar los resultados anteriores
+            candidates = self.matches
+        else:
+            candidates = range(len(keys))
+        self.matches = [i for i in candidates if query in keys[i]] if query else list(candidates)
+        self.query = query
+        self.top = 0
+        self.cursor = 0
+        self.render()
+
+    # ----- Teclado y rueda -----
+    # Métodos con nombre y no lambdas: así --profile-ui (clue_latency.py) los distingue
+    def on_key_down(self, event):
+        return self.move_cursor(1)
+
+    def on_key_up(self, event):
+        return self.move_cursor(-1)
+
+    def on_page_down(self, event):
+        return self.move_cursor(self.rows)
+
+    def on_page_up(self, event):
+        return self.move_cursor(-self.rows)
+
+    def on_return(self, event):
+        return self.choose_cursor()
+
+    def on_escape(self, event):
+        self.close_popup()
+
+    def on_focus_out(self, event):
+        self.after(150, self.close_if_unfocused)
+
+    def on_wheel(self, event):
+        # <MouseWheel> trae delta (Windows, macOS); en X11 la rueda llega como botones 4 y 5
+        up = event.num == 4 or (event.num != 5 and event.delta > 0)
+        return self.scroll_rows(-1 if up else 1)
+
+    # ----- Lista desplegable virtualizada -----
+    def toggle_popup(self):
+        if self.popup is None:
+            self.filter("")
+            self.open_popup()
+            self.entry.focus_set()
+        else:
+            self.close_popup()
+
+    def open_popup(self):
+        if self.popup is not None:
+            return
+        self.popup = tk.Toplevel(self)
+        self.popup.overrideredirect(True)
+        self.listbox = tk.Listbox(self.popup, height=self.rows, font=self.font, activestyle="none",
+                                  exportselection=False, bg="#333", fg="#eee",
+                                  selectbackground="#f0b429", selectforeground="#222")
+        self.scrollbar = tk.Scrollbar(self.popup, orient="vertical", command=self.on_scroll)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<ButtonRelease-1>", self.on_click)
+        self.listbox.bind("<MouseWheel>", self.on_wheel)
+        self.listbox.bind("<Button-4>", self.on_wheel)
+        self.listbox.bind("<Button-5>", self.on_wheel)
+
+        self.update_idletasks()
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        width = self.winfo_width()
+        height = self.listbox.winfo_reqheight()
+        self.popup.geometry(f"{width}x{height}+{x}+{y}")
+        self.render()
+
+    def close_popup(self):
+        if self.popup is not None:
+            self.popup.destroy()
+            self.popup = None
+            self.listbox = None
+            self.scrollbar = None
+
+    def close_if_unfocused(self):
+        # Se cierra al perder el foco, salvo que el puntero esté sobre la lista (barra de desplazamiento)
+        if self.popup is None or self.focus_get() is self.entry:
+            return
+        x, y = self.winfo_pointerxy()
+        widget = self.winfo_containing(x, y)
+        if widget is not None and str(widget).startswith(str(self.popup)):
+            self.entry.focus_set()
+            return
+        self.close_popup()
+
+    def render(self):
+        # Solo se insertan en el Listbox las filas visibles
+        if self.listbox is None:
+            return
+        total = len(self.matches)
+        visible = self.matches[self.top:self.top + self.rows]
+        self.listbox.delete(0, tk.END)
+        if visible:
+            self.listbox.insert(tk.END, *[self.values[i] for i in visible])
+        if self.top <= self.cursor < self.top + len(visible):
+            self.listbox.selection_set(self.cursor - self.top)
+        if total:
+            self.scrollbar.set(self.top / total, min(self.top + self.rows, total) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.matches) - self.rows))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def scroll_rows(self, amount):
+        self.scroll_to(self.top + amount)
+        return "break"
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.matches)))
+        elif unit == "pages":
+            self.scroll_to(self.top + int(amount) * self.rows)
+        else:
+            self.scroll_to(self.top + int(amount))
+
+    def move_cursor(self, amount):
+        if not self.matches:
+            return "break"
+        self.open_popup()
+        self.cursor = max(0, min(self.cursor + amount, len(self.matches) - 1))
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + self.rows:
+            self.top = self.cursor - self.rows + 1
+        self.render()
+        return "break"
+
+    def on_click(self, event):
+        row = self.listbox.nearest(event.y)
+        if 0 <= row and self.top + row < len(self.matches):
+            self.choose(self.matches[self.top + row])
+
+    def choose_cursor(self):
+        if self.popup is not None and self.matches:
+            self.choose(self.matches[self.cursor])
+        return "break"
+
+    def choose(self, index):
+        self.set(self.values[index])
+        self.entry.icursor(tk.END)
+        self.event_generate("<<ComboboxSelected>>")
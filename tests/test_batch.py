@@ -0,0 +1,42 @@
+import pytest
+
+from clue_engine import ClueEngine, deal_indices
+
+np = pytest.importorskip("numpy")
+from clue_batch import FIELDS, deal_batch, engine_deal_batch  # noqa: E402
+
+
+def scalar_deals(seed, count, *sizes):
+    return [deal_indices(seed + i, *sizes) for i in range(count)]
+
+
+def assert_same(batch, deals):
+    for i, deal in enumerate(deals):
+        for field in FIELDS:
+            value = batch[field][i]
+            assert (value.tolist() if isinstance(value, np.ndarray) else int(value)) == deal[field], (i, field)
+
+
+def test_batch_matches_scalar_deals():
+    # Catálogo grande y desparejo: más de 64 personajes y tipos enteros distintos por campo
+    sizes = (300, 40, 70, 9, (2, 5, 3))
+    assert_same(deal_batch(200, 12345, *sizes), scalar_deals(12345, 200, *sizes))
+
+
+def test_batch_chunks_and_seed_wraparound():
+    # Lotes partidos en bloques y semillas que pasan por 2**64 dan lo mismo que de a uno
+    sizes = (6, 7, 8, 3, (1, 2, 4))
+    seed = 2 ** 64 - 50
+    batch = deal_batch(100, seed, *sizes, chunk=32)
+    assert len(batch["character"]) == 100
+    assert_same(batch, [deal_indices((seed + i) % 2 ** 64, *sizes) for i in range(100)])
+
+
+def test_engine_batch_matches_new_game():
+    engine = ClueEngine()
+    batch = engine_deal_batch(engine, 20, 1000)
+    for i in range(20):
+        engine.new_game(1000 + i)
+        s = engine.session
+        assert (s.character, s.location, s.weapon, s.victim) == tuple(
+            int(batch[field][i]) for field in ("character", "location", "weapon", "victim"))
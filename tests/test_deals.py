@@ -0,0 +1,66 @@
+from clue_engine import ClueEngine, deal_indices
+from clue_rng import GameRng
+
+# Repartos de referencia con el catálogo incorporado (5 personajes, locaciones, armas e
+# historias; 3 frases por tipo de indicio). Si cambian, cambió el mapeo semilla -> reparto y las
+# partidas guardadas y los registros de acciones existentes dejan de repetirse igual.
+SIZES = (5, 5, 5, 5, (3, 3, 3))
+
+GOLDEN_DEALS = {
+    0: {"character": 0, "location": 0, "weapon": 4, "victim": 1, "clue_kind": 1, "clue_entity": 3,
+        "story": 3, "phrase": 2, "fake_locations": [0, 2, 4, 2, 2], "fake_weapons": [4, 2, 3, 3, 2]},
+    42: {"character": 1, "location": 1, "weapon": 1, "victim": 3, "clue_kind": 0, "clue_entity": 4,
+         "story": 4, "phrase": 2, "fake_locations": [2, 1, 0, 0, 4], "fake_weapons": [4, 1, 3, 4, 4]},
+}
+
+GOLDEN_CLUES = {
+    0: [("weapons", 0), ("weapons", 1), ("characters", 4)],
+    1: [("locations", 3), ("locations", 1), ("characters", 2)],
+    42: [("characters", 4), ("characters", 2), ("weapons", 4)],
+    2 ** 63 + 5: [("locations", 4), ("characters", 3), ("locations", 0)],
+}
+
+
+def test_golden_deals():
+    for seed, deal in GOLDEN_DEALS.items():
+        assert deal_indices(seed, *SIZES) == deal
+
+
+def test_new_game_matches_deal_indices():
+    engine = ClueEngine()
+    for seed in range(50):
+        engine.new_game(seed)
+        deal = deal_indices(seed, *SIZES)
+        s = engine.session
+        assert (s.character, s.location, s.weapon, s.victim, s.clue_kind, s.clue_entity, s.story,
+                s.phrase) == tuple(deal[field] for field in ("character", "location", "weapon", "victim",
+                                                             "clue_kind", "clue_entity", "story", "phrase"))
+
+
+def test_golden_clues():
+    engine = ClueEngine()
+    for seed, clues in GOLDEN_CLUES.items():
+        engine.new_game(seed)
+        assert [engine.apply_clue() for _ in clues] == clues
+
+
+def test_clues_run_out_without_repeating():
+    engine = ClueEngine(max_clues=100)
+    for seed in range(20):
+        engine.new_game(seed)
+        s = engine.session
+        given = []
+        while engine.can_give_clue():
+            given.append(engine.apply_clue())
+        assert len(set(given)) == len(given) == engine.clueable_total()
+        solution = {"characters": s.character, "locations": s.location, "weapons": s.weapon}
+        assert all(index != solution[kind] for kind, index in given)
+        assert engine.apply_clue() is None
+
+
+def test_game_rng_streams():
+    rng = GameRng(7)
+    assert [rng.next64() for _ in range(3)] == [9672475392221035855, 5573481420429128725, 17358316652931856208]
+    assert GameRng(7).substream(1).next64() == 7306134576435841312
+    # Subflujos distintos de la misma semilla no se repiten entre sí
+    assert GameRng(7).substream(1).next64() != GameRng(7).substream(2).next64()
@@ -0,0 +1,55 @@
+from clue_catalog import DEFAULT_CATALOG, load_catalog
+from clue_engine import KINDS, ClueEngine
+from clue_log import CLUE, GUESS, HEADER, NEW_GAME, RECORD, ActionLog, read_log
+from clue_replay import replay
+
+
+def play_logged_games(path, games):
+    engine = ClueEngine.from_catalog(load_catalog(DEFAULT_CATALOG))
+    log = ActionLog.for_engine(engine, str(path))
+    wins = 0
+    for seed in range(games):
+        engine.new_game(seed)
+        engine.apply_clue()
+        engine.apply_interrogation(KINDS[seed % 3], 0)
+        engine.apply_clue()
+        guess = [engine.catalog(kind)[0] for kind in KINDS]
+        if seed % 2:
+            guess = [engine.solution[kind] for kind in ("character", "location", "weapon")]
+        wins += engine.make_guess(*guess)
+    engine.new_game(games)  # una última sin terminar
+    log.close()
+    return wins
+
+
+def test_short_log_replays_without_mismatches(tmp_path):
+    path = tmp_path / "acciones.cluelog"
+    wins = play_logged_games(path, 6)
+    assert wins >= 3
+
+    _, records = read_log(str(path))
+    events = [record[0] for record in records]
+    assert events.count(NEW_GAME) == 7 and events.count(CLUE) == 12 and events.count(GUESS) == 6
+
+    stats, budget, wins_by_budget, think, mismatches = replay(str(path), DEFAULT_CATALOG)
+    assert mismatches == []
+    assert stats["games"] == 7
+    assert stats["guesses"] == 6 and stats["wins"] == wins
+    assert stats["unfinished"] == 1
+    assert budget == {3: 6}
+
+
+def test_tampered_log_reports_mismatches(tmp_path):
+    path = tmp_path / "acciones.cluelog"
+    play_logged_games(path, 2)
+    data = bytearray(path.read_bytes())
+    # La primera pista registrada pasa a decir otra entidad
+    for offset in range(HEADER.size, len(data), RECORD.size):
+        record = list(RECORD.unpack_from(data, offset))
+        if record[0] == CLUE:
+            record[6] += 1
+            RECORD.pack_into(data, offset, *record)
+            break
+    path.write_bytes(bytes(data))
+    stats, _, _, _, mismatches = replay(str(path), DEFAULT_CATALOG)
+    assert stats["mismatches"] == 1 and len(mismatches) == 1